@@ -27,7 +27,7 @@ from src.config import config
 def crear_backup():
     """Crea un backup de la base de datos"""
     from datetime import datetime
-    import shutil
+    from src.database.backup import copiar_base_datos
     
     db_path = Path(config.db_path)
     if not db_path.exists():
@@ -38,7 +38,7 @@ def crear_backup():
     backup_path = db_path.parent / f"curaduria_backup_{timestamp}.db"
     
     try:
-        shutil.copy2(db_path, backup_path)
+        copiar_base_datos(str(backup_path), str(db_path))
         logger.info(f"✅ Backup creado: {backup_path}")
         return True
     except Exception as e:
@@ -6,6 +6,7 @@ import logging
 import streamlit as st
 from src.auth.authentication import AuthManager, crear_boton_logout
 from src.config import config
+from src.database.snapshots import iniciar_servicio_snapshots
 
 # Configurar logging
 logging.basicConfig(
@@ -109,6 +110,8 @@ def main():
 
 if __name__ == "__main__":
     try:
+        # Snapshots periódicos de la base de datos (una sola vez por proceso)
+        iniciar_servicio_snapshots()
         main()
     except Exception as e:
         logger.exception(f"Error en la aplicación: {e}")
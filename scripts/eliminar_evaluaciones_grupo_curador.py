@@ -71,6 +71,10 @@ def eliminar_evaluaciones_grupo_curador():
                     WHERE usuario_id = ? AND codigo_grupo = ?
                 """, (usuario_id, codigo_grupo))
                 evaluaciones_eliminadas = cursor.rowcount
+                cursor.execute("""
+                    DELETE FROM envios
+                    WHERE usuario_id = ? AND codigo_grupo = ?
+                """, (usuario_id, codigo_grupo))
 
                 if evaluaciones_eliminadas > 0:
                     logger.info(f"✅ Se eliminaron {evaluaciones_eliminadas} evaluaciones del grupo '{codigo_grupo}' del curador '{username_curador}'.")
@@ -130,6 +130,10 @@ try:
             WHERE codigo_grupo IN ({placeholders})
         """, tuple(solo_bd))
         eval_eliminadas = cursor.rowcount
+        cursor.execute(f"""
+            DELETE FROM envios 
+            WHERE codigo_grupo IN ({placeholders})
+        """, tuple(solo_bd))
         print(f"   🗑️  Evaluaciones eliminadas: {eval_eliminadas}")
     
     # Eliminar todos los grupos
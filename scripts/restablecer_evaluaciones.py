@@ -30,6 +30,7 @@ def restablecer_evaluaciones():
             
             # Borrar evaluaciones
             cursor.execute("DELETE FROM evaluaciones")
+            cursor.execute("DELETE FROM envios")
             
             # También borrar logs relacionados si se desea, o al menos registrar el reset
             LogModel.registrar_log(
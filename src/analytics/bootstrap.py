@@ -0,0 +1,276 @@
+"""
+Intervalos de confianza y estabilidad de los premios por remuestreo
+
+Las notas consolidadas se tratan como exactas, pero muchos grupos tienen
+pocos curadores y el umbral del Congo de Oro (percentil 75) puede moverse con
+una sola evaluación. Este módulo remuestrea, con reemplazo, los curadores de
+cada grupo en cada evento (bootstrap) y recalcula notas, umbrales, premios y
+puestos en cada réplica, todo con arreglos de índices de NumPy.
+
+Las réplicas se generan por bloques de tamaño fijo, cada uno con su propia
+semilla derivada de SeedSequence: el resultado es el mismo tanto si los
+bloques se calculan en este proceso como en un pool de procesos. Un grupo
+con un solo curador en cada evento no tiene variación que remuestrear.
+"""
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+import numpy as np
+import pandas as pd
+from src.config import config
+from src.database.cache import cache_compartida
+from src.database.models import EvaluacionModel
+from src.analytics.premios import (
+    PONDERACIONES, PONDERACION_POR_DEFECTO, PERCENTIL_CONGO, PREMIOS,
+    asignar_premios, categorias_premio, notas_consolidadas, cuantil_por_fila
+)
+
+logger = logging.getLogger(__name__)
+
+# Réplicas por bloque (cada bloque = una semilla; cada proceso del pool
+# calcula un lote de bloques consecutivos)
+REPLICAS_POR_BLOQUE = 250
+
+# Arranque del pool con "spawn" (procesos nuevos que importan NumPy y pandas),
+# en segundos: medido en ~1.4 s. Solo se usa el pool si el ahorro estimado a
+# partir del primer bloque lo supera; con las réplicas habituales (2000) el
+# cálculo en este proceso tarda menos de lo que cuesta arrancar el pool
+ARRANQUE_POOL = 1.5
+
+# Premio → columna de probabilidad
+COLUMNAS_PROBABILIDAD = ['prob_congo_oro', 'prob_medalla', 'prob_honor', 'prob_participacion']
+
+# (sumas, cantidades, inicio, curadores): sumas y cantidades por curador,
+# ordenadas por grupo; inicio y curadores por grupo
+Muestras = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _muestras_evento(df_curadores: pd.DataFrame, grupos: pd.DataFrame) -> Muestras:
+    """Arreglos del remuestreo de un evento, alineados con el orden de `grupos`"""
+    total = len(grupos)
+    if df_curadores.empty:
+        vacio = np.zeros(0)
+        return vacio, vacio, np.zeros(total, dtype=np.int64), np.zeros(total, dtype=np.int64)
+
+    posiciones = pd.Series(np.arange(total), index=pd.MultiIndex.from_frame(grupos[['codigo_grupo', 'ficha_codigo']]))
+    indice = posiciones.reindex(pd.MultiIndex.from_frame(df_curadores[['codigo_grupo', 'ficha_codigo']])).to_numpy()
+
+    validos = ~np.isnan(indice)
+    indice = indice[validos].astype(np.int64)
+    orden = np.argsort(indice, kind='stable')
+    indice = indice[orden]
+
+    sumas = df_curadores['suma'].to_numpy(dtype=float)[validos][orden]
+    cantidades = df_curadores['cantidad'].to_numpy(dtype=float)[validos][orden]
+
+    presentes, inicios, conteos = np.unique(indice, return_index=True, return_counts=True)
+    inicio = np.zeros(total, dtype=np.int64)
+    curadores = np.zeros(total, dtype=np.int64)
+    inicio[presentes] = inicios
+    curadores[presentes] = conteos
+    return sumas, cantidades, inicio, curadores
+
+
+def _promedios(muestras: Muestras, sorteo: np.ndarray = None) -> np.ndarray:
+    """
+    Promedio de cada grupo. Sin sorteo, con todos sus curadores (forma G);
+    con un sorteo uniforme [0, 1) de forma (réplicas, G, K), con K curadores
+    elegidos con reemplazo (forma réplicas × G). NaN si el grupo no participó.
+    """
+    sumas, cantidades, inicio, curadores = muestras
+
+    if sorteo is None:
+        # Sumas por rango contiguo con sumas acumuladas (los grupos ausentes dan 0)
+        fin = inicio + curadores
+        acumulada = np.concatenate([[0], np.cumsum(sumas)])
+        suma = acumulada[fin] - acumulada[inicio]
+        acumulada = np.concatenate([[0], np.cumsum(cantidades)])
+        cantidad = acumulada[fin] - acumulada[inicio]
+    else:
+        maximo = sorteo.shape[2]
+        validos = np.arange(maximo) < curadores[:, None]                      # G × K
+        elegidos = inicio[:, None] + (sorteo * curadores[:, None]).astype(np.int64)
+        elegidos = np.where(validos, elegidos, 0)
+        suma = np.where(validos, sumas[elegidos], 0).sum(axis=-1)
+        cantidad = np.where(validos, cantidades[elegidos], 0).sum(axis=-1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(cantidad > 0, suma / cantidad, np.nan)
+
+
+def _bloque_notas(muestras_fin: Muestras, muestras_gran: Muestras, peso_fin: np.ndarray,
+                  peso_gran: np.ndarray, replicas: int, semilla: np.random.SeedSequence,
+                  un_solo_evento: bool = False) -> np.ndarray:
+    """
+    Notas consolidadas de un bloque de réplicas con su propia semilla
+
+    Returns:
+        Arreglo réplicas × grupos
+    """
+    rng = np.random.default_rng(semilla)
+    promedios = []
+    for muestras in (muestras_fin, muestras_gran):
+        if len(muestras[0]) == 0:
+            promedios.append(np.full((replicas, len(peso_fin)), np.nan))
+            continue
+        sorteo = rng.random((replicas, len(peso_fin), int(muestras[3].max())))
+        promedios.append(_promedios(muestras, sorteo))
+    return notas_consolidadas(promedios[0], promedios[1], peso_fin, peso_gran, un_solo_evento)
+
+
+def _lote_notas(argumentos: list) -> np.ndarray:
+    """Tarea del pool de procesos: notas de varios bloques consecutivos, en orden"""
+    return np.concatenate([_bloque_notas(*args) for args in argumentos])
+
+
+def _replicas_notas(muestras_fin: Muestras, muestras_gran: Muestras, peso_fin: np.ndarray,
+                    peso_gran: np.ndarray, replicas: int, semilla: int, procesos: int = None,
+                    un_solo_evento: bool = False) -> np.ndarray:
+    """Notas de todas las réplicas, por bloques (en paralelo si compensa el arranque del pool)"""
+    tamanos = [REPLICAS_POR_BLOQUE] * (replicas // REPLICAS_POR_BLOQUE)
+    if replicas % REPLICAS_POR_BLOQUE:
+        tamanos.append(replicas % REPLICAS_POR_BLOQUE)
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    argumentos = [(muestras_fin, muestras_gran, peso_fin, peso_gran, tamano, semilla_bloque, un_solo_evento)
+                  for tamano, semilla_bloque in zip(tamanos, semillas)]
+
+    # El primer bloque se calcula aquí y su duración estima la del resto
+    inicio = time.perf_counter()
+    notas = [_bloque_notas(*argumentos[0])]
+    resto = argumentos[1:]
+    estimado = (time.perf_counter() - inicio) * len(resto)
+
+    procesos = min(procesos or config.procesos_bootstrap or os.cpu_count() or 1, len(resto))
+    if procesos <= 1 or estimado * (1 - 1 / procesos) < ARRANQUE_POOL:
+        return np.concatenate(notas + [_bloque_notas(*args) for args in resto])
+
+    # Una tarea por proceso con bloques consecutivos: las muestras se envían
+    # una vez por proceso y no una vez por bloque
+    lotes = [[resto[i] for i in indices] for indices in np.array_split(np.arange(len(resto)), procesos)]
+
+    # "spawn" evita hacer fork del servidor de Streamlit (con hilos activos)
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+        notas.extend(pool.map(_lote_notas, lotes))
+
+    logger.info(f"Bootstrap: {replicas} réplicas en {len(tamanos)} bloques ({procesos} procesos, "
+                f"{estimado:.1f} s estimados en serie)")
+    return np.concatenate(notas)
+
+
+def _umbrales_y_puestos(notas: np.ndarray, categoria_grupo: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Umbral del Congo de Oro y puesto en su categoría de cada grupo, por fila"""
+    umbrales = np.empty_like(notas)
+    puestos = np.empty(notas.shape, dtype=np.int64)
+
+    for categoria in np.unique(categoria_grupo):
+        columnas = np.flatnonzero(categoria_grupo == categoria)
+        sub = notas[:, columnas]
+        umbrales[:, columnas] = cuantil_por_fila(sub, np.full(len(notas), PERCENTIL_CONGO))[:, None]
+
+        orden = np.argsort(-sub, axis=1, kind='stable')
+        rangos = np.empty_like(orden)
+        np.put_along_axis(rangos, orden, np.arange(1, len(columnas) + 1)[None, :].repeat(len(notas), axis=0), axis=1)
+        puestos[:, columnas] = rangos
+
+    return umbrales, puestos
+
+
+def calcular_bootstrap(df_fin: pd.DataFrame, df_gran: pd.DataFrame, replicas: int = 2000,
+                       nivel: float = 0.95, semilla: int = 0, procesos: int = None) -> pd.DataFrame:
+    """
+    Intervalo de confianza de la nota consolidada, probabilidad de cada
+    premio y estabilidad del puesto de cada grupo.
+
+    Args:
+        df_fin, df_gran: Sumas por curador de cada evento (EvaluacionModel.sumas_por_curador)
+        replicas: Réplicas bootstrap
+        nivel: Nivel de confianza de los intervalos
+        semilla: Semilla del remuestreo (mismo resultado con la misma semilla)
+        procesos: Procesos del pool (por defecto config.procesos_bootstrap o los núcleos)
+    """
+    columnas_grupo = ['codigo_grupo', 'ficha_codigo', 'nombre_propuesta', 'tamano']
+    info = [df[columnas_grupo] for df in (df_fin, df_gran) if not df.empty]
+    if not info:
+        return pd.DataFrame()
+
+    # Nombre y tamaño del primer evento en que aparece el grupo (como en la tabla consolidada)
+    grupos = pd.concat(info).drop_duplicates(subset=['codigo_grupo', 'ficha_codigo'])
+    grupos = grupos.assign(categoria=categorias_premio(grupos)).dropna(subset=['categoria']).reset_index(drop=True)
+    if grupos.empty:
+        return pd.DataFrame()
+
+    muestras_fin = _muestras_evento(df_fin, grupos)
+    muestras_gran = _muestras_evento(df_gran, grupos)
+
+    ponderaciones = [PONDERACIONES.get(ficha, PONDERACION_POR_DEFECTO) for ficha in grupos['ficha_codigo']]
+    peso_fin = np.array([p['fin_semana'] for p in ponderaciones])
+    peso_gran = np.array([p['gran_parada'] for p in ponderaciones])
+    categoria_grupo = grupos['categoria'].to_numpy(dtype=str)
+
+    # Con un solo evento evaluado la nota es su promedio sin ponderar (ver nota_consolidada)
+    un_solo_evento = df_fin.empty or df_gran.empty
+
+    # Fila 0: datos observados; filas siguientes: réplicas
+    observada = notas_consolidadas(
+        _promedios(muestras_fin), _promedios(muestras_gran), peso_fin, peso_gran, un_solo_evento
+    )
+    notas = np.vstack([
+        observada,
+        _replicas_notas(muestras_fin, muestras_gran, peso_fin, peso_gran, replicas, semilla, procesos,
+                        un_solo_evento)
+    ])
+
+    umbrales, puestos = _umbrales_y_puestos(notas, categoria_grupo)
+    premios = asignar_premios(notas, umbrales)
+
+    cola = (1 - nivel) / 2
+    nota_inf, nota_sup = np.quantile(notas[1:], [cola, 1 - cola], axis=0)
+    puesto_inf, puesto_sup = np.quantile(puestos[1:], [cola, 1 - cola], axis=0)
+
+    resultado = grupos[['codigo_grupo', 'nombre_propuesta', 'ficha_codigo', 'categoria']].assign(
+        curadores_fin=muestras_fin[3],
+        curadores_gran=muestras_gran[3],
+        nota_consolidada=notas[0],
+        nota_ic_inf=nota_inf,
+        nota_ic_sup=nota_sup,
+        ranking=puestos[0],
+        ranking_ic_inf=np.floor(puesto_inf).astype(int),
+        ranking_ic_sup=np.ceil(puesto_sup).astype(int),
+        premio=premios[0],
+        **{columna: (premios[1:] == premio).mean(axis=0) for premio, columna in zip(PREMIOS, COLUMNAS_PROBABILIDAD)},
+        estabilidad_premio=(premios[1:] == premios[0]).mean(axis=0),
+        estabilidad_ranking=(puestos[1:] == puestos[0]).mean(axis=0)
+    )
+    return resultado.sort_values(['categoria', 'ranking']).reset_index(drop=True)
+
+
+@cache_compartida(
+    rutas=lambda db_fin_semana, db_gran_parada, *args, **kwargs: [
+        ruta for ruta in (db_fin_semana, db_gran_parada) if ruta
+    ],
+    etiquetas=['evaluaciones:{db}', 'grupos:{db}'],
+    max_entries=4
+)
+def bootstrap_notas(db_fin_semana: str, db_gran_parada: str, replicas: int = None,
+                    nivel: float = 0.95, semilla: int = 0) -> pd.DataFrame:
+    """
+    Intervalos de confianza y probabilidades de premio de la gala, calculados
+    una vez por versión de los datos de ambos eventos.
+
+    Args:
+        db_fin_semana, db_gran_parada: Bases de datos de cada evento
+        replicas: Réplicas bootstrap (por defecto config.bootstrap_replicas)
+        nivel: Nivel de confianza de los intervalos
+        semilla: Semilla del remuestreo
+    """
+    def cargar(ruta):
+        return EvaluacionModel.sumas_por_curador(ruta) if ruta else pd.DataFrame()
+
+    return calcular_bootstrap(
+        cargar(db_fin_semana), cargar(db_gran_parada),
+        replicas=replicas or config.bootstrap_replicas, nivel=nivel, semilla=semilla
+    )
@@ -0,0 +1,84 @@
+"""
+Índice por grupo de la tabla de evaluaciones
+
+Ordena la tabla una sola vez por código de grupo normalizado y guarda, para
+cada código, el rango de filas contiguas que le corresponde. Buscar un grupo
+o listar los grupos disponibles deja de recorrer la tabla completa.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+from src.database.cache import cache_compartida
+from src.database.models import EvaluacionModel
+
+
+def normalizar_codigo(codigo) -> str:
+    """Código de grupo tal como se compara en las búsquedas (sin espacios, en mayúsculas)"""
+    return str(codigo).strip().upper()
+
+
+class IndiceGrupos:
+    """Tabla de evaluaciones ordenada por grupo + rangos de filas por código normalizado"""
+
+    def __init__(self, df_eval: pd.DataFrame):
+        if df_eval.empty:
+            df_eval = pd.DataFrame(columns=['codigo_grupo', 'nombre_propuesta'])
+        codigos = df_eval['codigo_grupo'].astype(str).str.strip().str.upper().to_numpy(dtype=object)
+
+        orden = np.argsort(codigos, kind='stable')
+        self._evaluaciones = df_eval.iloc[orden].reset_index(drop=True)
+        claves = codigos[orden]
+
+        unicos, inicios = np.unique(claves, return_index=True)
+        fines = np.append(inicios[1:], len(claves))
+        self._rangos: Dict[str, Tuple[int, int]] = {
+            clave: (int(inicio), int(fin)) for clave, inicio, fin in zip(unicos, inicios, fines)
+        }
+
+        # Primera fila de cada grupo: código original y nombre de la propuesta
+        primeras = self._evaluaciones.iloc[inicios]
+        self._listado = pd.DataFrame({
+            'Código': primeras['codigo_grupo'].astype(str).to_numpy(),
+            'Nombre': primeras['nombre_propuesta'].astype(object).fillna('N/A').to_numpy()
+        })
+
+    def __copy__(self):
+        # El índice no se modifica después de construirse: se comparte entre sesiones
+        return self
+
+    def __len__(self) -> int:
+        return len(self._rangos)
+
+    def __contains__(self, codigo) -> bool:
+        return normalizar_codigo(codigo) in self._rangos
+
+    @property
+    def evaluaciones(self) -> pd.DataFrame:
+        """Tabla completa ordenada por grupo (solo lectura)"""
+        return self._evaluaciones
+
+    @property
+    def codigos(self) -> List[str]:
+        """Códigos de grupo disponibles, ordenados"""
+        return self._listado['Código'].tolist()
+
+    def grupo(self, codigo) -> pd.DataFrame:
+        """Evaluaciones de un grupo (copia); vacío si el código no existe"""
+        inicio, fin = self._rangos.get(normalizar_codigo(codigo), (0, 0))
+        return self._evaluaciones.iloc[inicio:fin].copy()
+
+    def listado(self) -> pd.DataFrame:
+        """Código y nombre de cada grupo evaluado"""
+        return self._listado.copy()
+
+
+@cache_compartida(etiquetas=['evaluaciones:{db}', 'grupos:{db}', 'rubrica'])
+def indice_grupos(db_path: str = None) -> IndiceGrupos:
+    """
+    Índice por grupo de las evaluaciones de un evento, construido una vez por
+    versión de los datos.
+
+    Args:
+        db_path: Base de datos del evento (por defecto la del evento actual)
+    """
+    return IndiceGrupos(EvaluacionModel.obtener_todas_dataframe(db_path=db_path))
@@ -0,0 +1,155 @@
+"""
+Núcleo analítico del comité
+
+Calcula en un solo paso, una vez por versión de los datos, todos los agregados
+que muestran las páginas de análisis (grupos, fichas, dimensiones, aspectos y
+curadores). Los conteos de fortalezas, oportunidades y riesgos salen de sumar
+columnas one-hot precalculadas, sin funciones Python por grupo.
+"""
+import dataclasses
+from dataclasses import dataclass, field
+import pandas as pd
+from src.database.cache import cache_compartida
+from src.database.models import EvaluacionModel
+
+# Valor del resultado → columna de conteo
+CONTEOS_RESULTADO = {2: 'fortaleza', 1: 'oportunidad', 0: 'riesgo'}
+
+
+@dataclass
+class ResultadosAnaliticos:
+    """Agregados de la tabla de evaluaciones de un evento"""
+    grupos: pd.DataFrame               # codigo_grupo, nombre_propuesta, ficha → promedio_final, evaluaciones
+    grupos_dimension: pd.DataFrame     # codigo_grupo, nombre_propuesta, ficha, dimension → promedio_dimension
+    fichas: pd.DataFrame               # ficha → estadísticas + promedio_grupos
+    fichas_dimension: pd.DataFrame     # ficha, dimension → promedio, evaluaciones
+    fichas_aspecto: pd.DataFrame       # ficha, aspecto → promedio
+    dimensiones: pd.DataFrame          # dimension → estadísticas
+    aspectos: pd.DataFrame             # dimension, aspecto → estadísticas
+    curadores: pd.DataFrame            # curador → estadísticas + fichas_evaluadas, eval_por_grupo
+    total_evaluaciones: int = 0
+    total_curadores: int = 0
+    avisos: list = field(default_factory=list)   # [(nivel, mensaje)] de la lectura (ver mostrar_avisos)
+
+    @property
+    def vacio(self) -> bool:
+        return self.total_evaluaciones == 0
+
+    def __copy__(self):
+        # Los resultados se comparten entre sesiones: cada una recibe sus propias tablas
+        return dataclasses.replace(self, **{
+            campo.name: getattr(self, campo.name).copy()
+            for campo in dataclasses.fields(self)
+            if isinstance(getattr(self, campo.name), pd.DataFrame)
+        })
+
+
+def _con_conteos(df_eval: pd.DataFrame) -> pd.DataFrame:
+    """Agrega una columna one-hot (int8) por cada valor posible del resultado"""
+    return df_eval.assign(**{
+        columna: (df_eval['resultado'] == valor).astype('int8')
+        for valor, columna in CONTEOS_RESULTADO.items()
+    })
+
+
+def _estadisticas(base: pd.DataFrame, claves: list, **extra) -> pd.DataFrame:
+    """
+    Promedio, mediana, desviación, evaluaciones, conteos y porcentajes por
+    resultado, agrupando por `claves` (más los agregados adicionales de `extra`).
+    """
+    agregados = dict(
+        promedio=('resultado', 'mean'),
+        mediana=('resultado', 'median'),
+        desviacion=('resultado', 'std'),
+        evaluaciones=('resultado', 'count'),
+        **{columna: (columna, 'sum') for columna in CONTEOS_RESULTADO.values()},
+        **extra
+    )
+    resultado = base.groupby(claves, as_index=False, observed=True).agg(**agregados)
+
+    for columna in CONTEOS_RESULTADO.values():
+        resultado[f'%_{columna}'] = (resultado[columna] / resultado['evaluaciones'] * 100).round(1)
+
+    return resultado
+
+
+def calcular_resultados(df_eval: pd.DataFrame) -> ResultadosAnaliticos:
+    """
+    Calcula todos los agregados del comité a partir de la tabla de hechos.
+
+    Args:
+        df_eval: Evaluaciones por aspecto (EvaluacionModel.obtener_todas_dataframe)
+    """
+    if df_eval.empty:
+        vacio = pd.DataFrame()
+        return ResultadosAnaliticos(vacio, vacio, vacio, vacio, vacio, vacio, vacio, vacio,
+                                    avisos=df_eval.attrs.get('avisos', []))
+
+    base = _con_conteos(df_eval)
+
+    grupos = (base
+        .groupby(['codigo_grupo', 'nombre_propuesta', 'ficha'], as_index=False, observed=True)
+        .agg(promedio_final=('resultado', 'mean'), evaluaciones=('resultado', 'count'))
+        .dropna(subset=['promedio_final'])
+    )
+
+    grupos_dimension = (base
+        .groupby(['codigo_grupo', 'nombre_propuesta', 'ficha', 'dimension'], as_index=False, observed=True)
+        .agg(promedio_dimension=('resultado', 'mean'))
+    )
+
+    fichas = _estadisticas(
+        base, ['ficha'],
+        grupos_evaluados=('codigo_grupo', 'nunique'),
+        curadores=('curador', 'nunique')
+    )
+    promedio_grupos = (grupos
+        .groupby('ficha', as_index=False, observed=True)
+        .agg(promedio_grupos=('promedio_final', 'mean'))
+    )
+    fichas = fichas.merge(promedio_grupos, on='ficha', how='left')
+
+    fichas_dimension = (base
+        .groupby(['ficha', 'dimension'], as_index=False, observed=True)
+        .agg(promedio=('resultado', 'mean'), evaluaciones=('resultado', 'count'))
+    )
+
+    fichas_aspecto = (base
+        .groupby(['ficha', 'aspecto'], as_index=False, observed=True)
+        .agg(promedio=('resultado', 'mean'))
+    )
+
+    dimensiones = _estadisticas(base, ['dimension'], grupos=('codigo_grupo', 'nunique'))
+    aspectos = _estadisticas(base, ['dimension', 'aspecto'], grupos=('codigo_grupo', 'nunique'))
+
+    curadores = _estadisticas(
+        base, ['curador'],
+        grupos=('codigo_grupo', 'nunique'),
+        fichas_evaluadas=('ficha', 'nunique')
+    )
+    curadores['eval_por_grupo'] = (curadores['evaluaciones'] / curadores['grupos']).round(1)
+
+    return ResultadosAnaliticos(
+        grupos=grupos,
+        grupos_dimension=grupos_dimension,
+        fichas=fichas,
+        fichas_dimension=fichas_dimension,
+        fichas_aspecto=fichas_aspecto,
+        dimensiones=dimensiones,
+        aspectos=aspectos,
+        curadores=curadores,
+        total_evaluaciones=len(df_eval),
+        total_curadores=df_eval['curador'].nunique()
+    )
+
+
+@cache_compartida(etiquetas=['evaluaciones:{db}', 'grupos:{db}', 'rubrica'])
+def resultados_analiticos(db_path: str = None) -> ResultadosAnaliticos:
+    """
+    Agregados del comité para un evento, calculados una vez por versión de
+    los datos y compartidos por todas las páginas y sesiones.
+
+    Args:
+        db_path: Base de datos del evento (por defecto la del evento actual)
+    """
+    return calcular_resultados(EvaluacionModel.obtener_todas_dataframe(db_path=db_path))
@@ -0,0 +1,297 @@
+"""
+Cálculo de premios de la gala
+
+Asigna categoría, umbral del Congo de Oro (percentil 75 de la categoría),
+premio y ranking a todos los grupos a la vez, con operaciones vectorizadas
+sobre la tabla consolidada de ambos eventos. Cada cálculo se guarda en
+premios_snapshot bajo la huella de sus entradas: mientras las notas no
+cambien, la vista lee el mismo resultado en lugar de recalcularlo.
+"""
+import hashlib
+import json
+import logging
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from src.database.models import PremiosSnapshotModel
+
+logger = logging.getLogger(__name__)
+
+# Ponderación de cada evento en la nota consolidada, por ficha
+PONDERACIONES = {
+    "CONGO": {"fin_semana": 0.60, "gran_parada": 0.40},
+    "CUMBIA": {"fin_semana": 0.60, "gran_parada": 0.40},
+    "GARABATO": {"fin_semana": 0.50, "gran_parada": 0.50},
+    "MAPALÉ": {"fin_semana": 0.60, "gran_parada": 0.40},
+    "MAPALE": {"fin_semana": 0.60, "gran_parada": 0.40},
+    "SON_DE_NEGRO": {"fin_semana": 1.00, "gran_parada": 0.00},
+    "COMPARSA_TRAD": {"fin_semana": 0.60, "gran_parada": 0.40},
+    "COMPARSA_FANT": {"fin_semana": 0.60, "gran_parada": 0.40},
+    "DANZAS_ESP": {"fin_semana": 1.00, "gran_parada": 0.00},
+    "DANZAS_REL": {"fin_semana": 1.00, "gran_parada": 0.00},
+    "EXPRESIONES_I": {"fin_semana": 1.00, "gran_parada": 0.00},
+}
+PONDERACION_POR_DEFECTO = {"fin_semana": 0.5, "gran_parada": 0.5}
+
+# Estado patrimonial de la nota consolidada
+UMBRAL_RIESGO = 0.8
+UMBRAL_MEJORA = 1.6
+
+# Premios, de mayor a menor
+CONGO_ORO = "CONGO DE ORO"
+MEDALLA_EXCELENCIA = "MEDALLA A LA EXCELENCIA"
+HONOR_FOLCLOR = "HONOR AL FOLCLOR"
+PARTICIPACION = "PARTICIPACIÓN"
+PREMIOS = [CONGO_ORO, MEDALLA_EXCELENCIA, HONOR_FOLCLOR, PARTICIPACION]
+
+# Reglas de asignación
+PERCENTIL_CONGO = 0.75
+UMBRAL_MEDALLA = 1.8
+UMBRAL_HONOR = 1.0
+
+# La cumbia compite por separado según el tamaño del grupo
+TAMANOS_CUMBIA = ['GRANDE', 'MEDIANO']
+
+# Incrementar al cambiar la forma de calcular los premios
+REGLAS_VERSION = 1
+
+COLUMNAS_ENTRADA = ['codigo_grupo', 'ficha_codigo', 'tamano', 'nota_consolidada',
+                    'promedio_fin', 'promedio_gran']
+
+
+def nota_consolidada(prom_fin: Optional[float], prom_gran: Optional[float], ficha: str,
+                     un_solo_evento: bool = False) -> Tuple[float, str]:
+    """
+    Nota ponderada de un grupo a partir de sus promedios en cada evento.
+
+    Args:
+        un_solo_evento: True si uno de los eventos aún no tiene evaluaciones;
+            la nota es entonces el promedio del evento disponible, sin ponderar
+
+    Returns:
+        Tupla (nota consolidada, eventos en los que participó)
+    """
+    if un_solo_evento:
+        if prom_fin is not None:
+            return prom_fin, "Fin de Semana"
+        return prom_gran or 0.0, "Gran Parada"
+
+    ponderaciones = PONDERACIONES.get(ficha, PONDERACION_POR_DEFECTO)
+
+    if prom_fin and prom_gran:
+        return prom_fin * ponderaciones['fin_semana'] + prom_gran * ponderaciones['gran_parada'], "Ambos"
+    if prom_fin or prom_gran is None:
+        return (prom_fin or 0.0) * ponderaciones['fin_semana'], "Fin de Semana"
+    return prom_gran * ponderaciones['gran_parada'], "Gran Parada"
+
+
+def notas_consolidadas(fin: np.ndarray, gran: np.ndarray,
+                       peso_fin: np.ndarray, peso_gran: np.ndarray,
+                       un_solo_evento: bool = False) -> np.ndarray:
+    """Versión vectorizada de nota_consolidada (mismo trato de promedios ausentes o en cero)"""
+    forma = np.broadcast(fin, gran, peso_fin, peso_gran).shape
+
+    if un_solo_evento:
+        return np.broadcast_to(np.where(np.isnan(fin), np.nan_to_num(gran), fin), forma).copy()
+
+    hay_fin = ~np.isnan(fin) & (fin != 0)
+    hay_gran = ~np.isnan(gran) & (gran != 0)
+    fin, gran = np.nan_to_num(fin), np.nan_to_num(gran)
+
+    return np.where(
+        hay_fin & hay_gran, fin * peso_fin + gran * peso_gran,
+        np.where(hay_fin | ~hay_gran, fin * peso_fin, gran * peso_gran)
+    )
+
+
+def un_solo_evento(df: pd.DataFrame) -> bool:
+    """True si en la tabla consolidada uno de los eventos aún no tiene evaluaciones"""
+    return bool(df['promedio_fin'].isna().all() or df['promedio_gran'].isna().all())
+
+
+def cuantil_por_fila(valores: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Cuantil q[i] de cada fila i (interpolación lineal, como pandas)"""
+    ordenados = np.sort(valores, axis=1)
+    posicion = q * (valores.shape[1] - 1)
+    abajo = np.floor(posicion).astype(int)
+    arriba = np.ceil(posicion).astype(int)
+    filas = np.arange(len(valores))
+    valor_abajo = ordenados[filas, abajo]
+    return valor_abajo + (ordenados[filas, arriba] - valor_abajo) * (posicion - abajo)
+
+
+def estado_nota(nota: float) -> str:
+    """Estado patrimonial (emoji) de una nota consolidada"""
+    if nota < UMBRAL_RIESGO:
+        return "🔴"
+    if nota < UMBRAL_MEJORA:
+        return "🟡"
+    return "🟢"
+
+
+def categoria_premio(ficha_codigo: str, tamano: Optional[str]) -> Optional[str]:
+    """Categoría de un grupo (ver categorias_premio); None si no compite"""
+    if ficha_codigo != 'CUMBIA':
+        return ficha_codigo
+    tamano = str(tamano or '')
+    return f'Cumbia {tamano.capitalize()}' if tamano in TAMANOS_CUMBIA else None
+
+
+def premio_para(nota: Optional[float], umbral: Optional[float]) -> str:
+    """Premio de una sola nota (ver asignar_premios)"""
+    if nota is None or pd.isna(nota):
+        return PARTICIPACION
+    if umbral is not None and nota >= umbral:
+        return CONGO_ORO
+    if nota >= UMBRAL_MEDALLA:
+        return MEDALLA_EXCELENCIA
+    if nota >= UMBRAL_HONOR:
+        return HONOR_FOLCLOR
+    return PARTICIPACION
+
+
+def categorias_premio(df: pd.DataFrame) -> pd.Series:
+    """
+    Categoría de cada grupo: la ficha, o 'Cumbia Grande'/'Cumbia Mediano'.
+    NaN para los grupos de cumbia sin tamaño válido (no compiten).
+    """
+    tamano = df['tamano'].fillna('').astype(str)
+    es_cumbia = df['ficha_codigo'] == 'CUMBIA'
+    categoria = df['ficha_codigo'].astype(object).where(~es_cumbia, 'Cumbia ' + tamano.str.capitalize())
+    return categoria.where(~es_cumbia | tamano.isin(TAMANOS_CUMBIA))
+
+
+def asignar_premios(nota, umbral, umbral_medalla=UMBRAL_MEDALLA, umbral_honor=UMBRAL_HONOR) -> np.ndarray:
+    """
+    Premio de cada nota según el umbral de su categoría y los cortes de
+    medalla y honor. Acepta Series o arreglos que se puedan transmitir
+    entre sí (p. ej. escenarios × grupos en el simulador).
+    """
+    return np.select(
+        [pd.isna(nota), nota >= umbral, nota >= umbral_medalla, nota >= umbral_honor],
+        [PARTICIPACION, CONGO_ORO, MEDALLA_EXCELENCIA, HONOR_FOLCLOR],
+        default=PARTICIPACION
+    )
+
+
+def calcular_premios(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula premios por categoría:
+    - Asigna categoria
+    - Calcula umbral (percentil 75)
+    - Asigna premio según nota
+    - Genera ranking por categoría
+
+    Args:
+        df: Tabla consolidada (una fila por grupo, con nota_consolidada)
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    df = df.assign(categoria=categorias_premio(df)).dropna(subset=['categoria'])
+
+    df['umbral_congo'] = (df
+        .groupby('categoria')['nota_consolidada']
+        .transform('quantile', q=PERCENTIL_CONGO)
+    )
+    df['premio'] = asignar_premios(df['nota_consolidada'], df['umbral_congo'])
+
+    df = df.sort_values(['categoria', 'nota_consolidada'], ascending=[True, False])
+    df['ranking'] = df.groupby('categoria').cumcount() + 1
+
+    return df.reset_index(drop=True)
+
+
+def calcular_congos_oro(df_premios: pd.DataFrame) -> pd.DataFrame:
+    """Congos de Oro (Top 25% de cada categoría) de un cálculo de premios"""
+    if df_premios.empty:
+        return pd.DataFrame()
+    return df_premios[df_premios['premio'] == CONGO_ORO].reset_index(drop=True)
+
+
+def resumen_por_categoria(df_premios: pd.DataFrame) -> pd.DataFrame:
+    """Totales, premios, promedio, umbral y estados por categoría"""
+    if df_premios.empty:
+        return pd.DataFrame()
+
+    claves = ['ficha_codigo', 'categoria']
+    base = df_premios.groupby(claves).agg(
+        Total=('codigo_grupo', 'size'),
+        Promedio=('nota_consolidada', 'mean'),
+        Umbral=('umbral_congo', 'first')
+    )
+    premios = (pd.crosstab([df_premios[c] for c in claves], df_premios['premio'])
+        .reindex(columns=PREMIOS, fill_value=0)
+        .rename(columns={
+            CONGO_ORO: 'Congos de Oro',
+            MEDALLA_EXCELENCIA: 'Medalla a la Excelencia',
+            HONOR_FOLCLOR: 'Honor al Folclor',
+            PARTICIPACION: 'Participación'
+        })
+    )
+    estados = (pd.crosstab([df_premios[c] for c in claves], df_premios['estado'])
+        .reindex(columns=['🟢', '🟡', '🔴'], fill_value=0)
+    )
+
+    resumen = base.join(premios).join(estados).reset_index(level='ficha_codigo', drop=True).reset_index()
+    return resumen.rename(columns={'categoria': 'Ficha'})[[
+        'Ficha', 'Total', 'Congos de Oro', 'Medalla a la Excelencia', 'Honor al Folclor',
+        'Participación', 'Promedio', 'Umbral', '🟢', '🟡', '🔴'
+    ]]
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SNAPSHOTS
+# ═══════════════════════════════════════════════════════════════════
+
+def huella_entradas(df: pd.DataFrame) -> str:
+    """
+    Hash de las notas consolidadas y de las reglas de premiación.
+    Cambia si cambia cualquier nota, grupo, ponderación aplicada o regla.
+    """
+    columnas = [columna for columna in COLUMNAS_ENTRADA if columna in df.columns]
+    datos = df[columnas].sort_values(['codigo_grupo', 'ficha_codigo']).reset_index(drop=True)
+
+    huella = hashlib.sha256()
+    huella.update(pd.util.hash_pandas_object(datos, index=False).to_numpy().tobytes())
+    huella.update(json.dumps({
+        'reglas': REGLAS_VERSION,
+        'percentil': PERCENTIL_CONGO,
+        'medalla': UMBRAL_MEDALLA,
+        'honor': UMBRAL_HONOR,
+        'tamanos_cumbia': TAMANOS_CUMBIA
+    }, sort_keys=True).encode())
+    return huella.hexdigest()
+
+
+def premios_vigentes(df: pd.DataFrame, recalcular: bool = False,
+                     db_path: str = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Premios de la tabla consolidada: del snapshot guardado para estas
+    entradas o, si no existe, calculados en memoria sin guardar. Solo
+    recalcular=True (acción explícita del comité) calcula y guarda un snapshot,
+    de modo que ver la página no escribe en la base de datos.
+
+    Returns:
+        Tupla (premios con fecha_registro del cálculo guardado o None si no
+        está guardado, huella de las entradas)
+    """
+    if df.empty:
+        return pd.DataFrame(), ""
+
+    huella = huella_entradas(df)
+
+    if not recalcular:
+        df_premios = PremiosSnapshotModel.obtener(huella, db_path)
+        if not df_premios.empty:
+            return df_premios, huella
+        return calcular_premios(df).assign(fecha_registro=None), huella
+
+    df_premios = calcular_premios(df)
+    if PremiosSnapshotModel.guardar(df_premios, huella, db_path):
+        guardado = PremiosSnapshotModel.obtener(huella, db_path)
+        if not guardado.empty:
+            return guardado, huella
+
+    logger.warning("No se pudo leer el snapshot de premios recién guardado; se usa el cálculo en memoria")
+    return df_premios.assign(fecha_registro=pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')), huella
@@ -0,0 +1,342 @@
+"""
+Clasificación en vivo de la gala
+
+Mantiene, por categoría, la lista ordenada de notas consolidadas y la
+actualiza con cada evaluación que llega, sin recalcular la tabla completa:
+en cada refresco solo se leen los cambios de journal_cambios posteriores al
+último aplicado. La posición de un grupo y el umbral del Congo de Oro
+(percentil 75) de su categoría se obtienen en O(log n).
+
+Si el journal no alcanza (retención, cambios de grupos, fichas nuevas), el
+evento afectado se reconstruye completo desde la base de datos.
+"""
+import json
+import logging
+import math
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from sortedcontainers import SortedKeyList
+from src.database.cache import token_cambios
+from src.analytics.premios import (
+    PERCENTIL_CONGO, categoria_premio, estado_nota, nota_consolidada, premio_para
+)
+
+logger = logging.getLogger(__name__)
+
+EVENTOS = ('fin_semana', 'gran_parada')
+
+# (codigo_grupo, ficha_codigo)
+Clave = Tuple[str, str]
+
+
+class ReconstruccionNecesaria(Exception):
+    """El journal no basta para actualizar el evento de forma incremental"""
+
+
+@dataclass
+class EstadoEvento:
+    """Evaluaciones de un evento ya aplicadas a la clasificación"""
+    ruta: str
+    token: tuple = None
+    cursor: int = 0                                                    # último id de journal_cambios aplicado
+    fichas: Dict[int, str] = field(default_factory=dict)               # ficha_id → código
+    grupos: Dict[str, tuple] = field(default_factory=dict)             # codigo → (nombre_propuesta, tamano)
+    evaluaciones: Dict[int, tuple] = field(default_factory=dict)       # id → (codigo_grupo, ficha_codigo, resultado)
+    sumas: Dict[Clave, List[int]] = field(default_factory=dict)        # clave → [suma, cantidad]
+
+    def promedio(self, clave: Clave) -> Optional[float]:
+        suma, cantidad = self.sumas.get(clave, (0, 0))
+        return suma / cantidad if cantidad else None
+
+    def agregar(self, id_eval: int, codigo: str, ficha: str, resultado: int) -> Clave:
+        # Idempotente: una evaluación ya contada (p. ej. leída al reconstruir) se reemplaza
+        self.quitar(id_eval)
+        clave = (codigo, ficha)
+        self.evaluaciones[id_eval] = (codigo, ficha, resultado)
+        acumulado = self.sumas.setdefault(clave, [0, 0])
+        acumulado[0] += resultado
+        acumulado[1] += 1
+        return clave
+
+    def quitar(self, id_eval: int) -> Optional[Clave]:
+        anterior = self.evaluaciones.pop(id_eval, None)
+        if anterior is None:
+            return None
+        codigo, ficha, resultado = anterior
+        clave = (codigo, ficha)
+        acumulado = self.sumas[clave]
+        acumulado[0] -= resultado
+        acumulado[1] -= 1
+        if acumulado[1] == 0:
+            del self.sumas[clave]
+        return clave
+
+
+class RankingIncremental:
+    """Notas consolidadas por categoría, ordenadas de mayor a menor, seguras entre hilos"""
+
+    def __init__(self, db_fin_semana: str, db_gran_parada: str):
+        self._eventos = {
+            'fin_semana': EstadoEvento(ruta=db_fin_semana),
+            'gran_parada': EstadoEvento(ruta=db_gran_parada),
+        }
+        self._notas: Dict[Clave, Tuple[str, float, str]] = {}           # clave → (categoria, nota, participacion)
+        self._categorias: Dict[str, SortedKeyList] = {}                 # categoria → [(nota, codigo, ficha)]
+        self._lock = threading.RLock()
+        self._un_solo_evento = False
+        self.version = 0
+        self.actualizado: Optional[datetime] = None
+
+    # ─── Lectura ────────────────────────────────────────────────────
+
+    @property
+    def categorias(self) -> List[str]:
+        with self._lock:
+            return sorted(categoria for categoria, lista in self._categorias.items() if lista)
+
+    def umbral(self, categoria: str) -> Optional[float]:
+        """Percentil 75 de la categoría (interpolación lineal, como pandas)"""
+        with self._lock:
+            lista = self._categorias.get(categoria)
+            if not lista:
+                return None
+            # La lista está en orden descendente: el i-ésimo ascendente es lista[n-1-i]
+            n = len(lista)
+            posicion = PERCENTIL_CONGO * (n - 1)
+            abajo, arriba = math.floor(posicion), math.ceil(posicion)
+            valor_abajo = lista[n - 1 - abajo][0]
+            valor_arriba = lista[n - 1 - arriba][0]
+            return valor_abajo + (valor_arriba - valor_abajo) * (posicion - abajo)
+
+    def posicion(self, codigo_grupo: str, ficha_codigo: str) -> Optional[dict]:
+        """Categoría, puesto, nota, umbral y premio actuales de un grupo"""
+        with self._lock:
+            registro = self._notas.get((codigo_grupo, ficha_codigo))
+            if registro is None:
+                return None
+            categoria, nota, _ = registro
+            lista = self._categorias[categoria]
+            umbral = self.umbral(categoria)
+            return {
+                'categoria': categoria,
+                'ranking': lista.index((nota, codigo_grupo, ficha_codigo)) + 1,
+                'total': len(lista),
+                'nota_consolidada': nota,
+                'umbral_congo': umbral,
+                'premio': premio_para(nota, umbral),
+            }
+
+    def clasificacion(self, categoria: str) -> pd.DataFrame:
+        """Tabla de la categoría en orden de puesto"""
+        with self._lock:
+            lista = self._categorias.get(categoria)
+            if not lista:
+                return pd.DataFrame()
+            umbral = self.umbral(categoria)
+            filas = []
+            for ranking, (nota, codigo, ficha) in enumerate(lista, start=1):
+                nombre, _ = self._info_grupo((codigo, ficha))
+                filas.append({
+                    'ranking': ranking,
+                    'codigo_grupo': codigo,
+                    'nombre_propuesta': nombre,
+                    'ficha_codigo': ficha,
+                    'promedio_fin': self._eventos['fin_semana'].promedio((codigo, ficha)),
+                    'promedio_gran': self._eventos['gran_parada'].promedio((codigo, ficha)),
+                    'nota_consolidada': nota,
+                    'participacion': self._notas[(codigo, ficha)][2],
+                    'estado': estado_nota(nota),
+                    'premio': premio_para(nota, umbral),
+                })
+            return pd.DataFrame(filas)
+
+    # ─── Actualización ──────────────────────────────────────────────
+
+    def actualizar(self) -> int:
+        """
+        Aplica los cambios ocurridos desde la última llamada.
+
+        Returns:
+            Cantidad de grupos cuya nota cambió
+        """
+        with self._lock:
+            afectadas = set()
+            reconstruido = False
+
+            for evento in EVENTOS:
+                estado = self._eventos[evento]
+                if not estado.ruta:
+                    continue
+                token = token_cambios(estado.ruta)
+                if token == estado.token:
+                    continue
+
+                # Si el journal falla a mitad de camino, lo aplicado hasta ahí se descarta
+                anteriores = set(estado.sumas)
+                try:
+                    with closing(sqlite3.connect(estado.ruta)) as conn:
+                        try:
+                            if estado.token is None:
+                                raise ReconstruccionNecesaria("primera carga")
+                            afectadas |= self._aplicar_journal(conn, estado)
+                        except ReconstruccionNecesaria as motivo:
+                            logger.info(f"Ranking en vivo: reconstruyendo {evento} ({motivo})")
+                            afectadas |= anteriores | self._reconstruir(conn, estado)
+                            reconstruido = True
+                    estado.token = token
+                except sqlite3.Error as e:
+                    logger.error(f"Error actualizando ranking en vivo ({evento}): {e}")
+
+            # Con un solo evento evaluado la nota es su promedio sin ponderar
+            # (ver nota_consolidada): al cambiar de modo cambian todas las notas
+            un_solo_evento = not all(estado.sumas for estado in self._eventos.values())
+            cambio_modo = un_solo_evento != self._un_solo_evento
+            self._un_solo_evento = un_solo_evento
+
+            if reconstruido or cambio_modo:
+                # El tamaño de un grupo puede venir del otro evento: se reubican todos
+                afectadas |= set(self._notas)
+                for estado in self._eventos.values():
+                    afectadas |= set(estado.sumas)
+
+            for clave in afectadas:
+                self._recalcular(clave)
+
+            if afectadas:
+                self.version += 1
+            self.actualizado = datetime.now()
+            return len(afectadas)
+
+    def _reconstruir(self, conn: sqlite3.Connection, estado: EstadoEvento) -> set:
+        """
+        Vuelve a leer todas las evaluaciones del evento.
+
+        El cursor del journal y las tablas se leen en una misma transacción de
+        lectura: una escritura entre ambas lecturas se contaría dos veces (en
+        las evaluaciones y de nuevo al aplicar el journal).
+        """
+        conn.execute("BEGIN")
+        try:
+            fila = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'journal_cambios'"
+            ).fetchone()
+
+            estado.cursor = fila[0] if fila else 0
+            estado.fichas = dict(conn.execute("SELECT id, codigo FROM fichas").fetchall())
+            estado.grupos = {
+                codigo: (nombre, tamano)
+                for codigo, nombre, tamano in conn.execute("SELECT codigo, nombre_propuesta, tamano FROM grupos")
+            }
+            estado.evaluaciones = {}
+            estado.sumas = {}
+
+            for id_eval, codigo, ficha_id, resultado in conn.execute("""
+                SELECT e.id, e.codigo_grupo, e.ficha_id, e.resultado
+                FROM evaluaciones e
+                JOIN grupos g ON e.codigo_grupo = g.codigo
+            """):
+                ficha = estado.fichas.get(ficha_id)
+                if ficha is not None:
+                    estado.agregar(id_eval, codigo, ficha, resultado)
+        finally:
+            conn.commit()
+
+        return set(estado.sumas)
+
+    def _aplicar_journal(self, conn: sqlite3.Connection, estado: EstadoEvento) -> set:
+        """
+        Aplica las filas de journal_cambios posteriores al cursor.
+
+        Raises:
+            ReconstruccionNecesaria: Si falta parte del journal o cambió algo
+                que no se puede aplicar fila a fila
+        """
+        try:
+            primero = conn.execute("SELECT MIN(id) FROM journal_cambios").fetchone()[0]
+        except sqlite3.OperationalError:
+            raise ReconstruccionNecesaria("la base de datos no tiene journal")
+        if primero is not None and primero > estado.cursor + 1:
+            raise ReconstruccionNecesaria("journal recortado por la retención")
+
+        cambios = conn.execute("""
+            SELECT id, tabla, operacion, clave, datos
+            FROM journal_cambios
+            WHERE id > ? AND tabla IN ('evaluaciones', 'grupos')
+            ORDER BY id
+        """, (estado.cursor,)).fetchall()
+
+        afectadas = set()
+        for id_cambio, tabla, operacion, clave, datos in cambios:
+            if tabla == 'grupos':
+                raise ReconstruccionNecesaria("cambiaron los grupos")
+
+            # También en INSERT: la evaluación puede estar ya contada por una reconstrucción
+            id_eval = int(clave)
+            anterior = estado.quitar(id_eval)
+            if anterior is not None:
+                afectadas.add(anterior)
+
+            if operacion in ('INSERT', 'UPDATE'):
+                fila = json.loads(datos)
+                ficha = estado.fichas.get(fila['ficha_id'])
+                if ficha is None or fila['codigo_grupo'] not in estado.grupos:
+                    raise ReconstruccionNecesaria("ficha o grupo desconocido")
+                afectadas.add(estado.agregar(fila['id'], fila['codigo_grupo'], ficha, fila['resultado']))
+
+            estado.cursor = id_cambio
+
+        return afectadas
+
+    def _info_grupo(self, clave: Clave) -> tuple:
+        """Nombre y tamaño del grupo, tomados del primer evento en que fue evaluado"""
+        for evento in EVENTOS:
+            estado = self._eventos[evento]
+            if clave in estado.sumas and clave[0] in estado.grupos:
+                return estado.grupos[clave[0]]
+        return clave[0], None
+
+    def _recalcular(self, clave: Clave) -> None:
+        """Recalcula la nota de un grupo y lo reubica en su categoría"""
+        codigo, ficha = clave
+
+        anterior = self._notas.pop(clave, None)
+        if anterior is not None:
+            self._categorias[anterior[0]].discard((anterior[1], codigo, ficha))
+
+        prom_fin = self._eventos['fin_semana'].promedio(clave)
+        prom_gran = self._eventos['gran_parada'].promedio(clave)
+        if prom_fin is None and prom_gran is None:
+            return
+
+        _, tamano = self._info_grupo(clave)
+        categoria = categoria_premio(ficha, tamano)
+        if categoria is None:
+            return
+
+        nota, participacion = nota_consolidada(prom_fin, prom_gran, ficha, self._un_solo_evento)
+        self._notas[clave] = (categoria, nota, participacion)
+        if categoria not in self._categorias:
+            self._categorias[categoria] = SortedKeyList(key=lambda item: (-item[0], item[1], item[2]))
+        self._categorias[categoria].add((nota, codigo, ficha))
+
+
+# ═══════════════════════════════════════════════════════════════════
+# INSTANCIA COMPARTIDA
+# ═══════════════════════════════════════════════════════════════════
+
+_rankings: Dict[tuple, RankingIncremental] = {}
+_rankings_lock = threading.Lock()
+
+
+def obtener_ranking(db_fin_semana: str, db_gran_parada: str) -> RankingIncremental:
+    """Clasificación en vivo de un par de bases de datos, compartida por todas las sesiones"""
+    clave = (db_fin_semana, db_gran_parada)
+    with _rankings_lock:
+        if clave not in _rankings:
+            _rankings[clave] = RankingIncremental(db_fin_semana, db_gran_parada)
+        return _rankings[clave]
@@ -0,0 +1,182 @@
+"""
+Simulador de escenarios de premiación
+
+Evalúa a la vez muchas combinaciones de ponderaciones por ficha y umbrales
+(percentil del Congo de Oro, cortes de medalla y honor, estados
+patrimoniales) sobre la tabla consolidada. Las notas, umbrales y premios se
+calculan como matrices escenarios × grupos con transmisión (broadcasting) de
+NumPy: cientos de escenarios tardan lo mismo que unas pocas pasadas sobre
+los grupos. El primer escenario es siempre el de las reglas vigentes, y los
+cambios de premio se reportan respecto a él.
+"""
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+import numpy as np
+import pandas as pd
+from src.analytics.premios import (
+    PONDERACIONES, PONDERACION_POR_DEFECTO, PERCENTIL_CONGO, UMBRAL_MEDALLA, UMBRAL_HONOR,
+    UMBRAL_RIESGO, UMBRAL_MEJORA, PREMIOS, asignar_premios, categorias_premio,
+    notas_consolidadas, cuantil_por_fila, un_solo_evento
+)
+
+# Límite de escenarios por simulación (la rejilla crece como un producto)
+MAX_ESCENARIOS = 2000
+
+# Premio → columna del resumen (mismos nombres que resumen_por_categoria)
+COLUMNAS_PREMIO = ['Congos de Oro', 'Medalla a la Excelencia', 'Honor al Folclor', 'Participación']
+ESTADOS = ['🟢', '🟡', '🔴']
+
+
+@dataclass
+class Escenario:
+    """Ponderaciones y umbrales de una simulación; lo que no se indique queda como hoy"""
+    nombre: str
+    ponderaciones: Dict[str, Dict[str, float]] = field(default_factory=dict)   # ficha → {fin_semana, gran_parada}
+    percentil: float = PERCENTIL_CONGO
+    umbral_medalla: float = UMBRAL_MEDALLA
+    umbral_honor: float = UMBRAL_HONOR
+    umbral_riesgo: float = UMBRAL_RIESGO
+    umbral_mejora: float = UMBRAL_MEJORA
+
+    def ponderacion(self, ficha: str) -> Dict[str, float]:
+        return self.ponderaciones.get(ficha) or PONDERACIONES.get(ficha, PONDERACION_POR_DEFECTO)
+
+
+ESCENARIO_ACTUAL = Escenario("Actual")
+
+
+def rejilla_escenarios(pesos_fin: Dict[str, Sequence[float]] = None,
+                       percentiles: Sequence[float] = (PERCENTIL_CONGO,),
+                       umbrales_medalla: Sequence[float] = (UMBRAL_MEDALLA,),
+                       umbrales_honor: Sequence[float] = (UMBRAL_HONOR,),
+                       umbrales_riesgo: Sequence[float] = (UMBRAL_RIESGO,),
+                       umbrales_mejora: Sequence[float] = (UMBRAL_MEJORA,)) -> List[Escenario]:
+    """
+    Todas las combinaciones de los valores indicados.
+
+    Args:
+        pesos_fin: ficha → pesos de Fin de Semana a probar (Gran Parada = 1 - peso)
+        percentiles: Percentiles del Congo de Oro
+        umbrales_medalla: Cortes de la Medalla a la Excelencia
+        umbrales_honor: Cortes del Honor al Folclor
+        umbrales_riesgo: Notas bajo las cuales el estado es 🔴
+        umbrales_mejora: Notas bajo las cuales el estado es 🟡 (se omiten las menores que el de riesgo)
+    """
+    pesos_fin = pesos_fin or {}
+    fichas = list(pesos_fin)
+
+    escenarios = []
+    for *pesos, percentil, medalla, honor, riesgo, mejora in itertools.product(
+        *(pesos_fin[ficha] for ficha in fichas), percentiles, umbrales_medalla, umbrales_honor,
+        umbrales_riesgo, umbrales_mejora
+    ):
+        if mejora < riesgo:
+            continue
+        ponderaciones = {
+            ficha: {'fin_semana': peso, 'gran_parada': round(1 - peso, 6)}
+            for ficha, peso in zip(fichas, pesos)
+        }
+        nombre = " · ".join(
+            [f"{ficha} {peso:.0%}/{1 - peso:.0%}" for ficha, peso in zip(fichas, pesos)]
+            + [f"P{percentil * 100:g}", f"🥇≥{medalla:g}", f"📜≥{honor:g}", f"🔴<{riesgo:g}", f"🟡<{mejora:g}"]
+        )
+        escenarios.append(Escenario(nombre, ponderaciones, percentil, medalla, honor, riesgo, mejora))
+    return escenarios
+
+
+def _orden_premios(premios: np.ndarray) -> np.ndarray:
+    """Posición de cada premio en PREMIOS (0 = Congo de Oro)"""
+    return np.select([premios == premio for premio in PREMIOS], list(range(len(PREMIOS))), default=len(PREMIOS))
+
+
+@dataclass
+class ResultadoSimulacion:
+    """Matrices escenarios × grupos de una simulación (fila 0 = reglas vigentes)"""
+    escenarios: List[Escenario]
+    grupos: pd.DataFrame       # codigo_grupo, nombre_propuesta, ficha_codigo, categoria
+    notas: np.ndarray
+    umbrales: np.ndarray       # umbral del Congo de Oro de la categoría de cada grupo
+    premios: np.ndarray
+    estados: np.ndarray
+
+    def resumen(self) -> pd.DataFrame:
+        """Por escenario: premios, estados y cuántos grupos cambian de premio"""
+        orden = _orden_premios(self.premios)
+        resumen = pd.DataFrame({'Escenario': [escenario.nombre for escenario in self.escenarios]})
+
+        for premio, columna in zip(PREMIOS, COLUMNAS_PREMIO):
+            resumen[columna] = (self.premios == premio).sum(axis=1)
+        for estado in ESTADOS:
+            resumen[estado] = (self.estados == estado).sum(axis=1)
+
+        resumen['Cambian'] = (orden != orden[0]).sum(axis=1)
+        resumen['Suben'] = (orden < orden[0]).sum(axis=1)
+        resumen['Bajan'] = (orden > orden[0]).sum(axis=1)
+        return resumen
+
+    def cambios(self) -> pd.DataFrame:
+        """Una fila por escenario y grupo cuyo premio difiere del actual"""
+        orden = _orden_premios(self.premios)
+        escenario, grupo = np.nonzero(orden != orden[0])
+
+        cambios = self.grupos.iloc[grupo].reset_index(drop=True)
+        cambios.insert(0, 'escenario', np.array([e.nombre for e in self.escenarios], dtype=object)[escenario])
+        return cambios.assign(
+            nota_actual=self.notas[0, grupo],
+            nota_simulada=self.notas[escenario, grupo],
+            umbral_simulado=self.umbrales[escenario, grupo],
+            premio_actual=self.premios[0, grupo],
+            premio_simulado=self.premios[escenario, grupo],
+            cambio=np.where(orden[escenario, grupo] < orden[0, grupo], '⬆️', '⬇️')
+        )
+
+
+def simular(df_consolidado: pd.DataFrame, escenarios: Sequence[Escenario]) -> ResultadoSimulacion:
+    """
+    Calcula notas, umbrales, premios y estados de todos los grupos en cada
+    escenario (más el actual, que queda en la fila 0). Si uno de los eventos
+    aún no tiene evaluaciones, la nota es el promedio del otro y las
+    ponderaciones no influyen (ver nota_consolidada).
+
+    Args:
+        df_consolidado: Tabla consolidada (una fila por grupo, con promedio_fin y promedio_gran)
+        escenarios: Escenarios a evaluar (ver rejilla_escenarios)
+    """
+    escenarios = [ESCENARIO_ACTUAL, *escenarios]
+
+    df = df_consolidado.assign(categoria=categorias_premio(df_consolidado)).dropna(subset=['categoria'])
+    grupos = df[['codigo_grupo', 'nombre_propuesta', 'ficha_codigo', 'categoria']].reset_index(drop=True)
+
+    # Pesos por escenario y ficha (S × F × 2), llevados a cada grupo (S × G)
+    fichas, ficha_grupo = np.unique(grupos['ficha_codigo'].astype(str).to_numpy(), return_inverse=True)
+    pesos = np.array([
+        [[escenario.ponderacion(ficha)['fin_semana'], escenario.ponderacion(ficha)['gran_parada']] for ficha in fichas]
+        for escenario in escenarios
+    ]).reshape(len(escenarios), len(fichas), 2)
+
+    notas = notas_consolidadas(
+        df['promedio_fin'].to_numpy(dtype=float),
+        df['promedio_gran'].to_numpy(dtype=float),
+        pesos[:, ficha_grupo, 0],
+        pesos[:, ficha_grupo, 1],
+        un_solo_evento(df)
+    )
+
+    def por_escenario(atributo: str) -> np.ndarray:
+        return np.array([getattr(escenario, atributo) for escenario in escenarios], dtype=float)[:, None]
+
+    # Umbral del Congo de Oro: cuantil de cada categoría, para todos los escenarios a la vez
+    umbrales = np.empty_like(notas)
+    categorias, categoria_grupo = np.unique(grupos['categoria'].to_numpy(dtype=str), return_inverse=True)
+    for indice in range(len(categorias)):
+        columnas = np.flatnonzero(categoria_grupo == indice)
+        umbrales[:, columnas] = cuantil_por_fila(notas[:, columnas], por_escenario('percentil')[:, 0])[:, None]
+
+    premios = asignar_premios(notas, umbrales, por_escenario('umbral_medalla'), por_escenario('umbral_honor'))
+    estados = np.select(
+        [notas < por_escenario('umbral_riesgo'), notas < por_escenario('umbral_mejora')],
+        ['🔴', '🟡'], default='🟢'
+    )
+
+    return ResultadoSimulacion(escenarios, grupos, notas, umbrales, premios, estados)
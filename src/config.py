@@ -15,9 +15,11 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 ASSETS_DIR = BASE_DIR / "assets"
 LOGS_DIR = BASE_DIR / "logs"
+CACHE_DIR = BASE_DIR / "cache"
+BACKUPS_DIR = BASE_DIR / "backups"
 
 # Crear directorios si no existen
-for directory in [DATA_DIR, ASSETS_DIR, LOGS_DIR]:
+for directory in [DATA_DIR, ASSETS_DIR, LOGS_DIR, CACHE_DIR, BACKUPS_DIR]:
     directory.mkdir(exist_ok=True)
 
 
@@ -61,10 +63,24 @@ class ConfiguracionApp:
     # Parámetros de validación
     min_caracteres_observacion: int = field(default_factory=lambda: int(os.getenv("MIN_CARACTERES_OBSERVACION", "5")))
     max_grupos_por_curador: int = field(default_factory=lambda: int(os.getenv("MAX_GRUPOS_POR_CURADOR", "500")))
+    evaluaciones_por_grupo: int = field(default_factory=lambda: int(os.getenv("EVALUACIONES_POR_GRUPO", "3")))
     
     # Umbrales patrimoniales
     umbrales: UmbralesPatrimoniales = field(default_factory=UmbralesPatrimoniales)
     
+    # Rendimiento
+    max_bytes_grafico: int = field(default_factory=lambda: int(os.getenv("MAX_BYTES_GRAFICO", "200000")))
+    max_exportaciones_cache: int = field(default_factory=lambda: int(os.getenv("MAX_EXPORTACIONES_CACHE", "50")))
+    max_informes_cache: int = field(default_factory=lambda: int(os.getenv("MAX_INFORMES_CACHE", "2000")))
+    max_backups: int = field(default_factory=lambda: int(os.getenv("MAX_BACKUPS", "20")))
+    snapshot_intervalo_min: float = field(default_factory=lambda: float(os.getenv("SNAPSHOT_INTERVALO_MIN", "30")))  # 0 = desactivado
+    snapshot_retencion: int = field(default_factory=lambda: int(os.getenv("SNAPSHOT_RETENCION", "12")))
+    premios_snapshot_retencion: int = field(default_factory=lambda: int(os.getenv("PREMIOS_SNAPSHOT_RETENCION", "20")))
+    procesos_informes: int = field(default_factory=lambda: int(os.getenv("PROCESOS_INFORMES", "0")))  # 0 = núcleos disponibles
+    bootstrap_replicas: int = field(default_factory=lambda: int(os.getenv("BOOTSTRAP_REPLICAS", "2000")))
+    procesos_bootstrap: int = field(default_factory=lambda: int(os.getenv("PROCESOS_BOOTSTRAP", "0")))  # 0 = núcleos disponibles
+    ranking_refresco_seg: float = field(default_factory=lambda: float(os.getenv("RANKING_REFRESCO_SEG", "10")))  # 0 = solo manual
+    
 
 
 # Instancia global de configuración
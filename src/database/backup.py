@@ -0,0 +1,149 @@
+"""
+Backups en línea de la base de datos
+
+Usa la API de backup de SQLite por pasos de páginas: entre un paso y otro se
+libera el bloqueo, de modo que los curadores pueden seguir registrando
+evaluaciones mientras se copia. La copia se verifica con PRAGMA integrity_check
+y se comprime en disco (sin cargar la base de datos en memoria).
+"""
+import os
+import sqlite3
+import logging
+import tempfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from src.config import config, BACKUPS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Páginas copiadas por paso y pausa entre pasos (segundos)
+PAGINAS_POR_PASO = 256
+PAUSA_ENTRE_PASOS = 0.01
+
+
+def copiar_base_datos(destino: str, db_path: str = None,
+                      progreso: Callable[[int, int], None] = None) -> None:
+    """
+    Copia consistente de la base de datos con sqlite3.Connection.backup.
+
+    Args:
+        destino: Ruta del archivo .db de destino
+        db_path: Base de datos de origen (por defecto la del evento actual)
+        progreso: Función opcional progreso(paginas_copiadas, paginas_totales)
+
+    Raises:
+        sqlite3.Error: Si la copia falla
+    """
+    db_path = db_path or config.db_path
+
+    def _reportar(estado, restantes, totales):
+        if progreso and totales:
+            progreso(totales - restantes, totales)
+
+    origen = sqlite3.connect(db_path)
+    copia = sqlite3.connect(destino)
+    try:
+        origen.backup(copia, pages=PAGINAS_POR_PASO, progress=_reportar, sleep=PAUSA_ENTRE_PASOS)
+    finally:
+        copia.close()
+        origen.close()
+
+
+def verificar_integridad(ruta: str) -> Tuple[bool, str]:
+    """
+    Ejecuta PRAGMA integrity_check sobre un archivo de base de datos.
+
+    Returns:
+        Tupla (es_valida, resultado del chequeo)
+    """
+    try:
+        conn = sqlite3.connect(ruta)
+        try:
+            filas = conn.execute("PRAGMA integrity_check").fetchall()
+        finally:
+            conn.close()
+
+        resultado = "; ".join(str(fila[0]) for fila in filas)
+        return resultado == "ok", resultado
+
+    except sqlite3.Error as e:
+        return False, str(e)
+
+
+def crear_backup(db_path: str = None, incluir_excel: bool = True,
+                 progreso: Callable[[int, int], None] = None) -> Tuple[Optional[Path], Optional[str]]:
+    """
+    Crea un backup comprimido y verificado en BACKUPS_DIR.
+
+    Args:
+        db_path: Base de datos a respaldar (por defecto la del evento actual)
+        incluir_excel: Agregar el Excel de propuestas si existe
+        progreso: Función opcional progreso(paginas_copiadas, paginas_totales)
+
+    Returns:
+        Tupla (ruta del ZIP, mensaje de error). Uno de los dos es None.
+    """
+    db_path = Path(db_path or config.db_path)
+    if not db_path.exists():
+        return None, "Archivo de base de datos no encontrado"
+
+    BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
+    marca = datetime.now().strftime("%Y%m%d_%H%M%S")
+    destino = BACKUPS_DIR / f"backup_{db_path.stem}_{marca}.zip"
+
+    descriptor, copia = tempfile.mkstemp(prefix="backup_", suffix=".db", dir=BACKUPS_DIR)
+    os.close(descriptor)
+
+    try:
+        # 1. Copia consistente mientras la aplicación sigue escribiendo
+        copiar_base_datos(copia, str(db_path), progreso)
+
+        # 2. Verificación de la copia
+        valida, resultado = verificar_integridad(copia)
+        if not valida:
+            logger.error(f"❌ Backup inválido ({db_path.name}): {resultado}")
+            return None, f"La copia no pasó la verificación de integridad: {resultado}"
+
+        # 3. Compresión en disco (zipfile lee el archivo por bloques)
+        temporal_zip = destino.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(temporal_zip, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.write(copia, db_path.name)
+
+            excel_path = config.excel_path
+            if incluir_excel and os.path.exists(excel_path):
+                zip_file.write(excel_path, os.path.basename(excel_path))
+
+        os.replace(temporal_zip, destino)
+        logger.info(f"✅ Backup creado: {destino}")
+
+        podar_backups()
+        return destino, None
+
+    except Exception as e:
+        logger.exception(f"❌ Error creando backup: {e}")
+        return None, str(e)
+
+    finally:
+        if os.path.exists(copia):
+            os.remove(copia)
+
+
+def listar_backups() -> List[Path]:
+    """Backups existentes, del más reciente al más antiguo"""
+    if not BACKUPS_DIR.exists():
+        return []
+    return sorted(BACKUPS_DIR.glob("backup_*.zip"), key=lambda ruta: ruta.stat().st_mtime, reverse=True)
+
+
+def podar_backups(max_backups: int = None) -> None:
+    """Elimina los backups más antiguos por encima del límite configurado"""
+    max_backups = max_backups or config.max_backups
+
+    for ruta in listar_backups()[max_backups:]:
+        try:
+            ruta.unlink()
+            logger.info(f"Backup antiguo eliminado: {ruta.name}")
+        except OSError as e:
+            logger.warning(f"No se pudo eliminar {ruta.name}: {e}")
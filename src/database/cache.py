@@ -0,0 +1,245 @@
+"""
+Caché de datos derivados de la base de datos, invalidada por cambios
+
+En lugar de expirar por tiempo (TTL), la clave de caché incluye un token de
+cambios barato de calcular: mientras los datos no cambian se reutiliza el
+resultado indefinidamente, y cualquier escritura confirmada lo invalida de
+inmediato.
+
+Además, cada función puede declarar etiquetas ('grupos', 'rubrica',
+'evaluaciones:<db>', ...). invalidar() incrementa la generación de una
+etiqueta, que también forma parte de la clave: las escrituras que la base de
+datos no refleja por sí sola (p. ej. el Excel del catálogo) recalculan solo
+las funciones afectadas en vez de vaciar toda la caché con st.cache_data.clear().
+"""
+import copy
+import functools
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, Union
+import streamlit as st
+from src.config import config
+from src.utils.vuelo_unico import CacheCompartida
+
+logger = logging.getLogger(__name__)
+
+# Conexiones de solo lectura que se mantienen abiertas para observar cambios:
+# PRAGMA data_version solo cambia entre lecturas de una misma conexión.
+_conexiones_vigia: Dict[str, sqlite3.Connection] = {}
+_lock_vigia = threading.Lock()
+
+
+def _conexion_vigia(db_path: str) -> sqlite3.Connection:
+    """Conexión persistente (una por base de datos) usada solo para leer el token."""
+    conn = _conexiones_vigia.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        _conexiones_vigia[db_path] = conn
+    return conn
+
+
+def token_cambios(db_path) -> tuple:
+    """
+    Token que cambia con cada escritura confirmada en la base de datos.
+
+    Combina:
+        - tamaño y fecha de modificación del archivo
+        - PRAGMA data_version (cambia cuando otra conexión confirma una escritura)
+        - sqlite_sequence (último id de evaluaciones, envios, journal_cambios, ...)
+
+    Returns:
+        Tupla comparable; (ruta, None) si el archivo no existe
+    """
+    db_path = str(db_path)
+
+    try:
+        estado = os.stat(db_path)
+    except OSError:
+        return (db_path, None)
+
+    with _lock_vigia:
+        try:
+            conn = _conexion_vigia(db_path)
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            try:
+                secuencias = tuple(conn.execute("SELECT name, seq FROM sqlite_sequence ORDER BY name").fetchall())
+            except sqlite3.OperationalError:
+                # Base de datos sin tablas AUTOINCREMENT
+                secuencias = ()
+        except sqlite3.Error as e:
+            logger.warning(f"No se pudo leer el token de cambios de {db_path}: {e}")
+            _conexiones_vigia.pop(db_path, None)
+            data_version, secuencias = None, ()
+
+    return (db_path, estado.st_mtime_ns, estado.st_size, data_version, secuencias)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ETIQUETAS
+# ═══════════════════════════════════════════════════════════════════
+
+# Generación actual de cada etiqueta; invalidar() la incrementa
+_generaciones: Dict[str, int] = {}
+_lock_generaciones = threading.Lock()
+
+
+def etiqueta(nombre: str, db_path=None) -> str:
+    """
+    Nombre de una etiqueta, opcionalmente acotada a una base de datos.
+
+    Example:
+        >>> etiqueta('evaluaciones', 'data/evento.db')
+        'evaluaciones:/ruta/absoluta/data/evento.db'
+    """
+    if db_path is None:
+        return nombre
+    return f"{nombre}:{os.path.abspath(str(db_path))}"
+
+
+def invalidar(*etiquetas: str) -> None:
+    """
+    Invalida las funciones en caché que declaran alguna de las etiquetas.
+
+    Una etiqueta sin base de datos ('evaluaciones') invalida también todas sus
+    variantes acotadas ('evaluaciones:<db>').
+
+    Example:
+        >>> invalidar(etiqueta('evaluaciones', config.db_path), 'catalogo')
+    """
+    with _lock_generaciones:
+        for nombre in etiquetas:
+            _generaciones[nombre] = _generaciones.get(nombre, 0) + 1
+    logger.info(f"Caché invalidada: {', '.join(etiquetas)}")
+
+
+def _generacion(nombre: str) -> tuple:
+    """Generación de una etiqueta y de su versión sin acotar ('a:db' → 'a')."""
+    general = nombre.split(':', 1)[0]
+    return (nombre, _generaciones.get(general, 0), _generaciones.get(nombre, 0))
+
+
+def _expandir_etiquetas(etiquetas: Iterable[str], rutas: list) -> list:
+    """Sustituye {db} en las etiquetas por cada una de las bases de datos."""
+    expandidas = []
+    for nombre in etiquetas:
+        if '{db}' in nombre:
+            base = nombre.replace(':{db}', '').replace('{db}', '')
+            expandidas.extend(etiqueta(base, ruta) for ruta in rutas)
+        else:
+            expandidas.append(nombre)
+    return expandidas
+
+
+def _rutas_por_defecto(*args, **kwargs) -> list:
+    """
+    Base de datos de la función: argumento db_path, primer argumento si es
+    una ruta, o la del evento actual.
+    """
+    if kwargs.get('db_path'):
+        return [kwargs['db_path']]
+    if args and isinstance(args[0], (str, os.PathLike)):
+        return [args[0]]
+    return [config.db_path]
+
+
+def _token_version(obtener_rutas: Callable, etiquetas, args: tuple, kwargs: dict) -> tuple:
+    """Versión de los datos de una llamada: (tokens de las bases de datos, generaciones de sus etiquetas)."""
+    rutas_func = obtener_rutas(*args, **kwargs)
+    nombres = etiquetas(*args, **kwargs) if callable(etiquetas) else etiquetas
+    return (
+        tuple(token_cambios(ruta) for ruta in rutas_func),
+        tuple(_generacion(nombre) for nombre in _expandir_etiquetas(nombres, rutas_func))
+    )
+
+
+def cache_por_version(func: Callable = None, *, rutas: Callable = None,
+                      etiquetas: Union[Iterable[str], Callable] = (), max_entries: int = 32):
+    """
+    Decorador de caché (st.cache_data) para funciones que leen la base de datos.
+
+    La clave incluye token_cambios() de las bases de datos involucradas, por lo
+    que el resultado se reutiliza mientras no haya escrituras y se recalcula
+    en la primera llamada después de una.
+
+    Args:
+        rutas: Función (*args, **kwargs) → lista de bases de datos que lee la
+            función decorada. Por defecto: argumento db_path, el primer
+            argumento si es una ruta, o config.db_path.
+        etiquetas: Etiquetas que invalidan el resultado (ver invalidar()).
+            '{db}' se reemplaza por cada base de datos de `rutas`; también
+            puede ser una función (*args, **kwargs) → lista de etiquetas.
+        max_entries: Máximo de resultados guardados (versiones antiguas incluidas)
+
+    Example:
+        >>> @cache_por_version(etiquetas=['evaluaciones:{db}', 'grupos:{db}'])
+        ... def cargar_evaluaciones(db_path: str): ...
+    """
+    def decorador(func: Callable) -> Callable:
+        obtener_rutas = rutas or _rutas_por_defecto
+
+        def _calcular(token_version, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        # st.cache_data distingue funciones por módulo y nombre
+        _calcular.__module__ = func.__module__
+        _calcular.__qualname__ = f"{func.__qualname__}__por_version"
+        _calcular.__name__ = f"{func.__name__}__por_version"
+        calcular_en_cache = st.cache_data(max_entries=max_entries, show_spinner=False)(_calcular)
+
+        @functools.wraps(func)
+        def envoltura(*args, **kwargs):
+            token = _token_version(obtener_rutas, etiquetas, args, kwargs)
+            return calcular_en_cache(token, *args, **kwargs)
+
+        envoltura.clear = calcular_en_cache.clear
+        return envoltura
+
+    if func is not None:
+        return decorador(func)
+    return decorador
+
+
+def cache_compartida(func: Callable = None, *, rutas: Callable = None,
+                     etiquetas: Union[Iterable[str], Callable] = (), max_entries: int = 8,
+                     obsoleto_mientras_revalida: bool = True):
+    """
+    Decorador de caché para las cargas pesadas que muchas sesiones piden a la vez.
+
+    Usa la misma versión que cache_por_version (token de cambios + etiquetas),
+    pero con CacheCompartida: las sesiones concurrentes comparten un único
+    cálculo, y tras una escritura se sigue sirviendo el resultado anterior
+    mientras un solo hilo lo recalcula. Si cambió alguna etiqueta (invalidar()),
+    nunca se sirve el resultado anterior.
+
+    Cada llamada recibe su propia copia del resultado (copy.copy; en un
+    DataFrame es una copia profunda), como ocurre con st.cache_data.
+
+    Args:
+        rutas, etiquetas: Como en cache_por_version
+        max_entries: Máximo de combinaciones de argumentos guardadas
+        obsoleto_mientras_revalida: Servir el resultado anterior mientras se recalcula
+    """
+    def decorador(func: Callable) -> Callable:
+        obtener_rutas = rutas or _rutas_por_defecto
+        cache = CacheCompartida(max_entradas=max_entries, nombre=func.__qualname__)
+
+        @functools.wraps(func)
+        def envoltura(*args, **kwargs):
+            version = _token_version(obtener_rutas, etiquetas, args, kwargs)
+            clave = (args, tuple(sorted(kwargs.items())))
+
+            permitir_obsoleto = None
+            if obsoleto_mientras_revalida:
+                permitir_obsoleto = lambda guardada: guardada[1] == version[1]
+
+            valor = cache.obtener(clave, version, lambda: func(*args, **kwargs), permitir_obsoleto)
+            return copy.copy(valor)
+
+        envoltura.clear = cache.limpiar
+        return envoltura
+
+    if func is not None:
+        return decorador(func)
+    return decorador
@@ -12,11 +12,14 @@ logger = logging.getLogger(__name__)
 
 
 @contextmanager
-def get_db_connection() -> Generator[sqlite3.Connection, None, None]:
+def get_db_connection(db_path=None) -> Generator[sqlite3.Connection, None, None]:
     """
     Context manager para gestionar conexiones a la base de datos.
     Garantiza que la conexión se cierre correctamente incluso si hay errores.
     
+    Args:
+        db_path: Ruta de la base de datos (por defecto config.db_path)
+    
     Yields:
         Conexión a la base de datos SQLite
         
@@ -27,9 +30,10 @@ def get_db_connection() -> Generator[sqlite3.Connection, None, None]:
     """
     conn = None
     try:
-        conn = sqlite3.connect(config.db_path)
+        db_path = db_path or config.db_path
+        conn = sqlite3.connect(db_path)
         conn.row_factory = sqlite3.Row  # Permite acceder a columnas por nombre
-        logger.debug(f"Conexión establecida: {config.db_path}")
+        logger.debug(f"Conexión establecida: {db_path}")
         yield conn
         conn.commit()
         logger.debug("Transacción confirmada")
@@ -110,18 +114,19 @@ def ejecutar_insert(query: str, params: tuple) -> int:
         raise
 
 
-def ejecutar_script(script: str) -> None:
+def ejecutar_script(script: str, db_path=None) -> None:
     """
     Ejecuta un script SQL completo (múltiples statements).
     
     Args:
         script: Script SQL a ejecutar
+        db_path: Ruta de la base de datos (por defecto config.db_path)
         
     Raises:
         sqlite3.Error: Si hay error en la ejecución
     """
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(db_path) as conn:
             cursor = conn.cursor()
             cursor.executescript(script)
             logger.info("Script ejecutado exitosamente")
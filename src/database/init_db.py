@@ -3,10 +3,12 @@ Inicialización y creación de la base de datos
 ACTUALIZADO: Sistema completo con fichas dinámicas
 """
 import logging
+import sqlite3
 import os
+import sys
 from src.database.connection import ejecutar_script, get_db_connection
 from src.utils.dimensiones_iniciales import FICHAS_INICIALES, FICHA_DIMENSIONES_MAP, DIMENSIONES_INICIALES
-from src.config import config
+from src.config import config, DATA_DIR
 
 logger = logging.getLogger(__name__)
 
@@ -129,29 +131,59 @@ CREATE INDEX IF NOT EXISTS idx_grupos_ano ON grupos(ano_evento);
 CREATE INDEX IF NOT EXISTS idx_grupos_ficha ON grupos(ficha_id);
 
 
+-- =====================================================
+-- TABLA: envios
+-- Cabecera de cada evaluación enviada por un curador
+-- (una observación cualitativa por grupo y ficha)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS envios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    clave_envio TEXT,
+    usuario_id INTEGER NOT NULL,
+    codigo_grupo TEXT NOT NULL,
+    ficha_id INTEGER NOT NULL,
+    observacion TEXT NOT NULL,
+    fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    FOREIGN KEY (codigo_grupo) REFERENCES grupos(codigo) ON DELETE CASCADE,
+    FOREIGN KEY (ficha_id) REFERENCES fichas(id) ON DELETE CASCADE,
+
+    UNIQUE (usuario_id, codigo_grupo, ficha_id),
+    CHECK (length(observacion) >= 5)
+);
+
+CREATE INDEX IF NOT EXISTS idx_envios_grupo ON envios(codigo_grupo);
+-- Clave de idempotencia generada por el cliente (reintentos = no-op)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_envios_clave ON envios(clave_envio);
+
+
 -- =====================================================
 -- TABLA: evaluaciones
--- Evaluaciones por ficha y aspecto
+-- Evaluaciones por ficha y aspecto (detalle de cada envío)
 -- =====================================================
 CREATE TABLE IF NOT EXISTS evaluaciones (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
+    envio_id INTEGER NOT NULL,
     usuario_id INTEGER NOT NULL,
     codigo_grupo TEXT NOT NULL,
     ficha_id INTEGER NOT NULL,
     aspecto_id INTEGER NOT NULL,
     resultado INTEGER CHECK (resultado IN (0,1,2)) NOT NULL,
-    observacion TEXT NOT NULL,
     fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP,
 
+    FOREIGN KEY (envio_id) REFERENCES envios(id) ON DELETE CASCADE,
     FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
     FOREIGN KEY (codigo_grupo) REFERENCES grupos(codigo) ON DELETE CASCADE,
     FOREIGN KEY (ficha_id) REFERENCES fichas(id) ON DELETE CASCADE,
     FOREIGN KEY (aspecto_id) REFERENCES aspectos(id) ON DELETE CASCADE,
 
-    UNIQUE (usuario_id, codigo_grupo, ficha_id, aspecto_id),
-    CHECK (length(observacion) >= 5)
+    UNIQUE (usuario_id, codigo_grupo, ficha_id, aspecto_id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_envio ON evaluaciones(envio_id);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_fecha ON evaluaciones(fecha_registro);
+
 CREATE INDEX IF NOT EXISTS idx_evaluaciones_usuario ON evaluaciones(usuario_id);
 CREATE INDEX IF NOT EXISTS idx_evaluaciones_grupo ON evaluaciones(codigo_grupo);
 CREATE INDEX IF NOT EXISTS idx_evaluaciones_ficha ON evaluaciones(ficha_id);
@@ -172,10 +204,683 @@ CREATE TABLE IF NOT EXISTS logs_sistema (
 
 CREATE INDEX IF NOT EXISTS idx_logs_fecha ON logs_sistema(fecha);
 CREATE INDEX IF NOT EXISTS idx_logs_usuario ON logs_sistema(usuario);
+
+
+-- =====================================================
+-- TABLA: asignaciones
+-- Plan de trabajo de cada curador (grupos a evaluar)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS asignaciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    codigo_grupo TEXT NOT NULL,
+    ficha_id INTEGER NOT NULL,
+    estado TEXT CHECK(estado IN ('pendiente', 'completada')) NOT NULL DEFAULT 'pendiente',
+    fecha_asignacion TEXT DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    FOREIGN KEY (codigo_grupo) REFERENCES grupos(codigo) ON DELETE CASCADE,
+    FOREIGN KEY (ficha_id) REFERENCES fichas(id) ON DELETE CASCADE,
+    UNIQUE (usuario_id, codigo_grupo)
+);
+
+CREATE INDEX IF NOT EXISTS idx_asignaciones_usuario_estado ON asignaciones(usuario_id, estado);
+CREATE INDEX IF NOT EXISTS idx_asignaciones_grupo ON asignaciones(codigo_grupo);
+
+
+-- =====================================================
+-- TABLA: conflictos_curador
+-- Grupos que un curador no debe evaluar (conflicto de interés)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS conflictos_curador (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    codigo_grupo TEXT NOT NULL,
+    motivo TEXT,
+    fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP,
+
+    FOREIGN KEY (usuario_id) REFERENCES usuarios(id) ON DELETE CASCADE,
+    FOREIGN KEY (codigo_grupo) REFERENCES grupos(codigo) ON DELETE CASCADE,
+    UNIQUE (usuario_id, codigo_grupo)
+);
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ESTADO DE EVALUACIONES (mantenido por triggers)
+# ═══════════════════════════════════════════════════════════════════
+
+_FICHAS_DE_DIMENSION = "ficha_id IN (SELECT ficha_id FROM ficha_dimensiones WHERE dimension_id = {dimension})"
+
+
+def _recalculo_estado(filtro: str) -> str:
+    """Sentencia que recalcula el avance de las filas de evaluacion_estado que cumplen el filtro."""
+    return f"""UPDATE evaluacion_estado
+    SET aspectos_requeridos = (
+            SELECT COUNT(*) FROM v_aspectos_ficha v
+            WHERE v.ficha_id = evaluacion_estado.ficha_id
+        ),
+        aspectos_evaluados = (
+            SELECT COUNT(*) FROM evaluaciones e
+            JOIN v_aspectos_ficha v ON v.ficha_id = e.ficha_id AND v.aspecto_id = e.aspecto_id
+            WHERE e.usuario_id = evaluacion_estado.usuario_id
+              AND e.codigo_grupo = evaluacion_estado.codigo_grupo
+              AND e.ficha_id = evaluacion_estado.ficha_id
+        )
+    WHERE {filtro};"""
+
+
+ESTADO_EVALUACION_SQL = f"""
+
+-- =====================================================
+-- VISTA: v_aspectos_ficha
+-- Aspectos que componen la rúbrica de cada ficha
+-- =====================================================
+CREATE VIEW IF NOT EXISTS v_aspectos_ficha AS
+SELECT fd.ficha_id, a.id AS aspecto_id
+FROM ficha_dimensiones fd
+JOIN dimensiones d ON fd.dimension_id = d.id
+JOIN aspectos a ON a.dimension_id = d.id;
+
+
+-- =====================================================
+-- TABLA: evaluacion_estado
+-- Avance de cada evaluación (usuario, grupo, ficha),
+-- mantenido por triggers
+-- =====================================================
+CREATE TABLE IF NOT EXISTS evaluacion_estado (
+    usuario_id INTEGER NOT NULL,
+    codigo_grupo TEXT NOT NULL,
+    ficha_id INTEGER NOT NULL,
+    aspectos_evaluados INTEGER NOT NULL DEFAULT 0,
+    aspectos_requeridos INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (usuario_id, codigo_grupo, ficha_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_evaluacion_estado_incompletas
+    ON evaluacion_estado(ficha_id)
+    WHERE aspectos_evaluados < aspectos_requeridos;
+
+CREATE TRIGGER IF NOT EXISTS trg_evaluaciones_estado_insert
+AFTER INSERT ON evaluaciones
+BEGIN
+    INSERT OR IGNORE INTO evaluacion_estado (usuario_id, codigo_grupo, ficha_id, aspectos_evaluados, aspectos_requeridos)
+    VALUES (
+        NEW.usuario_id, NEW.codigo_grupo, NEW.ficha_id, 0,
+        (SELECT COUNT(*) FROM v_aspectos_ficha WHERE ficha_id = NEW.ficha_id)
+    );
+
+    UPDATE evaluacion_estado
+    SET aspectos_evaluados = aspectos_evaluados + 1
+    WHERE usuario_id = NEW.usuario_id
+      AND codigo_grupo = NEW.codigo_grupo
+      AND ficha_id = NEW.ficha_id
+      AND EXISTS (
+          SELECT 1 FROM v_aspectos_ficha
+          WHERE ficha_id = NEW.ficha_id AND aspecto_id = NEW.aspecto_id
+      );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_evaluaciones_estado_delete
+AFTER DELETE ON evaluaciones
+BEGIN
+    UPDATE evaluacion_estado
+    SET aspectos_evaluados = aspectos_evaluados - 1
+    WHERE usuario_id = OLD.usuario_id
+      AND codigo_grupo = OLD.codigo_grupo
+      AND ficha_id = OLD.ficha_id
+      AND EXISTS (
+          SELECT 1 FROM v_aspectos_ficha
+          WHERE ficha_id = OLD.ficha_id AND aspecto_id = OLD.aspecto_id
+      );
+
+    DELETE FROM evaluacion_estado
+    WHERE usuario_id = OLD.usuario_id
+      AND codigo_grupo = OLD.codigo_grupo
+      AND ficha_id = OLD.ficha_id
+      AND NOT EXISTS (
+          SELECT 1 FROM evaluaciones
+          WHERE usuario_id = OLD.usuario_id
+            AND codigo_grupo = OLD.codigo_grupo
+            AND ficha_id = OLD.ficha_id
+      );
+END;
+
+-- Cambios en la rúbrica: recalcular las evaluaciones de las fichas afectadas
+CREATE TRIGGER IF NOT EXISTS trg_ficha_dimensiones_estado_insert
+AFTER INSERT ON ficha_dimensiones
+BEGIN
+    {_recalculo_estado("ficha_id = NEW.ficha_id")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_ficha_dimensiones_estado_delete
+AFTER DELETE ON ficha_dimensiones
+BEGIN
+    {_recalculo_estado("ficha_id = OLD.ficha_id")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aspectos_estado_insert
+AFTER INSERT ON aspectos
+BEGIN
+    {_recalculo_estado(_FICHAS_DE_DIMENSION.format(dimension="NEW.dimension_id"))}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aspectos_estado_delete
+AFTER DELETE ON aspectos
+BEGIN
+    {_recalculo_estado(_FICHAS_DE_DIMENSION.format(dimension="OLD.dimension_id"))}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aspectos_estado_update
+AFTER UPDATE OF dimension_id ON aspectos
+BEGIN
+    {_recalculo_estado(_FICHAS_DE_DIMENSION.format(dimension="OLD.dimension_id"))}
+    {_recalculo_estado(_FICHAS_DE_DIMENSION.format(dimension="NEW.dimension_id"))}
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_dimensiones_estado_delete
+AFTER DELETE ON dimensiones
+BEGIN
+    {_recalculo_estado(_FICHAS_DE_DIMENSION.format(dimension="OLD.id"))}
+END;
+"""
+
+SCHEMA_SQL += ESTADO_EVALUACION_SQL
+
+# ═══════════════════════════════════════════════════════════════════
+# JOURNAL DE CAMBIOS Y SNAPSHOTS
+# ═══════════════════════════════════════════════════════════════════
+# Entre dos snapshots completos, los cambios de las tablas de evaluación se
+# registran fila a fila en journal_cambios (capturados por triggers). Un
+# snapshot más el journal posterior permiten reconstruir la base de datos en
+# cualquier momento del evento (ver src/database/snapshots.py).
+
+# tabla → (clave primaria, columnas registradas)
+TABLAS_JOURNAL = {
+    'grupos': ('codigo', ['codigo', 'nombre_propuesta', 'modalidad', 'tipo', 'tamano',
+                          'naturaleza', 'ano_evento', 'ficha_id']),
+    'envios': ('id', ['id', 'clave_envio', 'usuario_id', 'codigo_grupo', 'ficha_id',
+                      'observacion', 'fecha_registro']),
+    'evaluaciones': ('id', ['id', 'envio_id', 'usuario_id', 'codigo_grupo', 'ficha_id',
+                            'aspecto_id', 'resultado', 'fecha_registro']),
+}
+
+
+def _triggers_journal(tabla: str, clave: str, columnas: list) -> str:
+    """Triggers que registran en journal_cambios cada cambio de la tabla."""
+    datos = "json_object(" + ", ".join(f"'{col}', NEW.{col}" for col in columnas) + ")"
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_{tabla}_journal_insert
+AFTER INSERT ON {tabla}
+BEGIN
+    INSERT INTO journal_cambios (tabla, operacion, clave, datos)
+    VALUES ('{tabla}', 'INSERT', NEW.{clave}, {datos});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{tabla}_journal_update
+AFTER UPDATE ON {tabla}
+BEGIN
+    INSERT INTO journal_cambios (tabla, operacion, clave, datos)
+    VALUES ('{tabla}', 'UPDATE', OLD.{clave}, {datos});
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_{tabla}_journal_delete
+AFTER DELETE ON {tabla}
+BEGIN
+    INSERT INTO journal_cambios (tabla, operacion, clave, datos)
+    VALUES ('{tabla}', 'DELETE', OLD.{clave}, NULL);
+END;
+"""
+
+
+JOURNAL_SQL = """
+
+-- =====================================================
+-- TABLA: journal_cambios
+-- Cambios fila a fila de grupos, envios y evaluaciones
+-- (datos = fila nueva en JSON; NULL en DELETE)
+-- =====================================================
+CREATE TABLE IF NOT EXISTS journal_cambios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabla TEXT NOT NULL,
+    operacion TEXT NOT NULL CHECK (operacion IN ('INSERT', 'UPDATE', 'DELETE')),
+    clave TEXT NOT NULL,
+    datos TEXT,
+    fecha_registro TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_journal_fecha ON journal_cambios(fecha_registro);
+
+
+-- =====================================================
+-- TABLA: snapshots
+-- Copias completas de la base de datos; ultimo_cambio_id es
+-- el último registro del journal incluido en la copia
+-- =====================================================
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ruta TEXT NOT NULL UNIQUE,
+    ultimo_cambio_id INTEGER NOT NULL DEFAULT 0,
+    fecha_registro TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+""" + "".join(
+    _triggers_journal(tabla, clave, columnas)
+    for tabla, (clave, columnas) in TABLAS_JOURNAL.items()
+)
+
+SCHEMA_SQL += JOURNAL_SQL
+
+# ═══════════════════════════════════════════════════════════════════
+# SNAPSHOTS DE PREMIOS
+# ═══════════════════════════════════════════════════════════════════
+# Resultado de la gala calculado una vez por versión de los datos de entrada
+# (hash_entradas): la vista lo lee sin recalcular y queda como registro
+# auditable de cada cálculo (ver src/analytics/premios.py).
+
+PREMIOS_SQL = """
+
+-- =====================================================
+-- TABLA: premios_snapshot
+-- Una fila por grupo y cálculo de premios
+-- =====================================================
+CREATE TABLE IF NOT EXISTS premios_snapshot (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash_entradas TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    codigo_grupo TEXT NOT NULL,
+    nombre_propuesta TEXT,
+    modalidad TEXT,
+    tamano TEXT,
+    ficha_codigo TEXT,
+    ficha_nombre TEXT,
+    promedio_fin REAL,
+    promedio_gran REAL,
+    nota_consolidada REAL,
+    estado TEXT,
+    participacion TEXT,
+    umbral_congo REAL,
+    premio TEXT NOT NULL,
+    ranking INTEGER NOT NULL,
+    fecha_registro TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_premios_snapshot_hash ON premios_snapshot(hash_entradas);
+"""
+
+SCHEMA_SQL += PREMIOS_SQL
+
+# Reconstrucción completa (bases de datos creadas antes de evaluacion_estado)
+RECONSTRUIR_ESTADO_SQL = f"""
+INSERT OR IGNORE INTO evaluacion_estado (usuario_id, codigo_grupo, ficha_id)
+SELECT DISTINCT usuario_id, codigo_grupo, ficha_id FROM evaluaciones;
+
+{_recalculo_estado("1 = 1")}
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════
+# BÚSQUEDA DE TEXTO COMPLETO (FTS5)
+# ═══════════════════════════════════════════════════════════════════
+
+# Se crea aparte de SCHEMA_SQL: si el SQLite instalado no incluye FTS5,
+# la aplicación sigue funcionando con búsqueda LIKE.
+BUSQUEDA_SQL = """
+
+-- =====================================================
+-- VISTA: v_evaluaciones_busqueda
+-- Texto indexable de cada evaluación (sin la observación,
+-- que se indexa una sola vez por envío en envios_fts)
+-- =====================================================
+CREATE VIEW IF NOT EXISTS v_evaluaciones_busqueda AS
+SELECT
+    e.id,
+    e.codigo_grupo,
+    g.nombre_propuesta,
+    fg.nombre AS ficha,
+    u.username AS curador,
+    d.nombre AS dimension,
+    a.nombre AS aspecto
+FROM evaluaciones e
+LEFT JOIN grupos g ON e.codigo_grupo = g.codigo
+LEFT JOIN fichas fg ON g.ficha_id = fg.id
+LEFT JOIN usuarios u ON e.usuario_id = u.id
+LEFT JOIN aspectos a ON e.aspecto_id = a.id
+LEFT JOIN dimensiones d ON a.dimension_id = d.id;
+
+
+-- =====================================================
+-- TABLA VIRTUAL: evaluaciones_fts
+-- rowid = evaluaciones.id; sin distinción de tildes
+-- =====================================================
+CREATE VIRTUAL TABLE IF NOT EXISTS evaluaciones_fts USING fts5(
+    codigo_grupo,
+    nombre_propuesta,
+    ficha,
+    curador,
+    dimension,
+    aspecto,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+
+-- =====================================================
+-- TABLA VIRTUAL: envios_fts
+-- rowid = envios.id; una fila por observación
+-- =====================================================
+CREATE VIRTUAL TABLE IF NOT EXISTS envios_fts USING fts5(
+    observacion,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_evaluaciones_fts_insert
+AFTER INSERT ON evaluaciones
+BEGIN
+    INSERT INTO evaluaciones_fts (rowid, codigo_grupo, nombre_propuesta, ficha, curador, dimension, aspecto)
+    SELECT id, codigo_grupo, nombre_propuesta, ficha, curador, dimension, aspecto
+    FROM v_evaluaciones_busqueda WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_evaluaciones_fts_delete
+AFTER DELETE ON evaluaciones
+BEGIN
+    DELETE FROM evaluaciones_fts WHERE rowid = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_envios_fts_insert
+AFTER INSERT ON envios
+BEGIN
+    INSERT INTO envios_fts (rowid, observacion) VALUES (NEW.id, COALESCE(NEW.observacion, ''));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_envios_fts_delete
+AFTER DELETE ON envios
+BEGIN
+    DELETE FROM envios_fts WHERE rowid = OLD.id;
+END;
+
+-- Cambios en los textos de origen: actualizar las filas indexadas afectadas
+CREATE TRIGGER IF NOT EXISTS trg_envios_fts_update
+AFTER UPDATE OF observacion ON envios
+BEGIN
+    UPDATE envios_fts SET observacion = COALESCE(NEW.observacion, '') WHERE rowid = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_grupos_fts_update
+AFTER UPDATE OF nombre_propuesta, ficha_id ON grupos
+BEGIN
+    UPDATE evaluaciones_fts
+    SET nombre_propuesta = NEW.nombre_propuesta,
+        ficha = (SELECT nombre FROM fichas WHERE id = NEW.ficha_id)
+    WHERE rowid IN (SELECT id FROM evaluaciones WHERE codigo_grupo = NEW.codigo);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_fichas_fts_update
+AFTER UPDATE OF nombre ON fichas
+BEGIN
+    UPDATE evaluaciones_fts SET ficha = NEW.nombre
+    WHERE rowid IN (
+        SELECT e.id FROM evaluaciones e
+        JOIN grupos g ON e.codigo_grupo = g.codigo
+        WHERE g.ficha_id = NEW.id
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_usuarios_fts_update
+AFTER UPDATE OF username ON usuarios
+BEGIN
+    UPDATE evaluaciones_fts SET curador = NEW.username
+    WHERE rowid IN (SELECT id FROM evaluaciones WHERE usuario_id = NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_aspectos_fts_update
+AFTER UPDATE OF nombre, dimension_id ON aspectos
+BEGIN
+    UPDATE evaluaciones_fts
+    SET aspecto = NEW.nombre,
+        dimension = (SELECT nombre FROM dimensiones WHERE id = NEW.dimension_id)
+    WHERE rowid IN (SELECT id FROM evaluaciones WHERE aspecto_id = NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_dimensiones_fts_update
+AFTER UPDATE OF nombre ON dimensiones
+BEGIN
+    UPDATE evaluaciones_fts SET dimension = NEW.nombre
+    WHERE rowid IN (
+        SELECT e.id FROM evaluaciones e
+        JOIN aspectos a ON e.aspecto_id = a.id
+        WHERE a.dimension_id = NEW.id
+    );
+END;
+"""
+
+# Índice anterior (observación copiada en cada evaluación): se descarta y se recrea
+DESCARTAR_BUSQUEDA_ANTERIOR_SQL = """
+DROP TRIGGER IF EXISTS trg_evaluaciones_fts_insert;
+DROP TRIGGER IF EXISTS trg_envios_fts_update;
+DROP TRIGGER IF EXISTS trg_grupos_fts_update;
+DROP VIEW IF EXISTS v_evaluaciones_busqueda;
+DROP TABLE IF EXISTS evaluaciones_fts;
 """
 
+RECONSTRUIR_BUSQUEDA_SQL = """
+DELETE FROM evaluaciones_fts;
+
+INSERT INTO evaluaciones_fts (rowid, codigo_grupo, nombre_propuesta, ficha, curador, dimension, aspecto)
+SELECT id, codigo_grupo, nombre_propuesta, ficha, curador, dimension, aspecto
+FROM v_evaluaciones_busqueda;
+
+DELETE FROM envios_fts;
+
+INSERT INTO envios_fts (rowid, observacion)
+SELECT id, COALESCE(observacion, '') FROM envios;
+"""
+
+
+
+
+
+
+# ═══════════════════════════════════════════════════════════════════
+# MIGRACIÓN: observación por envío
+# ═══════════════════════════════════════════════════════════════════
+
+# Las versiones anteriores repetían la observación global en cada fila de
+# evaluaciones. Se extrae a envios (una fila por usuario, grupo y ficha) y
+# se reconstruye evaluaciones apuntando a su envío.
+MIGRACION_ENVIOS_SQL = """
+BEGIN;
+
+ALTER TABLE evaluaciones RENAME TO evaluaciones_legacy;
+DROP INDEX IF EXISTS idx_evaluaciones_usuario;
+DROP INDEX IF EXISTS idx_evaluaciones_grupo;
+DROP INDEX IF EXISTS idx_evaluaciones_ficha;
+DROP INDEX IF EXISTS idx_evaluaciones_aspecto;
+
+{schema}
+
+INSERT INTO envios (usuario_id, codigo_grupo, ficha_id, observacion, fecha_registro)
+SELECT usuario_id, codigo_grupo, ficha_id, group_concat(observacion, char(10)), MIN(fecha_registro)
+FROM (
+    SELECT usuario_id, codigo_grupo, ficha_id, observacion,
+           MIN(fecha_registro) AS fecha_registro, MIN(id) AS primer_id
+    FROM evaluaciones_legacy
+    GROUP BY usuario_id, codigo_grupo, ficha_id, observacion
+    ORDER BY primer_id
+)
+GROUP BY usuario_id, codigo_grupo, ficha_id;
+
+INSERT INTO evaluaciones (id, envio_id, usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado, fecha_registro)
+SELECT l.id, en.id, l.usuario_id, l.codigo_grupo, l.ficha_id, l.aspecto_id, l.resultado, l.fecha_registro
+FROM evaluaciones_legacy l
+JOIN envios en
+  ON en.usuario_id = l.usuario_id
+ AND en.codigo_grupo = l.codigo_grupo
+ AND en.ficha_id = l.ficha_id;
+
+DROP TABLE evaluaciones_legacy;
+
+COMMIT;
+"""
+
+
+def migrar_observaciones_a_envios(db_path: str = None) -> bool:
+    """
+    Migra una base de datos con observaciones por aspecto al esquema de envíos.
+    
+    Args:
+        db_path: Base de datos a migrar (por defecto config.db_path)
+    
+    Returns:
+        True si se realizó la migración, False si no era necesaria
+    """
+    with get_db_connection(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA table_info(evaluaciones)")
+        columnas = {row['name'] for row in cursor.fetchall()}
+        
+        if 'observacion' not in columnas:
+            return False
+        
+        cursor.execute("SELECT COUNT(*) FROM evaluaciones")
+        filas_antes = cursor.fetchone()[0]
+        
+        logger.info("Migrando observaciones de evaluaciones a envios...")
+        cursor.executescript(MIGRACION_ENVIOS_SQL.format(schema=SCHEMA_SQL))
+        
+        cursor.execute("SELECT COUNT(*) FROM envios")
+        total_envios = cursor.fetchone()[0]
+        logger.info(f"Migración completada: {filas_antes} evaluaciones agrupadas en {total_envios} envíos")
+        return True
+
+
+def agregar_columna_si_falta(tabla: str, columna: str, definicion: str, db_path: str = None) -> bool:
+    """
+    Agrega una columna a una tabla existente si aún no la tiene.
+    
+    Returns:
+        True si se agregó la columna, False si ya existía o la tabla no existe
+    """
+    with get_db_connection(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info({tabla})")
+        columnas = {row['name'] for row in cursor.fetchall()}
+        
+        if not columnas or columna in columnas:
+            return False
+        
+        cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+        logger.info(f"Columna agregada: {tabla}.{columna}")
+        return True
+
+
+def reconstruir_evaluacion_estado(solo_si_vacia: bool = False, db_path: str = None) -> bool:
+    """
+    Recalcula evaluacion_estado a partir de evaluaciones y la rúbrica actual.
+    
+    Args:
+        solo_si_vacia: Si True, solo reconstruye cuando la tabla está vacía
+            y existen evaluaciones (bases de datos anteriores a la tabla)
+        db_path: Base de datos (por defecto config.db_path)
+        
+    Returns:
+        True si se reconstruyó, False en caso contrario
+    """
+    with get_db_connection(db_path) as conn:
+        cursor = conn.cursor()
+        
+        if solo_si_vacia:
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM evaluacion_estado)")
+            hay_estado = cursor.fetchone()[0]
+            cursor.execute("SELECT EXISTS (SELECT 1 FROM evaluaciones)")
+            hay_evaluaciones = cursor.fetchone()[0]
+            if hay_estado or not hay_evaluaciones:
+                return False
+        
+        cursor.executescript(f"BEGIN;\n{RECONSTRUIR_ESTADO_SQL}\nCOMMIT;")
+        logger.info("Estado de evaluaciones reconstruido")
+        return True
 
 
+def crear_indice_busqueda(db_path: str = None) -> bool:
+    """
+    Crea el índice de texto completo y lo reconstruye si no está sincronizado
+    con evaluaciones (bases de datos anteriores al índice).
+    
+    Returns:
+        True si el índice está disponible, False si FTS5 no está soportado
+    """
+    try:
+        with get_db_connection(db_path) as conn:
+            cursor = conn.cursor()
+            
+            # Índice anterior con la observación en cada evaluación (o sin la ficha)
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'evaluaciones_fts'")
+            fila = cursor.fetchone()
+            if fila and ('observacion' in fila[0] or 'ficha' not in fila[0]):
+                cursor.executescript(DESCARTAR_BUSQUEDA_ANTERIOR_SQL)
+                logger.info("Índice de búsqueda anterior descartado")
+            
+            cursor.executescript(BUSQUEDA_SQL)
+            
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM evaluaciones_fts) = (SELECT COUNT(*) FROM evaluaciones)
+                   AND (SELECT COUNT(*) FROM envios_fts) = (SELECT COUNT(*) FROM envios)
+            """)
+            if not cursor.fetchone()[0]:
+                cursor.executescript(f"BEGIN;\n{RECONSTRUIR_BUSQUEDA_SQL}\nCOMMIT;")
+                logger.info("Índice de búsqueda reconstruido")
+            return True
+            
+    except sqlite3.OperationalError as e:
+        logger.warning(f"⚠️ Búsqueda de texto completo no disponible (FTS5): {e}")
+        return False
+
+
+def migrar_esquema(db_path: str = None) -> None:
+    """
+    Lleva una base de datos existente al esquema actual (envíos, estado de
+    evaluaciones, journal, índice de búsqueda) sin insertar datos iniciales.
+    
+    Args:
+        db_path: Base de datos a migrar (por defecto config.db_path)
+    """
+    migrar_observaciones_a_envios(db_path)
+    agregar_columna_si_falta('envios', 'clave_envio', 'TEXT', db_path)
+    ejecutar_script(SCHEMA_SQL, db_path)
+    reconstruir_evaluacion_estado(solo_si_vacia=True, db_path=db_path)
+    crear_indice_busqueda(db_path)
+
+
+def bases_de_eventos() -> list:
+    """
+    Bases de datos de eventos en DATA_DIR: las que leen las vistas del comité
+    (Fin de Semana, Gran Parada), además de la del evento actual.
+    """
+    return sorted(str(ruta) for ruta in DATA_DIR.glob("*.db"))
+
+
+def migrar_bases_eventos(rutas: list = None) -> bool:
+    """
+    Migra al esquema actual las bases de datos de eventos indicadas (por
+    defecto todas las de DATA_DIR), no solo config.db_path.
+    
+    Returns:
+        True si todas se migraron correctamente
+    """
+    correcto = True
+    for ruta in rutas if rutas is not None else bases_de_eventos():
+        if not os.path.exists(ruta):
+            logger.error(f"❌ Base de datos no encontrada: {ruta}")
+            correcto = False
+            continue
+        try:
+            migrar_esquema(ruta)
+            logger.info(f"Esquema actualizado: {ruta}")
+        except Exception as e:
+            logger.exception(f"❌ Error migrando {ruta}: {e}")
+            correcto = False
+    return correcto
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -192,8 +897,13 @@ def inicializar_base_datos() -> bool:
     try:
         logger.info("Inicializando base de datos...")
         
-        # 1. Crear esquema
-        ejecutar_script(SCHEMA_SQL)
+        # 1. Migrar esquema anterior (si aplica) y crear esquema; también en las
+        #    demás bases de eventos que lee el comité
+        migrar_esquema()
+        otras = [ruta for ruta in bases_de_eventos()
+                 if os.path.abspath(ruta) != os.path.abspath(str(config.db_path))]
+        if not migrar_bases_eventos(otras):
+            logger.warning("⚠️ Algunas bases de datos de eventos no se pudieron migrar")
         logger.info("Esquema de base de datos creado")
         
         with get_db_connection() as conn:
@@ -320,7 +1030,9 @@ def verificar_integridad_bd() -> bool:
             # Verificar tablas requeridas
             tablas_requeridas = [
                 'usuarios', 'fichas', 'dimensiones', 'ficha_dimensiones',
-                'aspectos', 'grupos', 'evaluaciones', 'logs_sistema'
+                'aspectos', 'grupos', 'envios', 'evaluaciones', 'logs_sistema',
+                'asignaciones', 'conflictos_curador', 'evaluacion_estado',
+                'journal_cambios', 'snapshots', 'premios_snapshot'
             ]
 
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
@@ -433,6 +1145,11 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
+    # Con rutas como argumentos solo se migran esas bases de datos:
+    #   python -m src.database.init_db data/curaduria_finde.db data/curaduria_granparada.db
+    if len(sys.argv) > 1:
+        sys.exit(0 if migrar_bases_eventos(sys.argv[1:]) else 1)
+    
     # Inicializar base de datos
     if inicializar_base_datos():
         print("✅ Base de datos inicializada correctamente")
@@ -6,12 +6,18 @@ import logging
 import pandas as pd
 import bcrypt
 import re
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterator
+from src.config import config
 from src.database.connection import get_db_connection, ejecutar_insert
 from src.utils.validators import validar_codigo_grupo, validar_observacion, validar_resultado
+from src.utils.dedupe import CacheDeduplicacion
+from src.database.cache import cache_compartida
 
 logger = logging.getLogger(__name__)
 
+# Envíos procesados recientemente (clave_envio → envio_id)
+_envios_recientes = CacheDeduplicacion(ttl_segundos=600)
+
 
 # ═══════════════════════════════════════════════════════════════════
 # MODELO: Usuarios
@@ -996,10 +1002,84 @@ class GrupoModel:
 class EvaluacionModel:
     """Operaciones sobre la tabla evaluaciones"""
     
+    @staticmethod
+    def crear_envio(usuario_id: int, codigo_grupo: str, ficha_id: int,
+                    resultados: Dict[int, int], observacion: str,
+                    clave_envio: str = None) -> Tuple[Optional[int], bool, Optional[str]]:
+        """
+        Registra en una sola transacción el envío (observación global) y
+        la calificación de cada aspecto. Es idempotente respecto a clave_envio:
+        reintentar con la misma clave no vuelve a escribir.
+        
+        Args:
+            resultados: Diccionario {aspecto_id: resultado}
+            observacion: Observación cualitativa global del curador
+            clave_envio: Clave de idempotencia generada por el cliente
+            
+        Returns:
+            Tupla (envio_id, es_nuevo, mensaje_error)
+        """
+        try:
+            # Reintento reciente: se responde sin tocar la base de datos
+            envio_previo = _envios_recientes.obtener(clave_envio)
+            if envio_previo is not None:
+                logger.info(f"Reintento de envío ignorado: clave {clave_envio} (ID {envio_previo})")
+                return envio_previo, False, None
+            
+            for aspecto_id, resultado in resultados.items():
+                valido, error = validar_resultado(resultado)
+                if not valido:
+                    return None, False, f"Aspecto {aspecto_id}: {error}"
+            
+            valido, error = validar_observacion(observacion)
+            if not valido:
+                return None, False, error
+            
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO envios (clave_envio, usuario_id, codigo_grupo, ficha_id, observacion)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT DO NOTHING
+                """, (clave_envio, usuario_id, codigo_grupo, ficha_id, observacion))
+                
+                if cursor.rowcount == 0:
+                    # Ya existe: o es un reintento de este mismo envío, o el grupo ya fue evaluado
+                    cursor.execute("""
+                        SELECT id, clave_envio FROM envios
+                        WHERE usuario_id = ? AND codigo_grupo = ? AND ficha_id = ?
+                    """, (usuario_id, codigo_grupo, ficha_id))
+                    row = cursor.fetchone()
+                    
+                    if row and clave_envio and row['clave_envio'] == clave_envio:
+                        _envios_recientes.registrar(clave_envio, row['id'])
+                        logger.info(f"Reintento de envío ignorado: clave {clave_envio} (ID {row['id']})")
+                        return row['id'], False, None
+                    
+                    return None, False, "Ya existe una evaluación registrada para este grupo y ficha"
+                
+                envio_id = cursor.lastrowid
+                
+                cursor.executemany("""
+                    INSERT INTO evaluaciones (envio_id, usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [
+                    (envio_id, usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado)
+                    for aspecto_id, resultado in resultados.items()
+                ])
+            
+            _envios_recientes.registrar(clave_envio, envio_id)
+            logger.info(f"Envío creado: ID {envio_id} - Grupo {codigo_grupo}, Ficha {ficha_id}, {len(resultados)} aspectos")
+            return envio_id, True, None
+            
+        except Exception as e:
+            logger.error(f"Error creando envío: {e}")
+            return None, False, f"Error: {str(e)}"
+    
     @staticmethod
     def crear_evaluacion(usuario_id: int, codigo_grupo: str, ficha_id: int, 
                         aspecto_id: int, resultado: int, observacion: str) -> Optional[int]:
-        """Crea una nueva evaluación para un aspecto específico."""
+        """Crea una nueva evaluación para un aspecto específico (reutiliza el envío del curador si existe)."""
         try:
             # Validar resultado (usa validador centralizado)
             valido, error = validar_resultado(resultado)
@@ -1013,12 +1093,25 @@ class EvaluacionModel:
                 logger.error(f"Observación inválida: {error}")
                 return None
             
-            query = """
-                INSERT INTO evaluaciones (usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado, observacion)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO envios (usuario_id, codigo_grupo, ficha_id, observacion)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT (usuario_id, codigo_grupo, ficha_id) DO NOTHING
+                """, (usuario_id, codigo_grupo, ficha_id, observacion))
+                cursor.execute("""
+                    SELECT id FROM envios
+                    WHERE usuario_id = ? AND codigo_grupo = ? AND ficha_id = ?
+                """, (usuario_id, codigo_grupo, ficha_id))
+                envio_id = cursor.fetchone()[0]
+                
+                cursor.execute("""
+                    INSERT INTO evaluaciones (envio_id, usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (envio_id, usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado))
+                eval_id = cursor.lastrowid
             
-            eval_id = ejecutar_insert(query, (usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado, observacion))
             logger.info(f"Evaluación creada: ID {eval_id} - Ficha {ficha_id}, Aspecto {aspecto_id}")
             return eval_id
             
@@ -1033,25 +1126,17 @@ class EvaluacionModel:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Query optimizada: cuenta aspectos evaluados vs totales en una sola query
+                # evaluacion_estado se mantiene por triggers: una sola búsqueda por clave primaria
                 cursor.execute("""
-                    SELECT 
-                        COUNT(DISTINCT e.aspecto_id) as evaluados,
-                        COUNT(DISTINCT a.id) as totales
-                    FROM ficha_dimensiones fd
-                    JOIN dimensiones d ON fd.dimension_id = d.id
-                    LEFT JOIN aspectos a ON d.id = a.dimension_id
-                    LEFT JOIN evaluaciones e ON e.aspecto_id = a.id 
-                        AND e.usuario_id = ? 
-                        AND e.codigo_grupo = ? 
-                        AND e.ficha_id = ?
-                    WHERE fd.ficha_id = ?
-                """, (usuario_id, codigo_grupo, ficha_id, ficha_id))
+                    SELECT aspectos_evaluados, aspectos_requeridos
+                    FROM evaluacion_estado
+                    WHERE usuario_id = ? AND codigo_grupo = ? AND ficha_id = ?
+                """, (usuario_id, codigo_grupo, ficha_id))
                 
                 row = cursor.fetchone()
                 if row:
-                    evaluados = row['evaluados'] or 0
-                    totales = row['totales'] or 0
+                    evaluados = row['aspectos_evaluados'] or 0
+                    totales = row['aspectos_requeridos'] or 0
                     # Si ha evaluado todos los aspectos de la ficha, la evaluación está completa
                     return totales > 0 and evaluados >= totales
                 
@@ -1061,6 +1146,34 @@ class EvaluacionModel:
             logger.error(f"Error verificando evaluación: {e}")
             return False
     
+    @staticmethod
+    def obtener_incompletas() -> pd.DataFrame:
+        """Obtiene las evaluaciones con aspectos pendientes según la rúbrica actual de su ficha."""
+        try:
+            with get_db_connection() as conn:
+                query = """
+                    SELECT 
+                        u.username as curador,
+                        es.codigo_grupo,
+                        g.nombre_propuesta,
+                        f.nombre as ficha,
+                        es.aspectos_evaluados,
+                        es.aspectos_requeridos
+                    FROM evaluacion_estado es
+                    LEFT JOIN usuarios u ON es.usuario_id = u.id
+                    LEFT JOIN grupos g ON es.codigo_grupo = g.codigo
+                    LEFT JOIN fichas f ON es.ficha_id = f.id
+                    WHERE es.aspectos_evaluados < es.aspectos_requeridos
+                    ORDER BY f.nombre, u.username, es.codigo_grupo
+                """
+                
+                df = pd.read_sql_query(query, conn)
+                return df
+                
+        except Exception as e:
+            logger.error(f"Error obteniendo evaluaciones incompletas: {e}")
+            return pd.DataFrame()
+    
     @staticmethod
     def obtener_evaluacion_grupo_usuario(usuario_id: int, codigo_grupo: str) -> List[Dict]:
         """Obtiene todas las evaluaciones de un usuario para un grupo específico."""
@@ -1070,10 +1183,12 @@ class EvaluacionModel:
                 cursor.execute("""
                     SELECT 
                         e.*,
+                        en.observacion,
                         a.nombre as aspecto_nombre,
                         d.nombre as dimension_nombre,
                         f.nombre as ficha_nombre
                     FROM evaluaciones e
+                    JOIN envios en ON e.envio_id = en.id
                     JOIN aspectos a ON e.aspecto_id = a.id
                     JOIN dimensiones d ON a.dimension_id = d.id
                     JOIN fichas f ON e.ficha_id = f.id
@@ -1087,14 +1202,53 @@ class EvaluacionModel:
             logger.error(f"Error obteniendo evaluaciones: {e}")
             return []
     
+    # Columnas de texto con pocos valores distintos en la tabla de hechos
+    COLUMNAS_CATEGORICAS = [
+        'curador', 'codigo_grupo', 'nombre_propuesta', 'modalidad', 'tipo',
+        'naturaleza', 'ficha', 'ficha_grupo', 'dimension', 'aspecto'
+    ]
+
     @staticmethod
-    def obtener_todas_dataframe() -> pd.DataFrame:
-        """Obtiene todas las evaluaciones en formato DataFrame."""
+    def compactar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convierte la tabla de hechos de evaluaciones a tipos compactos:
+        category para las columnas repetidas, int8 para el resultado (0-2)
+        y datetime para fecha_registro.
+
+        Los groupby sobre estas columnas deben usar observed=True para no
+        generar combinaciones de categorías sin filas.
+        """
+        for columna in EvaluacionModel.COLUMNAS_CATEGORICAS:
+            if columna in df.columns:
+                df[columna] = df[columna].astype('category')
+
+        if 'resultado' in df.columns:
+            df['resultado'] = df['resultado'].astype('int8')
+
+        if 'fecha_registro' in df.columns:
+            df['fecha_registro'] = pd.to_datetime(df['fecha_registro'], format='ISO8601', errors='coerce')
+
+        return df
+
+    @staticmethod
+    @cache_compartida(etiquetas=['evaluaciones:{db}', 'grupos:{db}', 'rubrica'])
+    def obtener_todas_dataframe(incluir_observaciones: bool = False, db_path: str = None) -> pd.DataFrame:
+        """
+        Obtiene todas las evaluaciones en formato DataFrame.
+        
+        Args:
+            incluir_observaciones: Si True, agrega la observación del envío a cada fila.
+                Los análisis no la necesitan y así evitan el JOIN y el texto repetido.
+            db_path: Base de datos del evento (por defecto la del evento actual)
+        """
         try:
-            with get_db_connection() as conn:
-                query = """
+            with get_db_connection(db_path) as conn:
+                columna_obs = "en.observacion," if incluir_observaciones else ""
+                join_obs = "LEFT JOIN envios en ON e.envio_id = en.id" if incluir_observaciones else ""
+                query = f"""
                     SELECT 
                         e.id,
+                        e.envio_id,
                         u.username as curador,
                         e.codigo_grupo,
                         g.nombre_propuesta,
@@ -1107,23 +1261,362 @@ class EvaluacionModel:
                         d.nombre as dimension,
                         a.nombre as aspecto,
                         e.resultado,
-                        e.observacion,
+                        {columna_obs}
                         e.fecha_registro
                     FROM evaluaciones e
                     LEFT JOIN usuarios u ON e.usuario_id = u.id
                     LEFT JOIN grupos g ON e.codigo_grupo = g.codigo
                     LEFT JOIN fichas f ON e.ficha_id = f.id
                     LEFT JOIN fichas fg ON g.ficha_id = fg.id
+                    {join_obs}
                     JOIN aspectos a ON e.aspecto_id = a.id
                     JOIN dimensiones d ON a.dimension_id = d.id
                     ORDER BY e.fecha_registro DESC
                 """
                 
                 df = pd.read_sql_query(query, conn)
-                return df
+                return EvaluacionModel.compactar_tipos(df)
                 
         except Exception as e:
+            # Se ejecuta en caché (quizá fuera de la sesión): el error viaja en attrs para la vista
             logger.error(f"Error obteniendo evaluaciones: {e}")
+            df = pd.DataFrame()
+            df.attrs['avisos'] = [('error', f"❌ Error cargando evaluaciones: {e.__cause__ or e}")]
+            return df
+    
+    @staticmethod
+    def sumas_por_curador(db_path: str = None) -> pd.DataFrame:
+        """
+        Suma y cantidad de resultados de cada curador en cada grupo y ficha
+        (la unidad que se remuestrea en los intervalos de confianza).
+        
+        Args:
+            db_path: Base de datos del evento (por defecto la del evento actual)
+        """
+        try:
+            with get_db_connection(db_path) as conn:
+                query = """
+                    SELECT 
+                        e.codigo_grupo,
+                        g.nombre_propuesta,
+                        g.tamano,
+                        f.codigo as ficha_codigo,
+                        e.usuario_id,
+                        SUM(e.resultado) as suma,
+                        COUNT(*) as cantidad
+                    FROM evaluaciones e
+                    JOIN grupos g ON e.codigo_grupo = g.codigo
+                    JOIN fichas f ON e.ficha_id = f.id
+                    GROUP BY e.codigo_grupo, f.id, e.usuario_id
+                    ORDER BY e.codigo_grupo, f.codigo, e.usuario_id
+                """
+                return pd.read_sql_query(query, conn)
+                
+        except Exception as e:
+            logger.error(f"Error obteniendo sumas por curador: {e}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def obtener_observaciones(codigo_grupo: str = None) -> pd.DataFrame:
+        """Obtiene las observaciones cualitativas (una por envío), opcionalmente de un grupo."""
+        try:
+            with get_db_connection() as conn:
+                query = """
+                    SELECT 
+                        en.id as envio_id,
+                        u.username as curador,
+                        en.codigo_grupo,
+                        f.nombre as ficha,
+                        en.observacion,
+                        en.fecha_registro
+                    FROM envios en
+                    LEFT JOIN usuarios u ON en.usuario_id = u.id
+                    LEFT JOIN fichas f ON en.ficha_id = f.id
+                    WHERE (? IS NULL OR en.codigo_grupo = ?)
+                    ORDER BY en.fecha_registro DESC
+                """
+                
+                df = pd.read_sql_query(query, conn, params=(codigo_grupo, codigo_grupo))
+                return df
+                
+        except Exception as e:
+            logger.error(f"Error obteniendo observaciones: {e}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def _consulta_fts(texto: str) -> str:
+        """
+        Convierte el texto del buscador en una consulta FTS5: cada palabra se
+        busca como prefijo y todas deben aparecer (las comillas evitan que la
+        sintaxis de FTS5 escrita por el usuario produzca errores).
+        """
+        return " ".join(EvaluacionModel._terminos_fts(texto))
+    
+    @staticmethod
+    def _terminos_fts(texto: str) -> List[str]:
+        """Cada palabra del buscador como término FTS5 de prefijo entre comillas."""
+        return ['"' + palabra + '"*' for palabra in re.findall(r"\w+", texto or "")]
+    
+    @staticmethod
+    def _fts_disponible(cursor) -> bool:
+        """Indica si la base de datos tiene el índice de texto completo."""
+        cursor.execute(
+            "SELECT COUNT(*) = 2 FROM sqlite_master WHERE name IN ('evaluaciones_fts', 'envios_fts')"
+        )
+        return bool(cursor.fetchone()[0])
+    
+    # Un término coincide en los campos de la evaluación o en la observación de su envío
+    _CONDICION_FTS = """(
+                e.id IN (SELECT rowid FROM evaluaciones_fts WHERE evaluaciones_fts MATCH ?)
+                OR e.envio_id IN (SELECT rowid FROM envios_fts WHERE envios_fts MATCH ?)
+            )"""
+    
+    @staticmethod
+    def _filtros_busqueda(texto: str = None, resultado: int = None,
+                          usar_fts: bool = False) -> Tuple[str, list]:
+        """Construye la cláusula WHERE (y sus parámetros) del buscador de evaluaciones."""
+        condiciones = []
+        params = []
+        
+        if texto and usar_fts:
+            # Todas las palabras deben aparecer, en la evaluación o en su observación
+            for termino in EvaluacionModel._terminos_fts(texto):
+                condiciones.append(EvaluacionModel._CONDICION_FTS)
+                params.extend([termino, termino])
+        elif texto:
+            patron = f"%{texto.strip()}%"
+            condiciones.append("""(
+                g.nombre_propuesta LIKE ? OR u.username LIKE ? OR d.nombre LIKE ?
+                OR a.nombre LIKE ? OR fg.nombre LIKE ? OR e.codigo_grupo LIKE ?
+            )""")
+            params.extend([patron] * 6)
+        
+        if resultado is not None:
+            condiciones.append("e.resultado = ?")
+            params.append(resultado)
+        
+        where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+        return where, params
+    
+    # Tablas comunes del buscador de evaluaciones
+    _JOINS_BUSQUEDA = """
+                    FROM evaluaciones e
+                    LEFT JOIN usuarios u ON e.usuario_id = u.id
+                    LEFT JOIN grupos g ON e.codigo_grupo = g.codigo
+                    LEFT JOIN fichas fg ON g.ficha_id = fg.id
+                    JOIN aspectos a ON e.aspecto_id = a.id
+                    JOIN dimensiones d ON a.dimension_id = d.id
+    """
+    
+    @staticmethod
+    def _where_busqueda(cursor, texto: str = None, resultado: int = None) -> Tuple[str, list]:
+        """Filtros del buscador usando el índice FTS5 cuando la base de datos lo tiene."""
+        if texto and not EvaluacionModel._consulta_fts(texto):
+            texto = None
+        
+        usar_fts = bool(texto) and EvaluacionModel._fts_disponible(cursor)
+        return EvaluacionModel._filtros_busqueda(texto, resultado, usar_fts)
+    
+    @staticmethod
+    def _consulta_busqueda(cursor, texto: str = None, resultado: int = None,
+                           descendente: bool = True, despues_de: Tuple[str, int] = None) -> Tuple[str, list]:
+        """
+        Construye la consulta de filas del buscador (sin LIMIT) y sus parámetros.
+        
+        Returns:
+            Tupla (query, parámetros)
+        """
+        where, params = EvaluacionModel._where_busqueda(cursor, texto, resultado)
+        
+        # Condición de cursor sobre (fecha_registro, id)
+        comparador = "<" if descendente else ">"
+        direccion = "DESC" if descendente else "ASC"
+        if despues_de is not None:
+            where += (" AND " if where else "WHERE ") + f"(e.fecha_registro, e.id) {comparador} (?, ?)"
+            params.extend(despues_de)
+        
+        query = f"""
+                    SELECT 
+                        e.id,
+                        u.username as curador,
+                        e.codigo_grupo,
+                        g.nombre_propuesta,
+                        fg.nombre as ficha_grupo,
+                        g.modalidad,
+                        d.nombre as dimension,
+                        a.nombre as aspecto,
+                        e.resultado,
+                        en.observacion,
+                        e.fecha_registro
+                    {EvaluacionModel._JOINS_BUSQUEDA}
+                    LEFT JOIN envios en ON e.envio_id = en.id
+                    {where}
+                    ORDER BY e.fecha_registro {direccion}, e.id {direccion}
+        """
+        return query, params
+    
+    @staticmethod
+    def buscar_pagina(texto: str = None, resultado: int = None, descendente: bool = True,
+                      despues_de: Tuple[str, int] = None, limite: int = 50,
+                      db_path: str = None) -> Tuple[pd.DataFrame, int, Optional[Tuple[str, int]]]:
+        """
+        Obtiene una página de evaluaciones filtrada y ordenada en SQL (paginación por cursor).
+        
+        Args:
+            texto: Búsqueda en grupo, ficha, curador, dimensión, aspecto y observación
+                (índice FTS5; LIKE si la base de datos no lo tiene)
+            resultado: Filtrar por resultado (0, 1, 2)
+            descendente: True = más recientes primero
+            despues_de: Cursor (fecha_registro, id) de la última fila de la página anterior
+            limite: Filas por página
+            db_path: Base de datos a consultar (por defecto la del evento actual)
+            
+        Returns:
+            Tupla (DataFrame de la página, total de filas del filtro, cursor de la página siguiente o None)
+        """
+        try:
+            with get_db_connection(db_path) as conn:
+                cursor = conn.cursor()
+                
+                where, params = EvaluacionModel._where_busqueda(cursor, texto, resultado)
+                cursor.execute(f"SELECT COUNT(*) {EvaluacionModel._JOINS_BUSQUEDA} {where}", params)
+                total = cursor.fetchone()[0]
+                
+                query, params = EvaluacionModel._consulta_busqueda(
+                    cursor, texto, resultado, descendente, despues_de
+                )
+                # Se pide una fila extra para saber si hay página siguiente
+                df = pd.read_sql_query(f"{query} LIMIT ?", conn, params=params + [limite + 1])
+            
+            siguiente = None
+            if len(df) > limite:
+                df = df.iloc[:limite]
+                ultima = df.iloc[-1]
+                siguiente = (ultima['fecha_registro'], int(ultima['id']))
+            
+            return df, total, siguiente
+            
+        except Exception as e:
+            logger.error(f"Error buscando evaluaciones: {e}")
+            return pd.DataFrame(), 0, None
+    
+    @staticmethod
+    def iterar_busqueda(texto: str = None, resultado: int = None, descendente: bool = True,
+                        tamano_lote: int = 5000, db_path: str = None) -> Iterator[pd.DataFrame]:
+        """
+        Recorre todas las evaluaciones del filtro en lotes leídos del cursor,
+        sin cargar el resultado completo en memoria (para exportaciones).
+        
+        Yields:
+            DataFrames de como máximo tamano_lote filas
+        """
+        try:
+            with get_db_connection(db_path) as conn:
+                query, params = EvaluacionModel._consulta_busqueda(
+                    conn.cursor(), texto, resultado, descendente
+                )
+                yield from pd.read_sql_query(query, conn, params=params, chunksize=tamano_lote)
+                
+        except Exception as e:
+            # Se propaga: una exportación truncada no debe publicarse ni quedar en caché
+            logger.error(f"Error recorriendo evaluaciones: {e}")
+            raise
+    
+    @staticmethod
+    def buscar_evaluaciones(texto: str, filtros: Dict = None, limite: int = 200,
+                            db_path: str = None) -> pd.DataFrame:
+        """
+        Búsqueda de texto completo ordenada por relevancia (bm25), sin distinguir tildes.
+        
+        Args:
+            texto: Palabras a buscar (cada una como prefijo, todas obligatorias)
+            filtros: Filtros exactos opcionales: codigo_grupo, usuario_id, ficha_id, resultado
+            limite: Máximo de resultados
+            db_path: Base de datos a consultar (por defecto la del evento actual)
+            
+        Returns:
+            DataFrame con las evaluaciones encontradas y su columna 'relevancia'
+        """
+        try:
+            consulta = EvaluacionModel._consulta_fts(texto)
+            if not consulta:
+                return pd.DataFrame()
+            
+            condiciones = []
+            params = []
+            for columna in ('codigo_grupo', 'usuario_id', 'ficha_id', 'resultado'):
+                valor = (filtros or {}).get(columna)
+                if valor is not None:
+                    condiciones.append(f"e.{columna} = ?")
+                    params.append(valor)
+            filtro_sql = "".join(f" AND {condicion}" for condicion in condiciones)
+            
+            with get_db_connection(db_path) as conn:
+                cursor = conn.cursor()
+                
+                if EvaluacionModel._fts_disponible(cursor):
+                    # Relevancia: bm25 de la evaluación más bm25 de la observación de su envío
+                    where, params_fts = EvaluacionModel._filtros_busqueda(texto, usar_fts=True)
+                    query = f"""
+                        SELECT 
+                            e.id,
+                            u.username as curador,
+                            e.codigo_grupo,
+                            g.nombre_propuesta,
+                            d.nombre as dimension,
+                            a.nombre as aspecto,
+                            e.resultado,
+                            en.observacion,
+                            e.fecha_registro,
+                            -(COALESCE(fe.puntaje, 0) + COALESCE(fo.puntaje, 0)) as relevancia
+                        {EvaluacionModel._JOINS_BUSQUEDA}
+                        LEFT JOIN envios en ON e.envio_id = en.id
+                        LEFT JOIN (
+                            SELECT rowid AS id, bm25(evaluaciones_fts) AS puntaje
+                            FROM evaluaciones_fts WHERE evaluaciones_fts MATCH ?
+                        ) fe ON fe.id = e.id
+                        LEFT JOIN (
+                            SELECT rowid AS id, bm25(envios_fts) AS puntaje
+                            FROM envios_fts WHERE envios_fts MATCH ?
+                        ) fo ON fo.id = e.envio_id
+                        {where}{filtro_sql}
+                        ORDER BY relevancia DESC
+                        LIMIT ?
+                    """
+                    cualquiera = " OR ".join(EvaluacionModel._terminos_fts(texto))
+                    params = [cualquiera, cualquiera] + params_fts + params
+                else:
+                    # Sin FTS5: búsqueda LIKE ordenada por fecha
+                    where, params_like = EvaluacionModel._filtros_busqueda(texto)
+                    query = f"""
+                        SELECT 
+                            e.id,
+                            u.username as curador,
+                            e.codigo_grupo,
+                            g.nombre_propuesta,
+                            d.nombre as dimension,
+                            a.nombre as aspecto,
+                            e.resultado,
+                            en.observacion,
+                            e.fecha_registro,
+                            NULL as relevancia
+                        FROM evaluaciones e
+                        LEFT JOIN usuarios u ON e.usuario_id = u.id
+                        LEFT JOIN grupos g ON e.codigo_grupo = g.codigo
+                        LEFT JOIN fichas fg ON g.ficha_id = fg.id
+                        JOIN aspectos a ON e.aspecto_id = a.id
+                        JOIN dimensiones d ON a.dimension_id = d.id
+                        LEFT JOIN envios en ON e.envio_id = en.id
+                        {where}{filtro_sql}
+                        ORDER BY e.fecha_registro DESC
+                        LIMIT ?
+                    """
+                    params = params_like + params
+                
+                return pd.read_sql_query(query, conn, params=params + [limite])
+                
+        except Exception as e:
+            logger.error(f"Error en búsqueda de texto completo: {e}")
             return pd.DataFrame()
     
     @staticmethod
@@ -1138,9 +1631,10 @@ class EvaluacionModel:
                         d.nombre as dimension,
                         a.nombre as aspecto,
                         e.resultado,
-                        e.observacion,
+                        en.observacion,
                         e.fecha_registro
                     FROM evaluaciones e
+                    JOIN envios en ON e.envio_id = en.id
                     JOIN usuarios u ON e.usuario_id = u.id
                     JOIN fichas f ON e.ficha_id = f.id
                     JOIN aspectos a ON e.aspecto_id = a.id
@@ -1171,9 +1665,10 @@ class EvaluacionModel:
                         d.nombre as dimension,
                         a.nombre as aspecto,
                         e.resultado,
-                        e.observacion,
+                        en.observacion,
                         e.fecha_registro
                     FROM evaluaciones e
+                    JOIN envios en ON e.envio_id = en.id
                     LEFT JOIN usuarios u ON e.usuario_id = u.id
                     LEFT JOIN grupos g ON e.codigo_grupo = g.codigo
                     JOIN aspectos a ON e.aspecto_id = a.id
@@ -1219,6 +1714,279 @@ class EvaluacionModel:
             return pd.DataFrame()
 
 
+# ═══════════════════════════════════════════════════════════════════
+# MODELO: Asignaciones
+# ═══════════════════════════════════════════════════════════════════
+
+class AsignacionModel:
+    """Operaciones sobre asignaciones curador-grupo y conflictos de interés"""
+    
+    @staticmethod
+    def obtener_existentes(incluir_pendientes: bool = True) -> List[Tuple[int, str]]:
+        """
+        Pares (usuario_id, codigo_grupo) que ya cuentan para la cobertura:
+        evaluaciones registradas y asignaciones vigentes.
+        """
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                filtro_estado = "" if incluir_pendientes else "WHERE estado = 'completada'"
+                cursor.execute(f"""
+                    SELECT DISTINCT usuario_id, codigo_grupo FROM evaluaciones
+                    UNION
+                    SELECT usuario_id, codigo_grupo FROM asignaciones {filtro_estado}
+                """)
+                return [(row[0], row[1]) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error obteniendo asignaciones existentes: {e}")
+            return []
+    
+    @staticmethod
+    def guardar_plan(asignaciones: List[Tuple[int, str, int]], reemplazar_pendientes: bool = False) -> Tuple[int, Optional[str]]:
+        """
+        Persiste un plan de asignaciones en una sola transacción.
+        
+        Args:
+            asignaciones: Tuplas (usuario_id, codigo_grupo, ficha_id)
+            reemplazar_pendientes: Si True, elimina antes las asignaciones pendientes
+            
+        Returns:
+            Tupla (asignaciones_insertadas, mensaje_error)
+        """
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                if reemplazar_pendientes:
+                    cursor.execute("DELETE FROM asignaciones WHERE estado = 'pendiente'")
+                
+                antes = conn.total_changes
+                cursor.executemany("""
+                    INSERT OR IGNORE INTO asignaciones (usuario_id, codigo_grupo, ficha_id)
+                    VALUES (?, ?, ?)
+                """, asignaciones)
+                insertadas = conn.total_changes - antes
+                
+            logger.info(f"Plan de asignaciones guardado: {insertadas} asignaciones")
+            return insertadas, None
+        except Exception as e:
+            logger.error(f"Error guardando plan de asignaciones: {e}")
+            return 0, f"Error: {str(e)}"
+    
+    @staticmethod
+    def obtener_pendientes_curador(usuario_id: int) -> List[Dict]:
+        """Cola de grupos pendientes de un curador."""
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT 
+                        a.codigo_grupo,
+                        g.nombre_propuesta,
+                        g.modalidad,
+                        f.nombre as ficha_nombre,
+                        a.fecha_asignacion
+                    FROM asignaciones a
+                    JOIN grupos g ON a.codigo_grupo = g.codigo
+                    JOIN fichas f ON a.ficha_id = f.id
+                    WHERE a.usuario_id = ? AND a.estado = 'pendiente'
+                    ORDER BY a.codigo_grupo
+                """, (usuario_id,))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error obteniendo asignaciones pendientes: {e}")
+            return []
+    
+    @staticmethod
+    def marcar_completada(usuario_id: int, codigo_grupo: str) -> bool:
+        """Marca como completada la asignación de un curador a un grupo."""
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE asignaciones SET estado = 'completada'
+                    WHERE usuario_id = ? AND codigo_grupo = ?
+                """, (usuario_id, codigo_grupo))
+            return True
+        except Exception as e:
+            logger.error(f"Error marcando asignación completada: {e}")
+            return False
+    
+    @staticmethod
+    def obtener_resumen_dataframe() -> pd.DataFrame:
+        """Carga de trabajo por curador (pendientes y completadas)."""
+        try:
+            with get_db_connection() as conn:
+                query = """
+                    SELECT 
+                        u.username as curador,
+                        SUM(CASE WHEN a.estado = 'pendiente' THEN 1 ELSE 0 END) as pendientes,
+                        SUM(CASE WHEN a.estado = 'completada' THEN 1 ELSE 0 END) as completadas,
+                        COUNT(*) as total
+                    FROM asignaciones a
+                    JOIN usuarios u ON a.usuario_id = u.id
+                    GROUP BY u.id, u.username
+                    ORDER BY total DESC, u.username
+                """
+                return pd.read_sql_query(query, conn)
+        except Exception as e:
+            logger.error(f"Error obteniendo resumen de asignaciones: {e}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def registrar_conflicto(usuario_id: int, codigo_grupo: str, motivo: str = None) -> Tuple[bool, Optional[str]]:
+        """Excluye a un curador de evaluar un grupo."""
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO conflictos_curador (usuario_id, codigo_grupo, motivo)
+                    VALUES (?, ?, ?)
+                """, (usuario_id, codigo_grupo, motivo))
+                cursor.execute("""
+                    DELETE FROM asignaciones
+                    WHERE usuario_id = ? AND codigo_grupo = ? AND estado = 'pendiente'
+                """, (usuario_id, codigo_grupo))
+            return True, None
+        except Exception as e:
+            logger.error(f"Error registrando conflicto: {e}")
+            return False, f"Error: {str(e)}"
+    
+    @staticmethod
+    def eliminar_conflicto(conflicto_id: int) -> Tuple[bool, Optional[str]]:
+        """Elimina un conflicto de interés."""
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM conflictos_curador WHERE id = ?", (conflicto_id,))
+            return True, None
+        except Exception as e:
+            logger.error(f"Error eliminando conflicto: {e}")
+            return False, f"Error: {str(e)}"
+    
+    @staticmethod
+    def obtener_conflictos() -> List[Dict]:
+        """Lista de conflictos de interés registrados."""
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT c.id, c.usuario_id, u.username, c.codigo_grupo, c.motivo, c.fecha_registro
+                    FROM conflictos_curador c
+                    JOIN usuarios u ON c.usuario_id = u.id
+                    ORDER BY u.username, c.codigo_grupo
+                """)
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error obteniendo conflictos: {e}")
+            return []
+
+
+# ═══════════════════════════════════════════════════════════════════
+# MODELO: Snapshots de premios
+# ═══════════════════════════════════════════════════════════════════
+
+class PremiosSnapshotModel:
+    """Resultados de premios persistidos por versión de los datos de entrada"""
+    
+    COLUMNAS = [
+        'categoria', 'codigo_grupo', 'nombre_propuesta', 'modalidad', 'tamano',
+        'ficha_codigo', 'ficha_nombre', 'promedio_fin', 'promedio_gran',
+        'nota_consolidada', 'estado', 'participacion', 'umbral_congo', 'premio', 'ranking'
+    ]
+    
+    @staticmethod
+    def obtener(hash_entradas: str, db_path: str = None) -> pd.DataFrame:
+        """
+        Premios calculados para una versión de las entradas.
+        
+        Returns:
+            DataFrame con COLUMNAS + fecha_registro (vacío si no hay snapshot)
+        """
+        try:
+            with get_db_connection(db_path) as conn:
+                query = f"""
+                    SELECT {', '.join(PremiosSnapshotModel.COLUMNAS)}, fecha_registro
+                    FROM premios_snapshot
+                    WHERE hash_entradas = ?
+                    ORDER BY categoria, ranking
+                """
+                return pd.read_sql_query(query, conn, params=(hash_entradas,))
+        except Exception as e:
+            logger.error(f"Error obteniendo snapshot de premios: {e}")
+            return pd.DataFrame()
+    
+    @staticmethod
+    def guardar(df_premios: pd.DataFrame, hash_entradas: str, db_path: str = None,
+                retencion: int = None) -> bool:
+        """
+        Guarda un cálculo de premios, reemplazando el anterior de la misma versión.
+        
+        Se conservan solo las últimas `retencion` versiones
+        (por defecto config.premios_snapshot_retencion).
+        """
+        retencion = retencion or config.premios_snapshot_retencion
+        try:
+            filas = (df_premios
+                .reindex(columns=PremiosSnapshotModel.COLUMNAS)
+                .astype(object)
+            )
+            filas = filas.where(filas.notna(), None)
+            
+            with get_db_connection(db_path) as conn:
+                conn.execute("DELETE FROM premios_snapshot WHERE hash_entradas = ?", (hash_entradas,))
+                conn.executemany(
+                    f"""
+                    INSERT INTO premios_snapshot (hash_entradas, {', '.join(PremiosSnapshotModel.COLUMNAS)})
+                    VALUES (?, {', '.join('?' for _ in PremiosSnapshotModel.COLUMNAS)})
+                    """,
+                    ((hash_entradas, *fila) for fila in filas.itertuples(index=False, name=None))
+                )
+                conn.execute("""
+                    DELETE FROM premios_snapshot
+                    WHERE hash_entradas NOT IN (
+                        SELECT hash_entradas FROM premios_snapshot
+                        GROUP BY hash_entradas
+                        ORDER BY MAX(id) DESC
+                        LIMIT ?
+                    )
+                """, (retencion,))
+            
+            logger.info(f"Snapshot de premios guardado: {len(filas)} grupos ({hash_entradas[:12]})")
+            return True
+        except Exception as e:
+            logger.error(f"Error guardando snapshot de premios: {e}")
+            return False
+    
+    @staticmethod
+    def eliminar(hash_entradas: str, db_path: str = None) -> bool:
+        """Elimina el cálculo de una versión (para forzar que se recalcule)."""
+        try:
+            with get_db_connection(db_path) as conn:
+                conn.execute("DELETE FROM premios_snapshot WHERE hash_entradas = ?", (hash_entradas,))
+            return True
+        except Exception as e:
+            logger.error(f"Error eliminando snapshot de premios: {e}")
+            return False
+    
+    @staticmethod
+    def listar(db_path: str = None) -> pd.DataFrame:
+        """Historial de cálculos: versión, fecha y número de grupos."""
+        try:
+            with get_db_connection(db_path) as conn:
+                return pd.read_sql_query("""
+                    SELECT hash_entradas,
+                           MAX(fecha_registro) as fecha_registro,
+                           COUNT(*) as grupos,
+                           SUM(premio = 'CONGO DE ORO') as congos_oro
+                    FROM premios_snapshot
+                    GROUP BY hash_entradas
+                    ORDER BY MAX(id) DESC
+                """, conn)
+        except Exception as e:
+            logger.error(f"Error listando snapshots de premios: {e}")
+            return pd.DataFrame()
+
+
 # ═══════════════════════════════════════════════════════════════════
 # MODELO: Logs
 # ═══════════════════════════════════════════════════════════════════
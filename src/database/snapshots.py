@@ -0,0 +1,238 @@
+"""
+Snapshots programados y restauración a un momento dado
+
+Un hilo en segundo plano guarda cada SNAPSHOT_INTERVALO_MIN minutos una copia
+completa de la base de datos (con la API de backup), solo si hubo cambios.
+Entre snapshots, los triggers de journal_cambios registran cada cambio de
+grupos, envios y evaluaciones, de modo que un snapshot más el journal
+posterior reconstruyen la base de datos en cualquier momento.
+"""
+import json
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+from src.config import config, BACKUPS_DIR
+from src.database.backup import copiar_base_datos, verificar_integridad
+from src.database.connection import get_db_connection
+from src.database.init_db import TABLAS_JOURNAL
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS_DIR = BACKUPS_DIR / "snapshots"
+
+
+def _ultimo_cambio(conn) -> int:
+    """
+    Id del último registro del journal, aunque la retención ya lo haya
+    eliminado (AUTOINCREMENT guarda la secuencia en sqlite_sequence).
+    """
+    fila = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'journal_cambios'"
+    ).fetchone()
+    return fila[0] if fila else 0
+
+
+def hay_cambios_pendientes(db_path: str = None) -> bool:
+    """Indica si hubo cambios desde el último snapshot."""
+    with get_db_connection(db_path) as conn:
+        ultimo_snapshot = conn.execute(
+            "SELECT COALESCE(MAX(ultimo_cambio_id), -1) FROM snapshots"
+        ).fetchone()[0]
+        return _ultimo_cambio(conn) != ultimo_snapshot
+
+
+def crear_snapshot(db_path: str = None) -> Tuple[Optional[Path], Optional[str]]:
+    """
+    Guarda un snapshot completo y verificado y aplica la política de retención.
+
+    Returns:
+        Tupla (ruta del snapshot, mensaje de error). Uno de los dos es None.
+    """
+    db_path = Path(db_path or config.db_path)
+    SNAPSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+    destino = SNAPSHOTS_DIR / f"snapshot_{db_path.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.db"
+
+    try:
+        copiar_base_datos(str(destino), str(db_path))
+
+        valida, resultado = verificar_integridad(str(destino))
+        if not valida:
+            destino.unlink()
+            return None, f"El snapshot no pasó la verificación de integridad: {resultado}"
+
+        # El journal incluido en la copia marca desde dónde hay que reaplicar cambios
+        copia = sqlite3.connect(destino)
+        try:
+            ultimo_cambio_id = _ultimo_cambio(copia)
+        finally:
+            copia.close()
+
+        with get_db_connection(str(db_path)) as conn:
+            conn.execute(
+                "INSERT INTO snapshots (ruta, ultimo_cambio_id) VALUES (?, ?)",
+                (str(destino), ultimo_cambio_id)
+            )
+
+        logger.info(f"📸 Snapshot creado: {destino.name} (journal hasta #{ultimo_cambio_id})")
+        aplicar_retencion(str(db_path))
+        return destino, None
+
+    except Exception as e:
+        logger.exception(f"❌ Error creando snapshot: {e}")
+        if destino.exists():
+            destino.unlink()
+        return None, str(e)
+
+
+def aplicar_retencion(db_path: str = None, retencion: int = None) -> None:
+    """
+    Conserva solo los últimos `retencion` snapshots y descarta el journal
+    anterior al más antiguo conservado (ya no se puede reaplicar sobre nada).
+    """
+    retencion = retencion or config.snapshot_retencion
+
+    with get_db_connection(db_path) as conn:
+        antiguos = conn.execute(
+            "SELECT id, ruta FROM snapshots ORDER BY id DESC LIMIT -1 OFFSET ?",
+            (retencion,)
+        ).fetchall()
+
+        for snapshot in antiguos:
+            try:
+                Path(snapshot['ruta']).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"No se pudo eliminar {snapshot['ruta']}: {e}")
+            conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot['id'],))
+
+        conn.execute("""
+            DELETE FROM journal_cambios
+            WHERE id <= (SELECT COALESCE(MIN(ultimo_cambio_id), 0) FROM snapshots)
+        """)
+
+
+def _aplicar_cambio(conn, cambio) -> None:
+    """Reaplica un registro del journal sobre una copia de la base de datos."""
+    clave, columnas = TABLAS_JOURNAL[cambio['tabla']]
+
+    if cambio['operacion'] == 'DELETE':
+        conn.execute(f"DELETE FROM {cambio['tabla']} WHERE {clave} = ?", (cambio['clave'],))
+        return
+
+    datos = json.loads(cambio['datos'])
+    valores = [datos.get(columna) for columna in columnas]
+
+    if cambio['operacion'] == 'INSERT':
+        marcadores = ", ".join("?" for _ in columnas)
+        conn.execute(
+            f"INSERT INTO {cambio['tabla']} ({', '.join(columnas)}) VALUES ({marcadores})",
+            valores
+        )
+    else:
+        asignaciones = ", ".join(f"{columna} = ?" for columna in columnas)
+        conn.execute(
+            f"UPDATE {cambio['tabla']} SET {asignaciones} WHERE {clave} = ?",
+            valores + [cambio['clave']]
+        )
+
+
+def restaurar_a(momento: str, destino: str, db_path: str = None) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Reconstruye en `destino` la base de datos tal como estaba en `momento`:
+    copia el último snapshot anterior y reaplica el journal hasta ese instante.
+    La base de datos en uso no se modifica.
+
+    Args:
+        momento: Fecha y hora UTC ('YYYY-MM-DD HH:MM:SS')
+        destino: Ruta del archivo .db restaurado
+        db_path: Base de datos con el journal (por defecto la del evento actual)
+
+    Returns:
+        Tupla (cambios reaplicados, mensaje de error). Uno de los dos es None.
+    """
+    try:
+        with get_db_connection(db_path) as conn:
+            snapshot = conn.execute("""
+                SELECT ruta, ultimo_cambio_id FROM snapshots
+                WHERE fecha_registro <= ?
+                ORDER BY id DESC LIMIT 1
+            """, (momento,)).fetchone()
+
+            if snapshot is None:
+                return None, "No hay snapshots anteriores a ese momento"
+            if not os.path.exists(snapshot['ruta']):
+                return None, f"El archivo del snapshot no existe: {snapshot['ruta']}"
+
+            cambios = conn.execute("""
+                SELECT tabla, operacion, clave, datos FROM journal_cambios
+                WHERE id > ? AND fecha_registro <= ?
+                ORDER BY id
+            """, (snapshot['ultimo_cambio_id'], momento)).fetchall()
+
+        copiar_base_datos(destino, snapshot['ruta'])
+
+        copia = sqlite3.connect(destino)
+        copia.row_factory = sqlite3.Row
+        try:
+            with copia:
+                for cambio in cambios:
+                    _aplicar_cambio(copia, cambio)
+        finally:
+            copia.close()
+
+        logger.info(f"⏪ Base de datos restaurada a {momento}: {len(cambios)} cambios reaplicados")
+        return len(cambios), None
+
+    except Exception as e:
+        logger.exception(f"❌ Error restaurando a {momento}: {e}")
+        return None, str(e)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SERVICIO EN SEGUNDO PLANO
+# ═══════════════════════════════════════════════════════════════════
+
+class ServicioSnapshots(threading.Thread):
+    """Hilo que crea un snapshot cada `intervalo_min` minutos si hubo cambios"""
+
+    def __init__(self, intervalo_min: float, db_path: str = None):
+        super().__init__(name="servicio-snapshots", daemon=True)
+        self.intervalo_min = intervalo_min
+        self.db_path = db_path
+        self._detener = threading.Event()
+
+    def run(self):
+        logger.info(f"Servicio de snapshots iniciado (cada {self.intervalo_min} min)")
+        while not self._detener.wait(self.intervalo_min * 60):
+            try:
+                if hay_cambios_pendientes(self.db_path):
+                    crear_snapshot(self.db_path)
+            except Exception as e:
+                logger.exception(f"❌ Error en el servicio de snapshots: {e}")
+
+    def detener(self):
+        self._detener.set()
+
+
+_servicio: Optional[ServicioSnapshots] = None
+_lock_servicio = threading.Lock()
+
+
+def iniciar_servicio_snapshots() -> Optional[ServicioSnapshots]:
+    """
+    Inicia el servicio una sola vez por proceso (Streamlit reejecuta main.py en
+    cada interacción). No hace nada si SNAPSHOT_INTERVALO_MIN es 0.
+    """
+    global _servicio
+
+    if config.snapshot_intervalo_min <= 0:
+        return None
+
+    with _lock_servicio:
+        if _servicio is None or not _servicio.is_alive():
+            _servicio = ServicioSnapshots(config.snapshot_intervalo_min, str(config.db_path))
+            _servicio.start()
+        return _servicio
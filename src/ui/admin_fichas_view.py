@@ -10,6 +10,7 @@ from src.database.models import (
     FichaModel, DimensionModel, AspectoModel, 
     FichaDimensionModel, LogModel
 )
+from src.database.cache import invalidar
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +83,7 @@ def gestionar_fichas():
                                 f"Ficha: {ficha['codigo']}"
                             )
                             st.success("Ficha eliminada")
+                            invalidar('rubrica')
                             st.rerun()
                         else:
                             st.error(f"Error: {error}")
@@ -140,6 +142,7 @@ def gestionar_fichas():
                             f"Ficha: {nuevo_codigo} - {nuevo_nombre}"
                         )
                         st.success(f"✅ Ficha '{nuevo_nombre}' creada exitosamente")
+                        invalidar('rubrica')
                         st.rerun()
                     else:
                         st.error("❌ Error al crear la ficha (posiblemente el código ya existe)")
@@ -189,6 +192,7 @@ def gestionar_dimensiones():
                                 f"Dimensión: {dim['codigo']}"
                             )
                             st.success("Dimensión eliminada")
+                            invalidar('rubrica')
                             st.rerun()
                         else:
                             st.error(f"Error: {error}")
@@ -264,6 +268,7 @@ def gestionar_dimensiones():
                             f"Dimensión: {nuevo_codigo_dim} - {nuevo_nombre_dim}"
                         )
                         st.success(f"✅ Dimensión '{nuevo_nombre_dim}' creada exitosamente")
+                        invalidar('rubrica')
                         st.rerun()
                     else:
                         st.error("❌ Error al crear la dimensión")
@@ -334,6 +339,7 @@ def gestionar_aspectos():
                                 f"Aspecto: {asp['nombre']}"
                             )
                             st.success("Aspecto eliminado")
+                            invalidar('rubrica')
                             st.rerun()
                         else:
                             st.error(f"Error: {error}")
@@ -402,6 +408,7 @@ def gestionar_aspectos():
                         f"Aspecto: {nuevo_nombre_asp} (Dimensión: {dim_seleccion.split(' - ')[0]})"
                     )
                     st.success(f"✅ Aspecto '{nuevo_nombre_asp}' creado exitosamente")
+                    invalidar('rubrica')
                     st.rerun()
                 else:
                     st.error("❌ Error al crear el aspecto")
@@ -470,6 +477,7 @@ def configurar_ficha_dimensiones():
                             f"Ficha: {ficha['codigo']}, Dimensión: {dim_rel['dimension_codigo']}"
                         )
                         st.success("Dimensión eliminada de la ficha")
+                        invalidar('rubrica')
                         st.rerun()
                     else:
                         st.error(f"Error: {error}")
@@ -529,6 +537,7 @@ def configurar_ficha_dimensiones():
                         f"Ficha: {ficha['codigo']}, Dimensión: {dim_agregar.split(' - ')[0]}"
                     )
                     st.success(f"✅ Dimensión '{dim_agregar}' agregada a la ficha")
+                    invalidar('rubrica')
                     st.rerun()
                 else:
                     st.error("❌ Error al agregar la dimensión")
@@ -6,15 +6,22 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 import logging
-from io import BytesIO
-from src.config import config
+from pathlib import Path
+from src.config import config, BACKUPS_DIR
 from src.database.models import EvaluacionModel, AspectoModel, FichaModel, FichaDimensionModel
+from src.database.backup import crear_backup, listar_backups
+from src.database.snapshots import crear_snapshot, restaurar_a
+from src.database.cache import invalidar, etiqueta
+from src.analytics.kernel import ResultadosAnaliticos, resultados_analiticos
+from src.analytics.indice_grupos import IndiceGrupos, indice_grupos
 from src.auth.authentication import crear_boton_logout
 from streamlit_option_menu import option_menu
 from .comite.congos_oro_view import mostrar_congos_oro
-from .comite.utils import estado_patrimonial, estado_patrimonial_texto
-from .comite.exports import generar_pdf_grupo, crear_backup_zip
-from .comite.dashboard import mostrar_dashboard, color_gradiente, barra_gradiente, cuadrado_color_estado, seleccionador_eventos
+from .comite.utils import estado_patrimonial, estado_patrimonial_texto, mostrar_avisos
+from .comite.exports import pdf_grupo_en_cache, generar_zip_informes, escribir_csv, escribir_xlsx, lotes_dataframe, boton_descarga_diferida, boton_descarga_local, version_datos, MIME_CSV, MIME_XLSX
+from .comite.evaluations import mostrar_evaluaciones_detalladas
+from .comite.charts import datos_grafico, resumen_boxplot, grafico_boxplot, resumen_histograma
+from .comite.dashboard import mostrar_dashboard, color_gradiente, estilo_columna_gradiente, barra_gradiente, cuadrado_color_estado, selector_evento, cargar_observaciones_desde_db
 
 logger = logging.getLogger(__name__)
 
@@ -23,18 +30,17 @@ import numpy as np
 
 
 
-def mostrar_informe_grupo(df_eval: pd.DataFrame, codigo_grupo: str):
+def mostrar_informe_grupo(indice: IndiceGrupos, codigo_grupo: str, db_path: str = None):
     """Muestra un informe detallado de un grupo específico"""
 
-    # Buscar grupo en evaluaciones
-    df_grupo = df_eval[df_eval['codigo_grupo'].str.upper() == codigo_grupo.upper()]
+    # Buscar grupo en el índice de evaluaciones
+    df_grupo = indice.grupo(codigo_grupo)
 
     if df_grupo.empty:
         st.error(f"❌ Grupo '{codigo_grupo}' no encontrado en las evaluaciones")
         # Mostrar sugerencias
         st.info("💡 Grupos disponibles:")
-        grupos_disponibles = df_eval['codigo_grupo'].unique()
-        st.dataframe(pd.DataFrame({'Códigos disponibles': sorted(grupos_disponibles)}), use_container_width=False)
+        st.dataframe(pd.DataFrame({'Códigos disponibles': indice.codigos}), use_container_width=False)
         return
 
     # Información básica del grupo
@@ -61,7 +67,7 @@ def mostrar_informe_grupo(df_eval: pd.DataFrame, codigo_grupo: str):
 
 
     df_dim_grupo = (df_grupo
-        .groupby('dimension', as_index=False)
+        .groupby('dimension', as_index=False, observed=True)
         .agg(
             promedio=('resultado', 'mean'),
             evaluaciones=('resultado', 'count'),
@@ -69,20 +75,12 @@ def mostrar_informe_grupo(df_eval: pd.DataFrame, codigo_grupo: str):
         )
         .sort_values('promedio', ascending=False)
     )
-    color_gradiente
-
-    def estilo_estado_dimension(row):
-        color = color_gradiente(row['promedio'])
-        return [
-            f'background-color: {color}'
-            if col == 'resultado_emoji' else ''
-            for col in row.index
-        ]
-    df_dim_grupo['resultado_emoji'] = df_dim_grupo['promedio'].apply(lambda x: '')
+
+    df_dim_grupo['resultado_emoji'] = ''
     st.dataframe(
         df_dim_grupo
             .style
-            .apply(estilo_estado_dimension, axis=1)
+            .apply(estilo_columna_gradiente, axis=None, col_valor='promedio', col_estado='resultado_emoji')
             .format({'promedio': '{:.2f}'}),
         use_container_width=False,
         hide_index=True,
@@ -100,28 +98,24 @@ def mostrar_informe_grupo(df_eval: pd.DataFrame, codigo_grupo: str):
 
 
     df_aspecto_grupo = (df_grupo
-        .groupby(['dimension', 'aspecto'], as_index=False)
+        .groupby(['dimension', 'aspecto'], as_index=False, observed=True)
         .agg(
             promedio=('resultado', 'mean'),
             evaluaciones=('resultado', 'count')
         )
         .sort_values(['dimension', 'promedio'], ascending=[True, False])
     )
-    def estilo_estado_aspecto(row):
-        color = color_gradiente(row['promedio'])
-        return [
-            f'background-color: {color}; text-align: center; font-weight: bold'
-            if col == 'resultado_emoji' else ''
-            for col in row.index
-        ]
-
     # Mapear resultados a emojis
-    df_aspecto_grupo['resultado_emoji'] = df_aspecto_grupo['promedio'].apply(lambda x: '')
+    df_aspecto_grupo['resultado_emoji'] = ''
 
     st.dataframe(
         df_aspecto_grupo[['dimension', 'aspecto', 'resultado_emoji', 'evaluaciones', 'promedio']]
             .style
-            .apply(estilo_estado_aspecto, axis=1)
+            .apply(
+                estilo_columna_gradiente, axis=None,
+                col_valor='promedio', col_estado='resultado_emoji',
+                css_extra='; text-align: center; font-weight: bold'
+            )
             .format({'promedio': '{:.2f}'}),
         use_container_width=True,
         hide_index=True,
@@ -136,8 +130,11 @@ def mostrar_informe_grupo(df_eval: pd.DataFrame, codigo_grupo: str):
     # Observaciones cualitativas
     st.subheader("💬 Observaciones Cualitativas")
 
-    # Obtener UNA observación por curador
-    observaciones_unicas = (df_grupo[df_grupo['observacion'].notna() & (df_grupo['observacion'].str.strip() != "")]
+    # Obtener UNA observación por curador (se cargan solo las del grupo)
+    df_observaciones = cargar_observaciones_desde_db(db_path or str(config.db_path), grupo_info['codigo_grupo'])
+    if df_observaciones.empty:
+        df_observaciones = pd.DataFrame(columns=['curador', 'observacion', 'fecha_registro'])
+    observaciones_unicas = (df_observaciones[df_observaciones['observacion'].notna() & (df_observaciones['observacion'].str.strip() != "")]
         .drop_duplicates(subset=['curador'], keep='first')
         .sort_values('fecha_registro', ascending=False)
     )
@@ -154,7 +151,7 @@ def mostrar_informe_grupo(df_eval: pd.DataFrame, codigo_grupo: str):
 
     with col_exp2:
         try:
-            pdf_buffer = generar_pdf_grupo(df_grupo)
+            pdf_buffer = pdf_grupo_en_cache(df_grupo, df_observaciones)
             st.download_button(
                 label="📄 Descargar Informe PDF",
                 data=pdf_buffer,
@@ -231,132 +228,38 @@ def mostrar_vista_comite():
     elif pagina == "Análisis por Grupos":
         mostrar_analisis_grupos(df_eval)
     elif pagina == "Análisis por Dimensión":
-        mostrar_analisis_dimensiones(df_eval)
+        mostrar_analisis_dimensiones(df_eval, resultados_analiticos())
     elif pagina == "Análisis por Aspecto":
-        mostrar_analisis_aspectos(df_eval)
+        mostrar_analisis_aspectos(df_eval, resultados_analiticos())
     elif pagina == "Análisis por Curador":
-        mostrar_analisis_curadores(df_eval)
+        mostrar_analisis_curadores(df_eval, resultados_analiticos())
     elif pagina == "Administración":
         mostrar_panel_admin()
     elif pagina == "Gestión de Usuarios":
         mostrar_gestion_usuarios(df_eval)
     elif pagina == "Análisis por Ficha":
-        mostrar_analisis_por_ficha(df_eval)
+        mostrar_analisis_por_ficha(resultados_analiticos())
     elif pagina == "Gestión de Fichas":
         from src.ui.admin_fichas_view import mostrar_gestion_fichas
         mostrar_gestion_fichas()
 
 
 
-def mostrar_evaluaciones_detalladas(df_eval: pd.DataFrame) -> None:
-    """Tabla detallada de todas las evaluaciones"""
-    df_eval =  seleccionador_eventos()
-    st.header("📋 Evaluaciones Detalladas")
-    st.caption("Vista completa de todas las evaluaciones por aspecto")
-    
-    # Opciones de visualización
-    col_opt1, col_opt2, col_opt3 = st.columns([3, 1, 1])
-    
-    with col_opt1:
-        buscar = st.text_input(
-            "🔍 Buscar", 
-            placeholder="Buscar por grupo, curador, dimensión o aspecto..."
-        )
-    
-    with col_opt2:
-        
-        filtro_resultado = st.selectbox(
-            "Filtrar por resultado",
-            ["Todos", "🟢 Fortaleza (2)", "🟡 Oportunidad (1)", "🔴 Riesgo (0)"]
-        )
-    
-    with col_opt3:
-        st.markdown("<br>", unsafe_allow_html=True)
-        # Placeholder for export button, will be added after filtering
-    
-    # Filtrar
-    df_mostrar = df_eval.copy()
-    
-    if buscar:
-        df_mostrar = df_mostrar[
-            df_mostrar['nombre_propuesta'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['curador'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['dimension'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['aspecto'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['ficha_grupo'].astype(str).str.contains(buscar, case=False, na=False)
-        ]
-    
-    if filtro_resultado != "Todos":
-        resultado_map = {
-            "🟢 Fortaleza (2)": 2,
-            "🟡 Oportunidad (1)": 1,
-            "🔴 Riesgo (0)": 0
-        }
-        df_mostrar = df_mostrar[df_mostrar['resultado'] == resultado_map[filtro_resultado]]
-    
-    # Mapear resultados a emojis
-    df_mostrar['resultado_emoji'] = df_mostrar['resultado'].map({
-        2: '🟢',
-        1: '🟡',
-        0: '🔴'
-    })
-    
-    # Mostrar tabla
-    st.dataframe(
-        df_mostrar[[
-            'curador', 'codigo_grupo', 'nombre_propuesta', 
-            'modalidad', 'dimension', 'aspecto', 'resultado_emoji', 
-            'observacion', 'fecha_registro', 'resultado'
-        ]].sort_values('fecha_registro', ascending=False),
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            'resultado_emoji': st.column_config.TextColumn('Resultado')
-        }
-    )
-    
-    st.caption(f"Total de registros: {len(df_mostrar)}")
-
-    # Exportar datos (después de filtrar)
-    col_exp1, col_exp2, col_exp3 = st.columns(3)
-    
-    with col_exp1:
-        # Exportar a Excel
-        excel_buffer = BytesIO()
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-            df_mostrar.to_excel(writer, sheet_name='Evaluaciones', index=False)
-        
-        st.download_button(
-            label="📥 Exportar Excel",
-            data=excel_buffer.getvalue(),
-            file_name=f"evaluaciones_detalladas_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            type="primary",
-            use_container_width=True
-        )
-
-    with col_exp2:
-        # Exportar a CSV
-        csv_data = df_mostrar.to_csv(index=False)
-        st.download_button(
-            label="📥 Exportar CSV",
-            data=csv_data,
-            file_name=f"evaluaciones_detalladas_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-            type="secondary",
-            use_container_width=True
-        )
-
-
 def mostrar_analisis_grupos(df_eval: pd.DataFrame):
     """Análisis consolidado por grupos - Refactorizado con tabs"""
 
     st.header("🎭 Análisis por Grupos")
     st.caption("Vista consolidada del desempeño de cada grupo")
 
-    df_eval =  seleccionador_eventos()
+    db_path, evento_nombre = selector_evento()
+    if not Path(db_path).exists():
+        st.error(f"❌ Base de datos no encontrada: {db_path}")
+        return
+
+    with st.spinner(f"Cargando datos de {evento_nombre}..."):
+        indice = indice_grupos(db_path)
 
-    if df_eval.empty:
+    if len(indice) == 0:
         st.warning("⚠️ No hay evaluaciones para analizar por grupos")
         return
 
@@ -389,20 +292,42 @@ def mostrar_analisis_grupos(df_eval: pd.DataFrame):
         
         # Mostrar informe del grupo si se buscó
         if id_busqueda:
-            mostrar_informe_grupo(df_eval, id_busqueda)
+            mostrar_informe_grupo(indice, id_busqueda, db_path)
         else:
             st.info("👆 Ingrese un código de grupo para ver su informe detallado")
             
             # Mostrar lista de grupos disponibles
             with st.expander("📋 Ver grupos disponibles"):
-                grupos_disponibles = sorted(df_eval['codigo_grupo'].unique())
-                grupos_df = pd.DataFrame({
-                    'Código': grupos_disponibles,
-                    'Nombre': [df_eval[df_eval['codigo_grupo'] == cod]['nombre_propuesta'].iloc[0] 
-                              if not df_eval[df_eval['codigo_grupo'] == cod].empty else 'N/A' 
-                              for cod in grupos_disponibles]
-                })
-                st.dataframe(grupos_df, use_container_width=True, hide_index=True)
+                st.dataframe(indice.listado(), use_container_width=True, hide_index=True)
+        
+        # Informes de todos los grupos (ZIP generado en paralelo, en caché por versión de datos)
+        st.markdown("---")
+        with st.expander("📦 Informes PDF de todos los grupos"):
+            total_grupos = len(indice)
+            st.caption(f"Genera un ZIP con el informe de cada uno de los {total_grupos} grupos evaluados")
+            
+            def generar_informes(destino: str) -> str:
+                barra = st.progress(0.0, text="Generando informes...")
+                generar_zip_informes(
+                    indice.evaluaciones,
+                    cargar_observaciones_desde_db(db_path),
+                    destino,
+                    progreso=lambda hechos, total: barra.progress(
+                        hechos / total, text=f"Generando informes... {hechos}/{total}"
+                    )
+                )
+                barra.empty()
+                return destino
+            
+            boton_descarga_diferida(
+                "informes_grupos", {}, version_datos(db_path), ".zip",
+                generar_informes,
+                label="📄 Descargar Informes (ZIP)",
+                file_name=f"Informes_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                mime="application/zip",
+                type="primary",
+                use_container_width=True
+            )
 
     # ============================================================
     # TAB 2: ANÁLISIS CON FILTROS
@@ -411,11 +336,8 @@ def mostrar_analisis_grupos(df_eval: pd.DataFrame):
         st.subheader("📊 Análisis de Grupos con Filtros")
         st.caption("Filtre y analice grupos por ficha y estado patrimonial")
         
-        # Calcular promedios por grupo y dimensión
-        df_grupo_dim = (df_eval
-            .groupby(['codigo_grupo', 'nombre_propuesta', 'ficha', 'dimension'], as_index=False)
-            .agg(promedio_dimension=('resultado', 'mean'))
-        )
+        # Promedios por grupo y dimensión (núcleo analítico)
+        df_grupo_dim = resultados_analiticos(db_path).grupos_dimension
         
         if df_grupo_dim.empty:
             st.warning("⚠️ No hay datos suficientes para análisis por dimensión")
@@ -426,7 +348,8 @@ def mostrar_analisis_grupos(df_eval: pd.DataFrame):
             index=['codigo_grupo', 'nombre_propuesta', 'ficha'],
             columns='dimension',
             values='promedio_dimension',
-            fill_value=0  # Rellenar NaN con 0 para grupos sin todas las dimensiones
+            fill_value=0,  # Rellenar NaN con 0 para grupos sin todas las dimensiones
+            observed=True
         ).reset_index()
         
         # Calcular promedio final (promedio de todas las dimensiones)
@@ -641,31 +564,34 @@ def mostrar_analisis_grupos(df_eval: pd.DataFrame):
             st.markdown("---")
             st.subheader("💾 Exportar Datos")
             
+            # Los archivos se generan al pedirlos y se reutilizan mientras no
+            # cambien los filtros ni la base de datos del evento
+            filtros_exportacion = {'ficha': ficha_sel, 'estado': estado_sel, 'orden': orden_sel}
+            version = version_datos(db_path)
+            marca = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+            
             col_exp1, col_exp2 = st.columns(2)
             
             with col_exp1:
                 # Exportar a Excel (usar df_mostrar que tiene las columnas filtradas)
-                excel_buffer = BytesIO()
-                with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                    df_mostrar.to_excel(writer, sheet_name='Analisis_Grupos', index=False)
-                
-                st.download_button(
+                boton_descarga_diferida(
+                    "analisis_grupos", filtros_exportacion, version, ".xlsx",
+                    lambda destino: escribir_xlsx(lotes_dataframe(df_mostrar), destino, hoja='Analisis_Grupos'),
                     label="📊 Exportar a Excel",
-                    data=excel_buffer.getvalue(),
-                    file_name=f"analisis_grupos_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    file_name=f"analisis_grupos_{marca}.xlsx",
+                    mime=MIME_XLSX,
                     type="primary",
                     use_container_width=True
                 )
             
             with col_exp2:
                 # Exportar a CSV (usar df_mostrar que tiene las columnas filtradas)
-                csv_buffer = df_mostrar.to_csv(index=False).encode('utf-8')
-                st.download_button(
+                boton_descarga_diferida(
+                    "analisis_grupos", filtros_exportacion, version, ".csv",
+                    lambda destino: escribir_csv(lotes_dataframe(df_mostrar), destino),
                     label="📄 Exportar a CSV",
-                    data=csv_buffer,
-                    file_name=f"analisis_grupos_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
+                    file_name=f"analisis_grupos_{marca}.csv",
+                    mime=MIME_CSV,
                     type="secondary",
                     use_container_width=True
                 )
@@ -680,46 +606,50 @@ def mostrar_analisis_grupos(df_eval: pd.DataFrame):
             
             import altair as alt
             
-            chart_dist = alt.Chart(df_filtrado).mark_bar().encode(
-                x=alt.X('Promedio Final:Q', title='Promedio Final', bin=alt.Bin(maxbins=20)),
-                y=alt.Y('count()', title='Cantidad de Grupos'),
+            # Histograma precalculado: 20 filas sin importar cuántos grupos haya
+            df_hist = resumen_histograma(df_filtrado['Promedio Final'], bins=20)
+            
+            chart_dist = alt.Chart(datos_grafico(df_hist, ['inicio', 'fin', 'centro', 'cantidad'], "distribución grupos")).mark_bar().encode(
+                x=alt.X('inicio:Q', title='Promedio Final', scale=alt.Scale(domain=[0, 2])),
+                x2='fin:Q',
+                y=alt.Y('cantidad:Q', title='Cantidad de Grupos'),
                 color=alt.Color(
-                    'Promedio Final:Q',
+                    'centro:Q',
                     scale=alt.Scale(
                         domain=[0, config.umbrales.riesgo_max, config.umbrales.mejora_max, 2],
                         range=['#d73027', '#fee08b', '#b3ef8b', '#1a9850']
                     ),
                     legend=None
                 ),
-                tooltip=['count()', alt.Tooltip('Promedio Final:Q', format='.2f')]
+                tooltip=[
+                    alt.Tooltip('cantidad:Q', title='Grupos'),
+                    alt.Tooltip('inicio:Q', format='.2f', title='Desde'),
+                    alt.Tooltip('fin:Q', format='.2f', title='Hasta')
+                ]
             ).properties(height=300)
             
             st.altair_chart(chart_dist, use_container_width=True)
 
 
-def mostrar_analisis_dimensiones(df_eval: pd.DataFrame):
+def mostrar_analisis_dimensiones(df_eval: pd.DataFrame, resultados: ResultadosAnaliticos):
     """Análisis por dimensiones patrimoniales - Mejorado"""
 
     st.header("📊 Análisis por Dimensión")
     st.caption("Desempeño consolidado en cada dimensión patrimonial")
 
-    if df_eval.empty:
+    if resultados.avisos:
+        mostrar_avisos(resultados)
+        return
+
+    if resultados.vacio:
         st.warning("⚠️ No hay evaluaciones para analizar por dimensión")
         return
 
-    # Promedio por dimensión con más métricas
-    df_dim = (df_eval
-        .groupby('dimension', as_index=False)
-        .agg(
-            promedio=('resultado', 'mean'),
-            mediana=('resultado', 'median'),
-            desviacion=('resultado', 'std'),
-            evaluaciones=('resultado', 'count'),
-            grupos=('codigo_grupo', 'nunique'),
-            fortalezas=('resultado', lambda x: (x == 2).sum()),
-            oportunidades=('resultado', lambda x: (x == 1).sum()),
-            riesgos=('resultado', lambda x: (x == 0).sum())
-        )
+    # Promedio por dimensión con más métricas (calculado en el núcleo analítico)
+    df_dim = (resultados.dimensiones
+        .rename(columns={'fortaleza': 'fortalezas', 'oportunidad': 'oportunidades', 'riesgo': 'riesgos'})
+        [['dimension', 'promedio', 'mediana', 'desviacion', 'evaluaciones', 'grupos',
+          'fortalezas', 'oportunidades', 'riesgos']]
         .sort_values('promedio', ascending=False)
     )
     
@@ -799,11 +729,12 @@ def mostrar_analisis_dimensiones(df_eval: pd.DataFrame):
     st.subheader("📈 Distribución de Resultados por Dimensión")
     
     # Crear gráfico de distribución (violin o box plot)
-    chart_dist = alt.Chart(df_eval).mark_boxplot(extent='min-max').encode(
-        x=alt.X('dimension:N', title='Dimensión', sort='-y'),
-        y=alt.Y('resultado:Q', title='Resultado', scale=alt.Scale(domain=[0, 2])),
-        color=alt.value('#1f77b4')
-    ).properties(height=400)
+    chart_dist = grafico_boxplot(
+        resumen_boxplot(df_eval, 'dimension'),
+        'dimension',
+        titulo_x='Dimensión',
+        height=400
+    )
     
     st.altair_chart(chart_dist, use_container_width=True)
     
@@ -830,32 +761,14 @@ def mostrar_analisis_dimensiones(df_eval: pd.DataFrame):
         )
 
 
-def mostrar_analisis_aspectos(df_eval: pd.DataFrame):
+def mostrar_analisis_aspectos(df_eval: pd.DataFrame, resultados: ResultadosAnaliticos):
     """Análisis detallado por aspectos individuales - Mejorado"""
     
     st.header("✅ Análisis por Aspecto")
     st.caption("Desempeño detallado en cada aspecto evaluado")
     
-    # Promedio por dimensión y aspecto con más métricas
-    df_aspecto = (df_eval
-        .groupby(['dimension', 'aspecto'], as_index=False)
-        .agg(
-            promedio=('resultado', 'mean'),
-            mediana=('resultado', 'median'),
-            desviacion=('resultado', 'std'),
-            evaluaciones=('resultado', 'count'),
-            grupos=('codigo_grupo', 'nunique'),
-            fortaleza=('resultado', lambda x: (x == 2).sum()),
-            oportunidad=('resultado', lambda x: (x == 1).sum()),
-            riesgo=('resultado', lambda x: (x == 0).sum())
-        )
-        .sort_values(['dimension', 'promedio'], ascending=[True, False])
-    )
-    
-    # Calcular porcentajes
-    df_aspecto['%_fortaleza'] = (df_aspecto['fortaleza'] / df_aspecto['evaluaciones'] * 100).round(1)
-    df_aspecto['%_oportunidad'] = (df_aspecto['oportunidad'] / df_aspecto['evaluaciones'] * 100).round(1)
-    df_aspecto['%_riesgo'] = (df_aspecto['riesgo'] / df_aspecto['evaluaciones'] * 100).round(1)
+    # Promedio por dimensión y aspecto con más métricas y porcentajes (núcleo analítico)
+    df_aspecto = resultados.aspectos.sort_values(['dimension', 'promedio'], ascending=[True, False])
     
     # KPIs generales
     col_kpi1, col_kpi2, col_kpi3 = st.columns(3)
@@ -996,11 +909,13 @@ def mostrar_analisis_aspectos(df_eval: pd.DataFrame):
     else:
         df_dist = df_eval
     
-    chart_dist = alt.Chart(df_dist).mark_boxplot(extent='min-max').encode(
-        x=alt.X('aspecto:N', title='Aspecto', sort='-y'),
-        y=alt.Y('resultado:Q', title='Resultado', scale=alt.Scale(domain=[0, 2])),
-        color=alt.value('#1f77b4')
-    ).properties(height=max(400, len(df_dist['aspecto'].unique()) * 20))
+    df_resumen_dist = resumen_boxplot(df_dist, 'aspecto')
+    chart_dist = grafico_boxplot(
+        df_resumen_dist,
+        'aspecto',
+        titulo_x='Aspecto',
+        height=max(400, len(df_resumen_dist) * 20)
+    )
     
     st.altair_chart(chart_dist, use_container_width=True)
 
@@ -1009,20 +924,27 @@ Agregar esta función a comite_view.py
 Insertar después de mostrar_analisis_aspectos()
 """
 
-def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
+def mostrar_analisis_por_ficha(resultados: ResultadosAnaliticos):
     """Análisis detallado por tipo de ficha"""
     
     st.header("🎭 Análisis por Ficha")
     st.caption("Desempeño consolidado por tipo de ficha de evaluación")
     
-    # Verificar que haya columna ficha
-    if 'ficha' not in df_eval.columns:  
-        st.warning("⚠️ No hay información de fichas en las evaluaciones")
-        return
-    
-    # Estadísticas generales por ficha
-    from src.database.models import EvaluacionModel
-    df_stats_ficha = EvaluacionModel.obtener_estadisticas_por_ficha()
+    # Estadísticas generales por ficha (núcleo analítico)
+    df_stats_ficha = pd.DataFrame()
+    if not resultados.fichas.empty:
+        df_stats_ficha = (resultados.fichas
+            .rename(columns={
+                'evaluaciones': 'total_evaluaciones',
+                'promedio': 'promedio_general',
+                'fortaleza': 'fortalezas',
+                'oportunidad': 'oportunidades',
+                'riesgo': 'riesgos'
+            })
+            [['ficha', 'grupos_evaluados', 'curadores', 'total_evaluaciones', 'promedio_general',
+              'fortalezas', 'oportunidades', 'riesgos']]
+            .sort_values('promedio_general', ascending=False)
+        )
     
     if df_stats_ficha.empty:
         st.info("No hay evaluaciones registradas por ficha todavía")
@@ -1080,18 +1002,11 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
     # Formatear columnas
     df_display = df_stats_ficha.copy()
 
-    def estilo_estado_ficha(row):
-                color = color_gradiente(row['promedio_general'])
-                return [
-                    f'background-color: {color}'
-                    if col == 'resultado_emoji' else ''
-                    for col in row.index
-                ]
-    df_display['resultado_emoji'] = df_display['promedio_general'].apply(lambda x:"")
+    df_display['resultado_emoji'] = ""
     
     
     st.dataframe(
-        df_display.style.apply(estilo_estado_ficha, axis=1),
+        df_display.style.apply(estilo_columna_gradiente, axis=None, col_valor='promedio_general', col_estado='resultado_emoji'),
         use_container_width=True,
         hide_index=True,
         column_config={
@@ -1118,17 +1033,13 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
     ficha_seleccionada = st.selectbox("Seleccionar ficha:", fichas_disponibles)
     
     if ficha_seleccionada:
-        # Filtrar evaluaciones de esta ficha
-        df_ficha = df_eval[df_eval['ficha'] == ficha_seleccionada]
-        
-        if df_ficha.empty:
-            st.warning(f"No hay evaluaciones para la ficha '{ficha_seleccionada}'")
+        # Agregados de esta ficha
+        stats_ficha = resultados.fichas[resultados.fichas['ficha'] == ficha_seleccionada].iloc[0]
         
-        df_promedios_ficha = (df_ficha
-                .groupby(['codigo_grupo', 'nombre_propuesta', 'ficha'], as_index=False)
-                .agg(promedio_final=('resultado', 'mean'))
-                .dropna(subset=['promedio_final'])
-            )
+        df_promedios_ficha = resultados.grupos.loc[
+            resultados.grupos['ficha'] == ficha_seleccionada,
+            ['codigo_grupo', 'nombre_propuesta', 'ficha', 'promedio_final']
+        ]
             
         if df_promedios_ficha.empty:
             st.warning("⚠️ No hay evaluaciones completas para calcular promedios")
@@ -1136,11 +1047,11 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
         
         df_promedios_ficha['estado'] = df_promedios_ficha['promedio_final'].apply(estado_patrimonial)
 
-        total_evaluaciones_ficha= len(df_ficha)
-        curadores_activos = df_ficha['curador'].nunique()
+        total_evaluaciones_ficha = int(stats_ficha['evaluaciones'])
+        curadores_activos = int(stats_ficha['curadores'])
         grupos_evaluados_ficha = df_promedios_ficha['codigo_grupo'].nunique()
-        promedio_general_ficha = df_promedios_ficha['promedio_final'].mean()
-        desviacion_std = df_ficha['resultado'].std()
+        promedio_general_ficha = stats_ficha['promedio_grupos']
+        desviacion_std = stats_ficha['desviacion']
 
         color_estado_general = color_gradiente(promedio_general_ficha)
 
@@ -1209,12 +1120,8 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
         # Análisis por dimensión dentro de la ficha
         st.markdown("**Desempeño por Dimensión:**")
         
-        df_dim_ficha = (df_ficha
-            .groupby('dimension', as_index=False)
-            .agg(
-                promedio=('resultado', 'mean'),
-                evaluaciones=('resultado', 'count')
-            )
+        df_dim_ficha = (resultados.fichas_dimension
+            .loc[resultados.fichas_dimension['ficha'] == ficha_seleccionada, ['dimension', 'promedio', 'evaluaciones']]
             .sort_values('promedio', ascending=False)
         )
             
@@ -1241,9 +1148,9 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
         # Top grupos de esta ficha
         st.markdown("**🏆 Top 5 Grupos de esta Ficha:**")
         
-        df_grupos_ficha = (df_ficha
-            .groupby(['codigo_grupo', 'nombre_propuesta'], as_index=False)
-            .agg(promedio=('resultado', 'mean'))
+        df_grupos_ficha = (df_promedios_ficha
+            .rename(columns={'promedio_final': 'promedio'})
+            [['codigo_grupo', 'nombre_propuesta', 'promedio']]
             .nlargest(5, 'promedio')
         )
     
@@ -1262,15 +1169,14 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
         )
         
         # Aspectos más fuertes y débiles de esta ficha
+        df_asp_ficha = resultados.fichas_aspecto.loc[
+            resultados.fichas_aspecto['ficha'] == ficha_seleccionada, ['aspecto', 'promedio']
+        ]
         col_asp1, col_asp2 = st.columns(2)
         
         with col_asp1:
             st.markdown("**🟢 Aspectos Más Fuertes:**")
-            df_asp_fuerte = (df_ficha
-                .groupby('aspecto', as_index=False)
-                .agg(promedio=('resultado', 'mean'))
-                .nlargest(5, 'promedio')
-            )
+            df_asp_fuerte = df_asp_ficha.nlargest(5, 'promedio')
             df_asp_fuerte['resultado_emoji'] = df_asp_fuerte['promedio'].apply(estado_patrimonial)
             st.dataframe(
                 df_asp_fuerte.style.format({'promedio': '{:.2f}'}),
@@ -1285,11 +1191,7 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
         
         with col_asp2:
             st.markdown("**🔴 Aspectos a Fortalecer:**")
-            df_asp_debil = (df_ficha
-                .groupby('aspecto', as_index=False)
-                .agg(promedio=('resultado', 'mean'))
-                .nsmallest(5, 'promedio')
-            )
+            df_asp_debil = df_asp_ficha.nsmallest(5, 'promedio')
             df_asp_debil['resultado_emoji'] = df_asp_debil['promedio'].apply(estado_patrimonial)
             st.dataframe(
                 df_asp_debil.style.format({'promedio': '{:.2f}'}),
@@ -1302,35 +1204,26 @@ def mostrar_analisis_por_ficha(df_eval: pd.DataFrame):
                 }
             )
 
-def mostrar_analisis_curadores(df_eval: pd.DataFrame):
+def mostrar_analisis_curadores(df_eval: pd.DataFrame, resultados: ResultadosAnaliticos):
     """Análisis por curadores - Mejorado"""
     
     st.header("👥 Análisis por Curador")
     st.caption("Estadísticas detalladas de evaluación por curador")
     
-    # Estadísticas por curador mejoradas
-    df_cur = (df_eval
-        .groupby('curador', as_index=False)
-        .agg(
-            grupos_evaluados=('codigo_grupo', 'nunique'),
-            total_evaluaciones=('resultado', 'count'),
-            promedio_otorgado=('resultado', 'mean'),
-            mediana_otorgada=('resultado', 'median'),
-            desviacion=('resultado', 'std'),
-            fortaleza=('resultado', lambda x: (x == 2).sum()),
-            oportunidad=('resultado', lambda x: (x == 1).sum()),
-            riesgo=('resultado', lambda x: (x == 0).sum()),
-            fichas_evaluadas=('ficha', 'nunique')
-        )
+    # Estadísticas por curador, porcentajes y evaluaciones por grupo (núcleo analítico)
+    df_cur = (resultados.curadores
+        .rename(columns={
+            'grupos': 'grupos_evaluados',
+            'evaluaciones': 'total_evaluaciones',
+            'promedio': 'promedio_otorgado',
+            'mediana': 'mediana_otorgada'
+        })
+        [['curador', 'grupos_evaluados', 'total_evaluaciones', 'promedio_otorgado', 'mediana_otorgada',
+          'desviacion', 'fortaleza', 'oportunidad', 'riesgo', 'fichas_evaluadas',
+          '%_fortaleza', '%_oportunidad', '%_riesgo', 'eval_por_grupo']]
         .sort_values('grupos_evaluados', ascending=False)
     )
     
-    # Calcular porcentajes y métricas adicionales
-    df_cur['%_fortaleza'] = (df_cur['fortaleza'] / df_cur['total_evaluaciones'] * 100).round(1)
-    df_cur['%_oportunidad'] = (df_cur['oportunidad'] / df_cur['total_evaluaciones'] * 100).round(1)
-    df_cur['%_riesgo'] = (df_cur['riesgo'] / df_cur['total_evaluaciones'] * 100).round(1)
-    df_cur['eval_por_grupo'] = (df_cur['total_evaluaciones'] / df_cur['grupos_evaluados']).round(1)
-    
     # KPIs mejorados
     col1, col2, col3, col4 = st.columns(4)
     
@@ -1549,7 +1442,7 @@ def mostrar_panel_admin():
     
     st.warning("⚠️ Esta sección permite modificar la base de datos. Úsala con precaución.")
     
-    tab1, tab2, tab3 = st.tabs(["📥 Sincronizar Grupos", "💾 Backups", "📊 Estadísticas"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📥 Sincronizar Grupos", "💾 Backups", "📊 Estadísticas", "🗓️ Asignaciones"])
     
     with tab1:
         st.subheader("Sincronizar Grupos desde Excel")
@@ -1720,6 +1613,7 @@ def mostrar_panel_admin():
                                     # Eliminar evaluaciones
                                     cursor.execute("DELETE FROM evaluaciones")
                                     evaluaciones_eliminadas = cursor.rowcount
+                                    cursor.execute("DELETE FROM envios")
                                     
                                     # Verificar
                                     cursor.execute("SELECT COUNT(*) FROM evaluaciones")
@@ -1739,8 +1633,8 @@ def mostrar_panel_admin():
                                             accion="ELIMINACION_EVALUACIONES",
                                             detalle=f"Eliminadas: {evaluaciones_eliminadas} evaluaciones"
                                         )
-                                        
-                                        st.cache_data.clear()
+
+                                        # La caché se invalida al salir del bloque, tras el commit
                                         st.balloons()
                                     else:
                                         st.error(f"❌ Error: Quedan {verificacion} evaluaciones")
@@ -1753,6 +1647,7 @@ def mostrar_panel_admin():
                             st.error("Esta opción eliminará TODAS las evaluaciones")
                             if st.checkbox("Confirmo que quiero eliminar todo"):
                                 cursor.execute("DELETE FROM evaluaciones")
+                                cursor.execute("DELETE FROM envios")
                                 cursor.execute("DELETE FROM grupos")
                                 
                                 insertados = 0
@@ -1777,8 +1672,13 @@ def mostrar_panel_admin():
                                 
                                 st.success(f"✅ Base de datos recreada con {insertados} grupos")
                     
-                    # Limpiar caché
-                    st.cache_data.clear()
+                    # Invalidar (ya confirmados los cambios) solo lo que depende
+                    # de los grupos y del catálogo
+                    invalidar(
+                        etiqueta('grupos', config.db_path),
+                        etiqueta('evaluaciones', config.db_path),
+                        'catalogo'
+                    )
                     
             except Exception as e:
                 st.error(f"❌ Error: {e}")
@@ -1786,26 +1686,120 @@ def mostrar_panel_admin():
     with tab2:
         st.subheader("💾 Sistema de Backups")
 
-        st.info("💡 Se crea un backup comprimido de la base de datos completa")
+        st.info("💡 Se crea un backup comprimido y verificado de la base de datos, sin detener las evaluaciones en curso")
 
         if st.button("📦 Crear Backup Ahora", type="primary"):
-            try:
-                # Crear backup usando la función modular
-                zip_data = crear_backup_zip()
+            barra = st.progress(0.0, text="Copiando base de datos...")
+            ruta_backup, error = crear_backup(
+                progreso=lambda copiadas, totales: barra.progress(
+                    copiadas / totales, text=f"Copiando base de datos... {copiadas}/{totales} páginas"
+                )
+            )
+            barra.empty()
 
-                # Descargar el ZIP
-                st.download_button(
+            if error:
+                st.error(f"❌ Error al crear backup: {error}")
+            else:
+                st.success(f"✅ Backup creado y verificado: {ruta_backup.name}")
+
+        # Backups disponibles en el servidor (solo se lee el seleccionado)
+        backups = {ruta.name: ruta for ruta in listar_backups()}
+        if backups:
+            st.markdown("#### 🗂️ Backups disponibles")
+            col_sel, col_descarga = st.columns([3, 1])
+            with col_sel:
+                nombre_backup = st.selectbox(
+                    "Backup:",
+                    list(backups),
+                    format_func=lambda nombre: f"{nombre} ({backups[nombre].stat().st_size / 1024 / 1024:.1f} MB)",
+                    label_visibility="collapsed"
+                )
+            with col_descarga:
+                boton_descarga_local(
+                    backups[nombre_backup],
                     label="⬇️ Descargar Backup",
-                    data=zip_data,
-                    file_name=f"backup_curaduria_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.zip",
                     mime="application/zip",
-                    type="secondary"
+                    clave="backup",
+                    type="secondary",
+                    use_container_width=True
                 )
+    
+        # Snapshots automáticos y restauración a un momento dado
+        st.markdown("---")
+        st.markdown("#### 📸 Snapshots y restauración")
+        if config.snapshot_intervalo_min > 0:
+            st.caption(
+                f"Se guarda un snapshot cada {config.snapshot_intervalo_min:g} min (si hubo cambios) "
+                f"y se conservan los últimos {config.snapshot_retencion}. Entre snapshots, los cambios "
+                f"de grupos y evaluaciones quedan en el journal."
+            )
+        else:
+            st.caption("Los snapshots automáticos están desactivados (SNAPSHOT_INTERVALO_MIN=0)")
 
-                st.success("✅ Backup creado exitosamente")
+        from src.database.connection import get_db_connection
+        
+        with get_db_connection() as conn:
+            df_snapshots = pd.read_sql_query(
+                "SELECT id, fecha_registro, ultimo_cambio_id, ruta FROM snapshots ORDER BY id DESC", conn
+            )
+            cambios_journal = conn.execute("SELECT COUNT(*) FROM journal_cambios").fetchone()[0]
 
-            except Exception as e:
-                st.error(f"❌ Error al crear backup: {e}")
+        col_snap1, col_snap2 = st.columns([1, 2])
+        with col_snap1:
+            if st.button("📸 Crear snapshot ahora", use_container_width=True):
+                ruta_snapshot, error = crear_snapshot()
+                if error:
+                    st.error(f"❌ {error}")
+                else:
+                    st.success(f"✅ Snapshot creado: {ruta_snapshot.name}")
+                    st.rerun()
+        with col_snap2:
+            st.caption(f"{len(df_snapshots)} snapshots · {cambios_journal} cambios en el journal")
+
+        if not df_snapshots.empty:
+            st.dataframe(
+                df_snapshots[['fecha_registro', 'ultimo_cambio_id']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'fecha_registro': 'Fecha (UTC)',
+                    'ultimo_cambio_id': 'Último cambio incluido'
+                }
+            )
+
+            st.markdown("**⏪ Reconstruir la base de datos en un momento dado (UTC)**")
+            col_fecha, col_hora, col_restaurar = st.columns([1, 1, 1])
+            with col_fecha:
+                fecha_restaurar = st.date_input("Fecha", value=pd.Timestamp.utcnow().date())
+            with col_hora:
+                hora_restaurar = st.time_input("Hora", value=pd.Timestamp.utcnow().time().replace(microsecond=0), step=60)
+            with col_restaurar:
+                st.markdown("<br>", unsafe_allow_html=True)
+                restaurar_btn = st.button("⏪ Reconstruir", use_container_width=True)
+
+            if restaurar_btn:
+                momento = f"{fecha_restaurar} {hora_restaurar}"
+                destino = BACKUPS_DIR / f"restaurada_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.db"
+                with st.spinner("Reconstruyendo..."):
+                    cambios, error = restaurar_a(momento, str(destino))
+
+                if error:
+                    st.error(f"❌ {error}")
+                else:
+                    st.success(f"✅ Base de datos reconstruida a {momento} ({cambios} cambios reaplicados)")
+                    st.session_state['base_reconstruida'] = destino
+
+            # La última base reconstruida se puede descargar hasta reconstruir otra
+            destino = st.session_state.get('base_reconstruida')
+            if destino and destino.exists():
+                st.info(f"💡 {destino.name}: la base de datos en uso no se modificó. Descargue el archivo y reemplácelo manualmente si es necesario.")
+                boton_descarga_local(
+                    destino,
+                    label="⬇️ Descargar base de datos reconstruida",
+                    mime="application/octet-stream",
+                    clave="base_reconstruida",
+                    type="primary"
+                )
     
     with tab3:
         st.subheader("📊 Estadísticas del Sistema")
@@ -1840,6 +1834,145 @@ def mostrar_panel_admin():
         
         with col4:
             st.metric("Curadores Activos", curadores_activos)
+        
+        # Evaluaciones incompletas (aspectos pendientes frente a la rúbrica actual)
+        df_incompletas = EvaluacionModel.obtener_incompletas()
+        if df_incompletas.empty:
+            st.success("✅ Todas las evaluaciones registradas están completas")
+        else:
+            st.warning(f"⚠️ {len(df_incompletas)} evaluaciones incompletas")
+            with st.expander("Ver evaluaciones incompletas"):
+                st.dataframe(df_incompletas, use_container_width=True, hide_index=True)
+    
+    with tab4:
+        mostrar_asignaciones()
+
+
+def mostrar_asignaciones():
+    """Planificación y seguimiento de asignaciones curador → grupo"""
+    from src.database.models import UsuarioModel, GrupoModel, AsignacionModel, LogModel
+    from src.utils.planificador_asignaciones import planificar_asignaciones
+    
+    st.subheader("🗓️ Asignación de Grupos a Curadores")
+    st.caption("Reparte los grupos para que cada uno reciba el mismo número de evaluaciones y la carga entre curadores quede equilibrada")
+    
+    curadores = [u for u in UsuarioModel.obtener_todos() if u['rol'] == 'curador']
+    grupos = [g for g in GrupoModel.obtener_todos() if g.get('ficha_id')]
+    
+    if not curadores or not grupos:
+        st.info("Se necesitan curadores activos y grupos con ficha asignada para planificar")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        evaluaciones_por_grupo = st.number_input(
+            "Evaluaciones por grupo", min_value=1, max_value=len(curadores),
+            value=min(config.evaluaciones_por_grupo, len(curadores))
+        )
+    with col2:
+        max_por_curador = st.number_input(
+            "Máximo de grupos por curador", min_value=1,
+            value=config.max_grupos_por_curador
+        )
+    with col3:
+        reemplazar = st.checkbox(
+            "Rehacer asignaciones pendientes", value=True,
+            help="Las asignaciones completadas y las evaluaciones ya registradas se conservan"
+        )
+    
+    if st.button("🧮 Generar Plan", type="primary"):
+        conflictos = {(c['usuario_id'], c['codigo_grupo']) for c in AsignacionModel.obtener_conflictos()}
+        existentes = AsignacionModel.obtener_existentes(incluir_pendientes=not reemplazar)
+        
+        st.session_state.plan_asignaciones = planificar_asignaciones(
+            grupos=[(g['codigo'], g['ficha_id']) for g in grupos],
+            curadores=[u['id'] for u in curadores],
+            evaluaciones_por_grupo=int(evaluaciones_por_grupo),
+            max_por_curador=int(max_por_curador),
+            conflictos=conflictos,
+            existentes=existentes
+        )
+        st.session_state.plan_reemplazar = reemplazar
+    
+    plan = st.session_state.get('plan_asignaciones')
+    if plan is not None:
+        nombres = {u['id']: u['username'] for u in curadores}
+        cargas = list(plan.carga.values())
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Nuevas Asignaciones", len(plan.asignaciones))
+        with col2:
+            st.metric("Evaluaciones sin cubrir", plan.total_faltantes)
+        with col3:
+            st.metric("Carga mínima", min(cargas) if cargas else 0)
+        with col4:
+            st.metric("Carga máxima", max(cargas) if cargas else 0)
+        
+        if plan.faltantes:
+            st.warning(
+                f"⚠️ {len(plan.faltantes)} grupos no alcanzan el objetivo "
+                "(capacidad insuficiente o conflictos de interés)"
+            )
+        
+        df_plan = pd.DataFrame(plan.asignaciones, columns=['usuario_id', 'Código', 'ficha_id'])
+        df_plan['Curador'] = df_plan['usuario_id'].map(nombres)
+        st.dataframe(
+            df_plan.groupby('Curador').size().rename('Grupos nuevos').reset_index(),
+            use_container_width=True, hide_index=True
+        )
+        
+        if st.button("💾 Guardar Plan"):
+            insertadas, error = AsignacionModel.guardar_plan(
+                plan.asignaciones,
+                reemplazar_pendientes=st.session_state.get('plan_reemplazar', False)
+            )
+            if error:
+                st.error(f"❌ {error}")
+            else:
+                LogModel.registrar_log(
+                    usuario=st.session_state.usuario,
+                    accion="ASIGNACIONES_GENERADAS",
+                    detalle=f"{insertadas} asignaciones - objetivo {evaluaciones_por_grupo} por grupo"
+                )
+                del st.session_state.plan_asignaciones
+                st.success(f"✅ {insertadas} asignaciones guardadas")
+    
+    st.markdown("---")
+    st.markdown("#### 📋 Carga actual por curador")
+    df_resumen = AsignacionModel.obtener_resumen_dataframe()
+    if df_resumen.empty:
+        st.info("Aún no hay asignaciones guardadas")
+    else:
+        st.dataframe(df_resumen, use_container_width=True, hide_index=True)
+    
+    st.markdown("---")
+    st.markdown("#### 🚫 Conflictos de interés")
+    
+    with st.form("form_conflicto", clear_on_submit=True):
+        col1, col2 = st.columns(2)
+        with col1:
+            curador_sel = st.selectbox("Curador", curadores, format_func=lambda u: u['username'])
+        with col2:
+            codigo_sel = st.selectbox("Grupo", [g['codigo'] for g in grupos])
+        motivo = st.text_input("Motivo")
+        
+        if st.form_submit_button("➕ Registrar conflicto"):
+            exito, error = AsignacionModel.registrar_conflicto(curador_sel['id'], codigo_sel, motivo or None)
+            if exito:
+                st.success("✅ Conflicto registrado")
+            else:
+                st.error(f"❌ {error}")
+    
+    conflictos = AsignacionModel.obtener_conflictos()
+    for c in conflictos:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            st.markdown(f"**{c['username']}** ↔ `{c['codigo_grupo']}` {('— ' + c['motivo']) if c['motivo'] else ''}")
+        with col2:
+            if st.button("🗑️", key=f"del_conflicto_{c['id']}"):
+                AsignacionModel.eliminar_conflicto(c['id'])
+                st.rerun()
 
 
 def mostrar_gestion_usuarios(df_eval: pd.DataFrame):
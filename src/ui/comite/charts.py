@@ -0,0 +1,120 @@
+"""
+Capa de datos para gráficos del comité
+Las estadísticas se calculan en pandas y Altair solo recibe filas agregadas,
+de modo que el tamaño del gráfico no depende del número de evaluaciones
+"""
+import logging
+import altair as alt
+import numpy as np
+import pandas as pd
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def datos_grafico(df: pd.DataFrame, columnas: list, nombre: str = "gráfico") -> pd.DataFrame:
+    """
+    Deja solo las columnas que usa el gráfico y verifica el presupuesto de tamaño
+
+    Args:
+        df: Datos (ya agregados) del gráfico
+        columnas: Columnas codificadas en el gráfico
+        nombre: Nombre del gráfico para el log
+
+    Returns:
+        DataFrame reducido a las columnas indicadas
+    """
+    df_grafico = df[columnas]
+
+    # Estimación del tamaño que ocupará el dataset embebido en la especificación Vega
+    tamano = int(df_grafico.memory_usage(index=False, deep=True).sum())
+    if tamano > config.max_bytes_grafico:
+        logger.warning(
+            f"Gráfico '{nombre}' excede el presupuesto de datos: "
+            f"{tamano} bytes > {config.max_bytes_grafico} ({len(df_grafico)} filas)"
+        )
+
+    return df_grafico
+
+
+def resumen_boxplot(df: pd.DataFrame, categoria: str, valor: str = 'resultado') -> pd.DataFrame:
+    """
+    Estadísticas de caja (mínimo, cuartiles, máximo y conteo) por categoría
+
+    Returns:
+        DataFrame con una fila por categoría
+    """
+    if df.empty:
+        return pd.DataFrame(columns=[categoria, 'minimo', 'q1', 'mediana', 'q3', 'maximo', 'n'])
+
+    agrupado = df.groupby(categoria, observed=True)[valor]
+    cuartiles = agrupado.quantile([0.25, 0.5, 0.75]).unstack()
+    cuartiles.columns = ['q1', 'mediana', 'q3']
+
+    resumen = pd.concat([
+        agrupado.min().rename('minimo'),
+        cuartiles,
+        agrupado.max().rename('maximo'),
+        agrupado.size().rename('n')
+    ], axis=1).reset_index()
+
+    return resumen
+
+
+def grafico_boxplot(df_resumen: pd.DataFrame, categoria: str, titulo_x: str,
+                    titulo_y: str = 'Resultado', dominio=(0, 2), height: int = 400) -> alt.LayerChart:
+    """
+    Diagrama de caja (extensión min-max) construido a partir de resumen_boxplot
+    """
+    datos = datos_grafico(
+        df_resumen,
+        [categoria, 'minimo', 'q1', 'mediana', 'q3', 'maximo', 'n'],
+        nombre=f"boxplot {categoria}"
+    )
+
+    eje_x = alt.X(
+        f'{categoria}:N',
+        title=titulo_x,
+        sort=alt.EncodingSortField(field='mediana', order='descending')
+    )
+    escala_y = alt.Scale(domain=list(dominio))
+    tooltip = [
+        alt.Tooltip(f'{categoria}:N', title=titulo_x),
+        alt.Tooltip('minimo:Q', format='.2f', title='Mínimo'),
+        alt.Tooltip('q1:Q', format='.2f', title='Q1'),
+        alt.Tooltip('mediana:Q', format='.2f', title='Mediana'),
+        alt.Tooltip('q3:Q', format='.2f', title='Q3'),
+        alt.Tooltip('maximo:Q', format='.2f', title='Máximo'),
+        alt.Tooltip('n:Q', title='Evaluaciones')
+    ]
+
+    base = alt.Chart(datos).encode(x=eje_x, tooltip=tooltip)
+
+    bigotes = base.mark_rule(color='#1f77b4').encode(
+        y=alt.Y('minimo:Q', title=titulo_y, scale=escala_y),
+        y2='maximo:Q'
+    )
+    caja = base.mark_bar(size=20, color='#1f77b4').encode(
+        y=alt.Y('q1:Q', scale=escala_y),
+        y2='q3:Q'
+    )
+    mediana = base.mark_tick(color='white', size=20, thickness=2).encode(
+        y=alt.Y('mediana:Q', scale=escala_y)
+    )
+
+    return alt.layer(bigotes, caja, mediana).properties(height=height)
+
+
+def resumen_histograma(serie: pd.Series, bins: int = 20, dominio=(0, 2)) -> pd.DataFrame:
+    """
+    Histograma precalculado (una fila por intervalo)
+    """
+    valores = serie.dropna().to_numpy(dtype=float)
+    cantidades, bordes = np.histogram(valores, bins=bins, range=dominio)
+
+    return pd.DataFrame({
+        'inicio': bordes[:-1],
+        'fin': bordes[1:],
+        'centro': (bordes[:-1] + bordes[1:]) / 2,
+        'cantidad': cantidades
+    })
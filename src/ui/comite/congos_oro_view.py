@@ -2,15 +2,25 @@
 Vista de Congos de Oro 
 Usa rutas configurables desde config.py y detecta archivos automáticamente
 """
-from io import BytesIO
-
 import streamlit as st
 import pandas as pd
 import numpy as np
 import sqlite3
 from pathlib import Path
-from src.config import DATA_DIR
+from src.config import DATA_DIR, config
+from src.database.cache import cache_compartida
+from src.database.models import LogModel, PremiosSnapshotModel
+from src.analytics.premios import (
+    premios_vigentes, calcular_congos_oro, resumen_por_categoria, nota_consolidada, estado_nota,
+    un_solo_evento, PONDERACIONES, PONDERACION_POR_DEFECTO, PERCENTIL_CONGO, UMBRAL_MEDALLA,
+    UMBRAL_HONOR, UMBRAL_RIESGO, UMBRAL_MEJORA
+)
+from src.analytics.ranking_incremental import obtener_ranking
+from src.analytics.simulador import MAX_ESCENARIOS, rejilla_escenarios, simular
+from src.analytics.bootstrap import bootstrap_notas
 from .dashboard import color_gradiente
+from .utils import mostrar_avisos
+from .exports import escribir_csv, escribir_xlsx, lotes_dataframe, boton_descarga_diferida, version_datos, MIME_CSV, MIME_XLSX
 
 # ═══════════════════════════════════════════════════════════════════
 # CONFIGURACIÓN - Rutas dinámicas
@@ -53,43 +63,38 @@ def obtener_rutas_bds():
 # Obtener rutas dinámicamente
 DB_FIN_SEMANA, DB_GRAN_PARADA = obtener_rutas_bds()
 
-# Configuración de ponderaciones
-PONDERACIONES = {
-    "CONGO": {"fin_semana": 0.60, "gran_parada": 0.40},
-    "CUMBIA": {"fin_semana": 0.60, "gran_parada": 0.40},
-    "GARABATO": {"fin_semana": 0.50, "gran_parada": 0.50},
-    "MAPALÉ": {"fin_semana": 0.60, "gran_parada": 0.40},
-    "MAPALE": {"fin_semana": 0.60, "gran_parada": 0.40},
-    "SON_DE_NEGRO": {"fin_semana": 1.00, "gran_parada": 0.00},
-    "COMPARSA_TRAD": {"fin_semana": 0.60, "gran_parada": 0.40},
-    "COMPARSA_FANT": {"fin_semana": 0.60, "gran_parada": 0.40},
-    "DANZAS_ESP": {"fin_semana": 1.00, "gran_parada": 0.00},
-    "DANZAS_REL": {"fin_semana": 1.00, "gran_parada": 0.00},
-    "EXPRESIONES_I": {"fin_semana": 1.00, "gran_parada": 0.00},
-}
-
-UMBRAL_RIESGO = 0.8
-UMBRAL_MEJORA = 1.6
 
 
 # ═══════════════════════════════════════════════════════════════════
 # FUNCIONES
 # ═══════════════════════════════════════════════════════════════════
 
-@st.cache_data
+@cache_compartida(
+    rutas=lambda: [ruta for ruta in (DB_FIN_SEMANA, DB_GRAN_PARADA) if ruta],
+    etiquetas=['evaluaciones:{db}', 'grupos:{db}']
+)
 def cargar_y_consolidar_datos():
-    """Carga y consolida datos de ambos eventos"""
+    """
+    Carga y consolida datos de ambos eventos.
+    
+    No usa st.*: los mensajes quedan en df.attrs['avisos'] (ver mostrar_avisos).
+    """
+    avisos = []
+    
+    def con_avisos(df):
+        df.attrs['avisos'] = avisos
+        return df
     
     # Verificar que existan las BDs
     if DB_FIN_SEMANA is None or DB_GRAN_PARADA is None:
-        st.error("❌ No se encontraron bases de datos en la carpeta data/")
-        st.info(f"📂 Buscando en: {DATA_DIR}")
-        return pd.DataFrame()
+        avisos.append(('error', "❌ No se encontraron bases de datos en la carpeta data/"))
+        avisos.append(('info', f"📂 Buscando en: {DATA_DIR}"))
+        return con_avisos(pd.DataFrame())
     
     def obtener_evaluaciones(db_path):
         """Obtiene evaluaciones de una BD"""
         if not Path(db_path).exists():
-            st.warning(f"⚠️ No se encuentra: {db_path}")
+            avisos.append(('warning', f"⚠️ No se encuentra: {db_path}"))
             return pd.DataFrame()
         
         try:
@@ -113,7 +118,7 @@ def cargar_y_consolidar_datos():
             conn.close()
             return df
         except Exception as e:
-            st.error(f"❌ Error leyendo {db_path}: {e}")
+            avisos.append(('error', f"❌ Error leyendo {db_path}: {e}"))
             return pd.DataFrame()
     
     # Cargar datos
@@ -122,59 +127,39 @@ def cargar_y_consolidar_datos():
     
     # Si alguna está vacía, mostrar info
     if df_fin.empty and df_gran.empty:
-        st.error("❌ No se pudieron cargar datos de ninguna base de datos")
-        return pd.DataFrame()
+        avisos.append(('error', "❌ No se pudieron cargar datos de ninguna base de datos"))
+        return con_avisos(pd.DataFrame())
     
+    # Si uno de los eventos aún no tiene evaluaciones, la nota es el promedio
+    # del otro sin ponderar (misma regla en premios, ranking en vivo y simulador)
+    un_solo_evento = df_fin.empty or df_gran.empty
     if df_fin.empty:
-        st.warning(f"⚠️ Base de datos vacía: {Path(DB_FIN_SEMANA).name}")
-        # Usar solo Gran Parada
-        df_gran['promedio_fin'] = None
-        df_gran['promedio_gran'] = df_gran['promedio']
-        df_gran['nota_consolidada'] = df_gran['promedio']
-        df_gran['participacion'] = "Gran Parada"
-        return df_gran
-    
+        avisos.append(('warning', f"⚠️ Base de datos vacía: {Path(DB_FIN_SEMANA).name}"))
     if df_gran.empty:
-        st.warning(f"⚠️ Base de datos vacía: {Path(DB_GRAN_PARADA).name}")
-        # Usar solo Fin de Semana
-        df_fin['promedio_fin'] = df_fin['promedio']
-        df_fin['promedio_gran'] = None
-        df_fin['nota_consolidada'] = df_fin['promedio']
-        df_fin['participacion'] = "Fin de Semana"
-        return df_fin
+        avisos.append(('warning', f"⚠️ Base de datos vacía: {Path(DB_GRAN_PARADA).name}"))
+    
+    def filas_de(df, codigo):
+        return df[df['codigo_grupo'] == codigo] if not df.empty else df
     
     # Consolidar ambas
-    todos_codigos = set(df_fin['codigo_grupo'].unique()) | set(df_gran['codigo_grupo'].unique())
+    todos_codigos = set()
+    for df in (df_fin, df_gran):
+        if not df.empty:
+            todos_codigos |= set(df['codigo_grupo'].unique())
     
     resultados = []
     for codigo in todos_codigos:
-        grupo_fin = df_fin[df_fin['codigo_grupo'] == codigo]
-        grupo_gran = df_gran[df_gran['codigo_grupo'] == codigo]
+        grupo_fin = filas_de(df_fin, codigo)
+        grupo_gran = filas_de(df_gran, codigo)
         
         info = grupo_fin.iloc[0] if len(grupo_fin) > 0 else grupo_gran.iloc[0]
         ficha = info['ficha_codigo']
-        ponderaciones = PONDERACIONES.get(ficha, {"fin_semana": 0.5, "gran_parada": 0.5})
         
         prom_fin = grupo_fin['promedio'].iloc[0] if len(grupo_fin) > 0 else None
         prom_gran = grupo_gran['promedio'].iloc[0] if len(grupo_gran) > 0 else None
         
-        if prom_fin and prom_gran:
-            nota_consolidada = prom_fin * ponderaciones['fin_semana'] + prom_gran * ponderaciones['gran_parada']
-            participacion = "Ambos"
-        elif prom_fin:
-            nota_consolidada = prom_fin * ponderaciones['fin_semana']
-            participacion = "Fin de Semana"
-        else:
-            nota_consolidada = prom_gran * ponderaciones['gran_parada']
-            participacion = "Gran Parada"
-        
-        # Estado patrimonial
-        if nota_consolidada < UMBRAL_RIESGO:
-            estado = "🔴"
-        elif nota_consolidada < UMBRAL_MEJORA:
-            estado = "🟡"
-        else:
-            estado = "🟢"
+        nota, participacion = nota_consolidada(prom_fin, prom_gran, ficha, un_solo_evento)
+        estado = estado_nota(nota)
         
         resultados.append({
             'codigo_grupo': codigo,
@@ -185,122 +170,223 @@ def cargar_y_consolidar_datos():
             'ficha_nombre': info['ficha_nombre'],
             'promedio_fin': prom_fin,
             'promedio_gran': prom_gran,
-            'nota_consolidada': nota_consolidada,
+            'nota_consolidada': nota,
             'estado': estado,
             'participacion': participacion
         })
     
-    return pd.DataFrame(resultados)
-def asignar_premio(nota, umbral):
-    if pd.isna(nota):
-        return "PARTICIPACIÓN"
-
-    if nota >= umbral:
-        return "CONGO DE ORO"
-    elif nota >= 1.8:
-        return "MEDALLA A LA EXCELENCIA"
-    elif nota >= 1.0:
-        return "HONOR AL FOLCLOR"
-    else:
-        return "PARTICIPACIÓN"
-
-def calcular_premios(df):
-    """
-    Calcula premios por modalidad:
-    - Asigna categoria
-    - Calcula umbral (percentil 75)
-    - Asigna premio según nota
-    - Genera ranking solo para Congos de Oro
-    """
-
-    if df.empty:
-        return pd.DataFrame()
-
-    resultados = []
-
-    for ficha in df['ficha_codigo'].unique():
-        df_ficha = df[df['ficha_codigo'] == ficha].copy()
-
-        # 🔶 Caso especial: CUMBIA por tamaño
-        if ficha == "CUMBIA":
-            for tamano in ['GRANDE', 'MEDIANO']:
-                df_cat = df_ficha[df_ficha['tamano'] == tamano].copy()
-                if df_cat.empty:
-                    continue
-
-                categoria = f'Cumbia {tamano.capitalize()}'
-                umbral = df_cat['nota_consolidada'].quantile(0.75)
+    return con_avisos(pd.DataFrame(resultados))
 
-                df_cat['categoria'] = categoria
-                df_cat['umbral_congo'] = umbral
-                df_cat['premio'] = df_cat.apply(
-                    lambda r: asignar_premio(
-                        r['nota_consolidada'], umbral
-                    ),
-                    axis=1
-                )
-
-                resultados.append(df_cat)
 
-        # 🔶 Caso general
-        else:
-            categoria = ficha
-            umbral = df_ficha['nota_consolidada'].quantile(0.75)
-
-            df_ficha['categoria'] = categoria
-            df_ficha['umbral_congo'] = umbral
-            df_ficha['premio'] = df_ficha.apply(
-                lambda r: asignar_premio(
-                    r['nota_consolidada'], umbral
-                ),
-                axis=1
-            )
-
-            resultados.append(df_ficha)
+@st.fragment(run_every=config.ranking_refresco_seg or None)
+def mostrar_ranking_en_vivo():
+    """Clasificación en vivo: se refresca sola aplicando solo las evaluaciones nuevas"""
+    ranking = obtener_ranking(DB_FIN_SEMANA, DB_GRAN_PARADA)
+    cambios = ranking.actualizar()
+    
+    categorias = ranking.categorias
+    if not categorias:
+        st.info("📭 Aún no hay evaluaciones para clasificar")
+        return
+    
+    col_c, col_u, col_a = st.columns([2, 1, 1])
+    with col_c:
+        categoria = st.selectbox("Categoría:", categorias, key="ranking_vivo_categoria")
+    
+    df_vivo = ranking.clasificacion(categoria)
+    umbral = ranking.umbral(categoria)
+    
+    with col_u:
+        st.metric("Umbral Congo de Oro", f"{umbral:.3f}", help="Percentil 75 de la categoría en este momento")
+    with col_a:
+        st.metric("Grupos actualizados", cambios,
+                  help=f"Grupos cuya nota cambió desde el refresco anterior (versión {ranking.version})")
+    
+    st.dataframe(
+        df_vivo,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'ranking': st.column_config.NumberColumn('Puesto', format='%d'),
+            'codigo_grupo': 'Código',
+            'nombre_propuesta': 'Nombre',
+            'ficha_codigo': 'Ficha',
+            'promedio_fin': st.column_config.NumberColumn('Fin de Semana', format='%.3f'),
+            'promedio_gran': st.column_config.NumberColumn('Gran Parada', format='%.3f'),
+            'nota_consolidada': st.column_config.NumberColumn('Nota', format='%.3f'),
+            'participacion': 'Participación',
+            'estado': 'Estado',
+            'premio': 'Premio provisional'
+        }
+    )
+    
+    refresco = f"cada {config.ranking_refresco_seg:g} s" if config.ranking_refresco_seg else "manual"
+    st.caption(f"🕒 Actualizado {ranking.actualizado:%H:%M:%S} · refresco {refresco} · "
+               "los premios oficiales son los del snapshot vigente")
 
-    df_final = pd.concat(resultados, ignore_index=True)
 
-    # 🔢 Ranking por categoria
-    df_final = df_final.sort_values(
-        ['categoria', 'nota_consolidada'],
-        ascending=[True, False]
+@st.fragment
+def mostrar_simulador(df_consolidado: pd.DataFrame):
+    """¿Qué pasaría si...? Premios con otras ponderaciones y umbrales"""
+    st.caption("Combina varios valores de cada parámetro: se evalúan todas las combinaciones "
+               "y se comparan con los premios de las reglas vigentes.")
+    
+    fichas = sorted(df_consolidado['ficha_codigo'].dropna().unique().tolist())
+    fichas_sel = st.multiselect("Fichas cuya ponderación quieres variar:", fichas, key="sim_fichas")
+    if fichas_sel and un_solo_evento(df_consolidado):
+        st.info("ℹ️ Solo un evento tiene evaluaciones: la nota es su promedio y las ponderaciones no la cambian")
+    
+    opciones_peso = [round(paso / 10, 1) for paso in range(11)]
+    pesos_fin = {}
+    for ficha in fichas_sel:
+        actual = PONDERACIONES.get(ficha, PONDERACION_POR_DEFECTO)['fin_semana']
+        pesos_fin[ficha] = st.multiselect(
+            f"{ficha} · peso Fin de Semana / Gran Parada",
+            sorted(set(opciones_peso) | {actual}),
+            default=[actual],
+            format_func=lambda peso: f"{peso:.0%} / {1 - peso:.0%}",
+            key=f"sim_pesos_{ficha}"
+        ) or [actual]
+    
+    col_p, col_m, col_h = st.columns(3)
+    with col_p:
+        percentiles = st.multiselect(
+            "Percentil Congo de Oro", sorted({0.6, 0.7, 0.75, 0.8, 0.9, PERCENTIL_CONGO}),
+            default=[PERCENTIL_CONGO], format_func=lambda q: f"P{q * 100:g}", key="sim_percentiles"
+        ) or [PERCENTIL_CONGO]
+    with col_m:
+        medallas = st.multiselect(
+            "🥇 Nota mínima Medalla", sorted({1.5, 1.6, 1.7, 1.8, 1.9, UMBRAL_MEDALLA}),
+            default=[UMBRAL_MEDALLA], key="sim_medalla"
+        ) or [UMBRAL_MEDALLA]
+    with col_h:
+        honores = st.multiselect(
+            "📜 Nota mínima Honor", sorted({0.8, 0.9, 1.0, 1.1, 1.2, UMBRAL_HONOR}),
+            default=[UMBRAL_HONOR], key="sim_honor"
+        ) or [UMBRAL_HONOR]
+    
+    col_r, col_mej = st.columns(2)
+    with col_r:
+        riesgos = st.multiselect(
+            "🔴 Estado en riesgo bajo", sorted({0.6, 0.7, 0.8, 0.9, 1.0, UMBRAL_RIESGO}),
+            default=[UMBRAL_RIESGO], key="sim_riesgo"
+        ) or [UMBRAL_RIESGO]
+    with col_mej:
+        mejoras = st.multiselect(
+            "🟡 Estado por mejorar bajo", sorted({1.4, 1.5, 1.6, 1.7, 1.8, UMBRAL_MEJORA}),
+            default=[UMBRAL_MEJORA], key="sim_mejora"
+        ) or [UMBRAL_MEJORA]
+    
+    escenarios = rejilla_escenarios(pesos_fin, percentiles, medallas, honores, riesgos, mejoras)
+    if len(escenarios) > MAX_ESCENARIOS:
+        st.warning(f"⚠️ {len(escenarios)} escenarios superan el máximo de {MAX_ESCENARIOS}; reduce las combinaciones")
+        return
+    
+    resultado = simular(df_consolidado, escenarios)
+    st.caption(f"🧪 {len(escenarios)} escenarios × {len(resultado.grupos)} grupos")
+    
+    st.markdown("#### Resumen por escenario")
+    st.dataframe(
+        resultado.resumen(),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Congos de Oro': st.column_config.NumberColumn(label="🏆", format="%d"),
+            'Medalla a la Excelencia': st.column_config.NumberColumn(label="🥇", format="%d"),
+            'Honor al Folclor': st.column_config.NumberColumn(label="📜", format="%d"),
+            'Participación': st.column_config.NumberColumn(label="🎭", format="%d"),
+            'Cambian': st.column_config.NumberColumn(format="%d"),
+            'Suben': st.column_config.NumberColumn(label="⬆️ Suben", format="%d"),
+            'Bajan': st.column_config.NumberColumn(label="⬇️ Bajan", format="%d")
+        }
     )
+    
+    st.markdown("#### Grupos que cambian de premio")
+    df_cambios = resultado.cambios()
+    if df_cambios.empty:
+        st.info("✅ Ningún grupo cambia de premio en estos escenarios")
+        return
+    
+    st.dataframe(
+        df_cambios,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'escenario': 'Escenario',
+            'codigo_grupo': 'Código',
+            'nombre_propuesta': 'Nombre',
+            'ficha_codigo': 'Ficha',
+            'categoria': 'Categoría',
+            'nota_actual': st.column_config.NumberColumn('Nota actual', format='%.3f'),
+            'nota_simulada': st.column_config.NumberColumn('Nota simulada', format='%.3f'),
+            'umbral_simulado': st.column_config.NumberColumn('Umbral simulado', format='%.3f'),
+            'premio_actual': 'Premio actual',
+            'premio_simulado': 'Premio simulado',
+            'cambio': ''
+        }
+    )
+
 
-    df_final['ranking'] = df_final.groupby('categoria').cumcount() + 1
+# Probabilidad mínima de conservar el premio para considerarlo estable
+ESTABILIDAD_MINIMA = 0.8
 
-    return df_final
 
-def calcular_congos_oro(df):
-    """Calcula Congos de Oro por modalidad (Top 25%)"""
-    if df.empty:
-        return pd.DataFrame()
+def mostrar_confianza():
+    """Intervalos de confianza de las notas y probabilidad de cada premio"""
+    st.caption(f"Se remuestrean con reemplazo los curadores de cada grupo ({config.bootstrap_replicas} réplicas) "
+               "y se recalculan notas, umbrales y premios. Los grupos con pocos curadores tienen intervalos "
+               "más amplios; con un solo curador no hay variación que estimar.")
     
-    congos = []
+    with st.spinner("Calculando intervalos de confianza..."):
+        df_ic = bootstrap_notas(DB_FIN_SEMANA, DB_GRAN_PARADA)
     
-    for ficha in df['ficha_codigo'].unique():
-        df_ficha = df[df['ficha_codigo'] == ficha]
-        
-        # Caso especial: CUMBIA separada por tamaño
-        if ficha == "CUMBIA":
-            for tamano in ['GRANDE', 'MEDIANO']:
-                df_tam = df_ficha[df_ficha['tamano'] == tamano]
-                if len(df_tam) > 0:
-                    umbral = df_tam['nota_consolidada'].quantile(0.75)
-                    df_oro = df_tam[df_tam['nota_consolidada'] >= umbral].copy()
-                    df_oro['categoria'] = f'Cumbia {tamano.capitalize()}'
-                    congos.append(df_oro)
-        else:
-            umbral = df_ficha['nota_consolidada'].quantile(0.75)
-            df_oro = df_ficha[df_ficha['nota_consolidada'] >= umbral].copy()
-            df_oro['categoria'] = ficha
-            congos.append(df_oro)
+    if df_ic.empty:
+        st.info("📭 No hay evaluaciones suficientes para estimar la confianza")
+        return
+    
+    col_c, col_m1, col_m2 = st.columns([2, 1, 1])
+    with col_c:
+        categorias = ['Todas'] + sorted(df_ic['categoria'].unique().tolist())
+        categoria_sel = st.selectbox("Categoría:", categorias, key="confianza_categoria")
+    
+    if categoria_sel != 'Todas':
+        df_ic = df_ic[df_ic['categoria'] == categoria_sel]
+    
+    inestables = df_ic[df_ic['estabilidad_premio'] < ESTABILIDAD_MINIMA]
+    with col_m1:
+        st.metric("⚠️ Premios inestables", len(inestables),
+                  help=f"Grupos que conservan su premio en menos del {ESTABILIDAD_MINIMA:.0%} de las réplicas")
+    with col_m2:
+        st.metric("Amplitud media del IC", f"{(df_ic['nota_ic_sup'] - df_ic['nota_ic_inf']).mean():.3f}")
     
-    if congos:
-        df_congos = pd.concat(congos, ignore_index=True)
-        df_congos = df_congos.sort_values(['categoria', 'nota_consolidada'], ascending=[True, False])
-        df_congos['ranking'] = df_congos.groupby('categoria').cumcount() + 1
-        return df_congos
-    return pd.DataFrame()
+    st.dataframe(
+        df_ic.assign(**{columna: df_ic[columna] * 100 for columna in
+                        ['prob_congo_oro', 'prob_medalla', 'prob_honor', 'prob_participacion',
+                         'estabilidad_premio', 'estabilidad_ranking']}),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'codigo_grupo': 'Código',
+            'nombre_propuesta': 'Nombre',
+            'ficha_codigo': None,
+            'categoria': 'Categoría',
+            'curadores_fin': st.column_config.NumberColumn('Curadores FS', format='%d'),
+            'curadores_gran': st.column_config.NumberColumn('Curadores GP', format='%d'),
+            'nota_consolidada': st.column_config.NumberColumn('Nota', format='%.3f'),
+            'nota_ic_inf': st.column_config.NumberColumn('IC inferior', format='%.3f'),
+            'nota_ic_sup': st.column_config.NumberColumn('IC superior', format='%.3f'),
+            'ranking': st.column_config.NumberColumn('🏅', format='%d'),
+            'ranking_ic_inf': st.column_config.NumberColumn('Puesto mín.', format='%d'),
+            'ranking_ic_sup': st.column_config.NumberColumn('Puesto máx.', format='%d'),
+            'premio': 'Premio',
+            'prob_congo_oro': st.column_config.ProgressColumn('🏆', format='%.0f%%', min_value=0, max_value=100),
+            'prob_medalla': st.column_config.ProgressColumn('🥇', format='%.0f%%', min_value=0, max_value=100),
+            'prob_honor': st.column_config.ProgressColumn('📜', format='%.0f%%', min_value=0, max_value=100),
+            'prob_participacion': st.column_config.ProgressColumn('🎭', format='%.0f%%', min_value=0, max_value=100),
+            'estabilidad_premio': st.column_config.ProgressColumn('Mismo premio', format='%.0f%%', min_value=0, max_value=100),
+            'estabilidad_ranking': st.column_config.ProgressColumn('Mismo puesto', format='%.0f%%', min_value=0, max_value=100)
+        }
+    )
 
 
 def mostrar_congos_oro():
@@ -332,18 +418,52 @@ def mostrar_congos_oro():
             - **📜Honor al Folclor**: Grupos con nota >= 1.0
             - **🎭Participación**: Grupos evaluados que no obtuvieron premio
             """)
-    # Cargar datos
+    # Cargar datos y premios (del snapshot guardado para estas notas, si existe)
     with st.spinner("Cargando datos..."):
-        df = cargar_y_consolidar_datos()
+        df_consolidado = cargar_y_consolidar_datos()
+        mostrar_avisos(df_consolidado)
         
-        if df.empty:
+        if df_consolidado.empty:
             st.error("❌ No se pudieron cargar datos")
             st.info("💡 Verifica que existan archivos .db en la carpeta data/")
             return
         
-        df = calcular_premios(df)
+        recalcular = st.session_state.pop('recalcular_premios', False)
+        df, huella = premios_vigentes(df_consolidado, recalcular=recalcular)
         df_congos = calcular_congos_oro(df)
     
+    guardado = pd.notna(df['fecha_registro'].iloc[0])
+    col_snap, col_recalc = st.columns([4, 1])
+    with col_snap:
+        if guardado:
+            st.caption(f"🧾 Premios guardados el {df['fecha_registro'].iloc[0]} · huella de los datos `{huella[:12]}`")
+        else:
+            st.caption(f"🧮 Premios calculados con las notas actuales, sin guardar · huella de los datos `{huella[:12]}`")
+    with col_recalc:
+        if st.button("🔄 Recalcular premios" if guardado else "💾 Guardar premios", use_container_width=True,
+                     help="Calcula los premios con las notas actuales y los guarda como snapshot "
+                          f"(se conservan los últimos {config.premios_snapshot_retencion})"):
+            st.session_state.recalcular_premios = True
+            LogModel.registrar_log(
+                usuario=st.session_state.get('usuario'),
+                accion="RECALCULO_PREMIOS",
+                detalle=f"Huella: {huella[:12]}"
+            )
+            st.rerun()
+    
+    with st.expander("🗂️ Historial de cálculos de premios"):
+        st.dataframe(
+            PremiosSnapshotModel.listar(),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'hash_entradas': 'Huella de los datos',
+                'fecha_registro': 'Fecha de cálculo',
+                'grupos': st.column_config.NumberColumn('Grupos', format='%d'),
+                'congos_oro': st.column_config.NumberColumn('🏆', format='%d')
+            }
+        )
+    
     # KPIs principales
    
     
@@ -385,7 +505,10 @@ def mostrar_congos_oro():
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Tabs
-    tab1, tab2, tab3 = st.tabs(["🏆 Listado de premios", "📊 Todos los Grupos", "📈 Análisis por Modalidad"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        "🏆 Listado de premios", "📊 Todos los Grupos", "📈 Análisis por Modalidad", "📡 En vivo", "🧪 Simulador",
+        "🎲 Confianza"
+    ])
     
     with tab1:
         st.markdown("### 🏆 Listado de Premios")
@@ -457,31 +580,34 @@ def mostrar_congos_oro():
             }
         )
         
+        # Exportación generada al pedirla y reutilizada mientras no cambien
+        # los filtros ni las bases de datos de los eventos
+        filtros_exportacion = {'categoria': categoria_sel, 'premio': premio_sel, 'estado': estado_sel}
+        version = version_datos(DB_FIN_SEMANA, DB_GRAN_PARADA)
+        marca = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+        
         col_exp1, col_exp2, col_exp3 = st.columns(3)
     
         with col_exp1:
             # Exportar a Excel
-            excel_buffer = BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df_mostrar.to_excel(writer, sheet_name='Evaluaciones', index=False)
-            
-            st.download_button(
+            boton_descarga_diferida(
+                "consolidado_congos", filtros_exportacion, version, ".xlsx",
+                lambda destino: escribir_xlsx(lotes_dataframe(df_mostrar), destino, hoja='Evaluaciones'),
                 label="📥 Exportar Excel",
-                data=excel_buffer.getvalue(),
-                file_name=f"consolidado_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                file_name=f"consolidado_{marca}.xlsx",
+                mime=MIME_XLSX,
                 type="primary",
                 use_container_width=True
             )
 
         with col_exp2:
             # Exportar a CSV
-            csv_data = df_mostrar.to_csv(index=False)
-            st.download_button(
+            boton_descarga_diferida(
+                "consolidado_congos", filtros_exportacion, version, ".csv",
+                lambda destino: escribir_csv(lotes_dataframe(df_mostrar), destino),
                 label="📥 Exportar CSV",
-                data=csv_data,
-                file_name=f"consolidado_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
+                file_name=f"consolidado_{marca}.csv",
+                mime=MIME_CSV,
                 type="secondary",
                 use_container_width=True
             )
@@ -580,59 +706,8 @@ def mostrar_congos_oro():
     with tab3:
         st.markdown("### 📈 Análisis por Modalidad")
         
-        # Resumen por ficha
-        resumen = []
-        for ficha in sorted(df['ficha_codigo'].unique()):
-            df_ficha = df[df['ficha_codigo'] == ficha]
-            
-            if ficha == "CUMBIA":
-                for tamano in ['GRANDE', 'MEDIANO']:
-                    df_tam = df_ficha[df_ficha['tamano'] == tamano]
-                    if len(df_tam) > 0:
-                        df_oro = df_tam[df_tam['nota_consolidada'] >= df_tam['nota_consolidada'].quantile(0.75)]
-                        resumen.append({
-                            'Ficha': f'Cumbia {tamano.capitalize()}',
-                            'Total': len(df_tam),
-                            'Congos de Oro': len(df_oro),
-                            'Medalla a la Excelencia': len(df_tam[df_tam['premio'] == "MEDALLA A LA EXCELENCIA"]),
-                            'Honor al Folclor': len(df_tam[df_tam['premio'] == "HONOR AL FOLCLOR"]),
-                            'Participación': len(df_tam[df_tam['premio'] == "PARTICIPACIÓN"]),
-                            #'% Congos de Oro': len(df_oro)/len(df_tam)*100 if len(df_tam) > 0 else 0,
-                            'Promedio': df_tam['nota_consolidada'].mean(),
-                            'Umbral': df_tam['nota_consolidada'].quantile(0.75),
-                            '🟢' : len(df_tam[df_tam['estado'] == "🟢"]),
-                            #'🟢%' : len(df_tam[df_tam['estado'] == "🟢 Fortalecimiento"])/len(df_tam)*100 if len(df_tam) > 0 else 0,
-                            '🟡' : len(df_tam[df_tam['estado'] == "🟡"]),
-                            #'🟡%' : len(df_tam[df_tam['estado'] == "🟡 Mejora"])/len(df_tam)*100 if len(df_tam) > 0 else 0,
-                            '🔴' : len(df_tam[df_tam['estado'] == "🔴"]),
-                            #'🔴%' : len(df_tam[df_tam['estado'] == "🔴 Riesgo"])/len(df_tam)*100 if len(df_tam) > 0 else 0,
-                            #'Máximo': df_tam['nota_consolidada'].max(),
-                            #'Mínimo': df_tam['nota_consolidada'].min(),
-                            #'Desv. Std': df_tam['nota_consolidada'].std()
-                        })
-            else:
-                df_oro = df_ficha[df_ficha['nota_consolidada'] >= df_ficha['nota_consolidada'].quantile(0.75)]
-                resumen.append({
-                    'Ficha': ficha,
-                    'Total': len(df_ficha),
-                    'Congos de Oro': len(df_oro),
-                    'Medalla a la Excelencia': len(df_ficha[df_ficha['premio'] == "MEDALLA A LA EXCELENCIA"]),
-                    'Honor al Folclor': len(df_ficha[df_ficha['premio'] == "HONOR AL FOLCLOR"]),
-                    'Participación': len(df_ficha[df_ficha['premio'] == "PARTICIPACIÓN"]),
-                    'Promedio': df_ficha['nota_consolidada'].mean(),
-                    'Umbral': df_ficha['nota_consolidada'].quantile(0.75),
-                    '🟢' : len(df_ficha[df_ficha['estado'] == "🟢"]),
-                    #'🟢%' : len(df_ficha[df_ficha['estado'] == "🟢 Fortalecimiento"])/len(df_ficha)*100 if len(df_ficha) > 0 else 0,
-                    '🟡' : len(df_ficha[df_ficha['estado'] == "🟡"]),
-                    #'🟡%' : len(df_ficha[df_ficha['estado'] == "🟡 Mejora"])/len(df_ficha)*100 if len(df_ficha) > 0 else 0,
-                    '🔴' : len(df_ficha[df_ficha['estado'] == "🔴"]),
-                    #'🔴%' : len(df_ficha[df_ficha['estado'] == "🔴 Riesgo"])/len(df_ficha)*100 if len(df_ficha) > 0 else 0,
-                    #'Máximo': df_ficha['nota_consolidada'].max(),
-                    #'Mínimo': df_ficha['nota_consolidada'].min(),
-                    #'Desv. Std': df_ficha['nota_consolidada'].std()
-                })
-        
-        df_resumen = pd.DataFrame(resumen)
+        # Resumen por categoría (mismo umbral que el cálculo de premios)
+        df_resumen = resumen_por_categoria(df)
         
         st.data_editor(
             df_resumen,
@@ -660,3 +735,15 @@ def mostrar_congos_oro():
                 #'Desv. Std': st.column_config.NumberColumn(format="%.3f"),
             }
         )
+
+    with tab4:
+        st.markdown("### 📡 Clasificación en vivo")
+        mostrar_ranking_en_vivo()
+
+    with tab5:
+        st.markdown("### 🧪 Simulador de escenarios")
+        mostrar_simulador(df_consolidado)
+
+    with tab6:
+        st.markdown("### 🎲 Confianza de las notas y premios")
+        mostrar_confianza()
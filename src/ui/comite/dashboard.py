@@ -8,8 +8,10 @@ import altair as alt
 import numpy as np
 import sqlite3
 from pathlib import Path
-from .utils import estado_patrimonial
+from .utils import estado_patrimonial, mostrar_avisos
 from src.config import config, DATA_DIR
+from src.database.cache import cache_por_version
+from src.analytics.kernel import resultados_analiticos
 
 def hex_to_rgb(hex_color):
     hex_color = hex_color.lstrip('#')
@@ -18,33 +20,59 @@ def hex_to_rgb(hex_color):
 def rgb_to_hex(rgb):
     return '#{:02x}{:02x}{:02x}'.format(*rgb.astype(int))
 
-def color_gradiente(valor, min_val=0, max_val=2):
+# Colores ancla del gradiente (puedes cambiarlos)
+COLORES_GRADIENTE = [
+    '#DA0024',  # rojo
+    '#FFCA00',  # amarillo
+    '#1a9850'   # verde fuerte
+]
+
+# Resolución de la tabla de colores precalculada
+PASOS_GRADIENTE = 1024
+
+
+def _construir_lut_gradiente(colores, pasos):
     """
-    Gradiente continuo tipo Altair
+    Precalcula los colores hex del gradiente en `pasos` posiciones equiespaciadas de [0, 1]
     """
-    # Colores ancla (puedes cambiarlos)
-    colores = [
-        '#DA0024',  # rojo
-        '#FFCA00',  # amarillo
-        '#1a9850'   # verde fuerte
-    ]
+    anclas = np.array([hex_to_rgb(c) for c in colores], dtype=float)
+    t = np.linspace(0, 1, pasos)
+    posiciones = np.linspace(0, 1, len(colores))
+    rgb = np.column_stack([np.interp(t, posiciones, anclas[:, canal]) for canal in range(3)])
+    return np.array([rgb_to_hex(fila) for fila in rgb], dtype=object)
 
-    # Normalizar valor
-    t = np.clip((valor - min_val) / (max_val - min_val), 0, 1)
 
-    # Posición en la escala
-    idx = t * (len(colores) - 1)
-    i = int(np.floor(idx))
-    frac = idx - i
+_LUT_GRADIENTE = _construir_lut_gradiente(COLORES_GRADIENTE, PASOS_GRADIENTE)
+
+
+def colores_para(valores, min_val=0, max_val=2):
+    """
+    Gradiente vectorizado: retorna un array con el color hex de cada valor
+    ('' para valores nulos)
+    """
+    v = np.asarray(valores, dtype=float)
+    t = np.clip((v - min_val) / (max_val - min_val), 0, 1)
+    nulos = np.isnan(t)
+    idx = np.rint(np.where(nulos, 0, t) * (PASOS_GRADIENTE - 1)).astype(np.intp)
+    return np.where(nulos, '', _LUT_GRADIENTE[idx])
+
 
-    if i >= len(colores) - 1:
-        return colores[-1]
+def color_gradiente(valor, min_val=0, max_val=2):
+    """
+    Gradiente continuo tipo Altair
+    """
+    return colores_para([valor], min_val, max_val)[0]
 
-    c1 = hex_to_rgb(colores[i])
-    c2 = hex_to_rgb(colores[i + 1])
 
-    rgb = c1 + frac * (c2 - c1)
-    return rgb_to_hex(rgb)
+def estilo_columna_gradiente(df, col_valor, col_estado, css_extra=''):
+    """
+    Estilos de tabla completos para Styler.apply(..., axis=None): colorea
+    `col_estado` según `col_valor` y deja el resto de celdas sin estilo
+    """
+    estilos = pd.DataFrame('', index=df.index, columns=df.columns)
+    colores = colores_para(df[col_valor].to_numpy(dtype=float))
+    estilos[col_estado] = np.where(colores != '', 'background-color: ' + colores.astype(object) + css_extra, '')
+    return estilos
 
 def cuadrado_color_estado(valor):
     if valor == 2:
@@ -120,58 +148,57 @@ def barra_gradiente(valor):
         </div>
         """
 
-@st.cache_data(ttl=60)
-def cargar_evaluaciones_desde_db(db_path: str):
+@cache_por_version(etiquetas=['evaluaciones:{db}'])
+def cargar_observaciones_desde_db(db_path: str, codigo_grupo: str = None):
     """
-    Carga evaluaciones desde una base de datos específica
+    Carga las observaciones cualitativas (una por envío) de un grupo
     
     Args:
         db_path: Ruta al archivo .db
+        codigo_grupo: Código del grupo (None = todos los grupos)
     
     Returns:
-        DataFrame con evaluaciones
+        DataFrame con codigo_grupo, curador, ficha, observacion y fecha_registro
     """
     if not Path(db_path).exists():
-        st.error(f"❌ Base de datos no encontrada: {db_path}")
         return pd.DataFrame()
     
     try:
         conn = sqlite3.connect(db_path)
         
-        query = """
+        filtro = "WHERE en.codigo_grupo = ?" if codigo_grupo is not None else ""
+        query = f"""
             SELECT 
-                e.id,
+                en.codigo_grupo,
                 u.username as curador,
-                e.codigo_grupo,
-                g.nombre_propuesta,
-                g.modalidad,
-                g.tipo,
                 f.nombre as ficha,
-                fg.nombre as ficha_grupo,
-                d.nombre as dimension,
-                a.nombre as aspecto,
-                e.resultado,
-                e.observacion,
-                e.fecha_registro
-            FROM evaluaciones e
-            LEFT JOIN usuarios u ON e.usuario_id = u.id
-            LEFT JOIN grupos g ON e.codigo_grupo = g.codigo
-            LEFT JOIN fichas f ON e.ficha_id = f.id
-            LEFT JOIN fichas fg ON g.ficha_id = fg.id
-            JOIN aspectos a ON e.aspecto_id = a.id
-            JOIN dimensiones d ON a.dimension_id = d.id
-            ORDER BY e.fecha_registro DESC
+                en.observacion,
+                en.fecha_registro
+            FROM envios en
+            LEFT JOIN usuarios u ON en.usuario_id = u.id
+            LEFT JOIN fichas f ON en.ficha_id = f.id
+            {filtro}
+            ORDER BY en.fecha_registro DESC
         """
         
-        df = pd.read_sql_query(query, conn)
+        params = (codigo_grupo,) if codigo_grupo is not None else ()
+        df = pd.read_sql_query(query, conn, params=params)
         conn.close()
         
         return df
         
     except Exception as e:
-        st.error(f"❌ Error cargando datos: {e}")
+        st.error(f"❌ Error cargando observaciones: {e}")
         return pd.DataFrame()
-def seleccionador_eventos():
+
+
+def selector_evento():
+    """
+    Muestra el selector de evento
+    
+    Returns:
+        Tupla (db_path, evento_nombre)
+    """
     st.markdown("### Seleccionar Evento")
     
     col_selector, col_info = st.columns([2, 1])
@@ -197,34 +224,33 @@ def seleccionador_eventos():
         db_path = str(DATA_DIR / "curaduria_granparada.db")
         evento_nombre = "Gran Parada de Tradición"
     
-    # Cargar datos del evento seleccionado
-    
-    with st.spinner(f"Cargando datos de {evento_nombre}..."):
-        df_eval = cargar_evaluaciones_desde_db(db_path)
-    
-    return df_eval
+    return db_path, evento_nombre
 
 
 def mostrar_dashboard(df_eval: pd.DataFrame):
     """Dashboard general con KPIs y gráficos principales mejorados"""
-    df_eval = seleccionador_eventos()
+    db_path, evento_nombre = selector_evento()
+    
+    # Sin este control, la conexión crearía un archivo .db vacío
+    if not Path(db_path).exists():
+        st.error(f"❌ Base de datos no encontrada: {db_path}")
+        return
+    
+    with st.spinner(f"Cargando datos de {evento_nombre}..."):
+        resultados = resultados_analiticos(db_path)
     
-    if df_eval.empty:
+    # Errores de lectura (p. ej. base de datos sin migrar): no es lo mismo que "sin evaluaciones"
+    if resultados.avisos:
+        mostrar_avisos(resultados)
+        return
+    
+    if resultados.vacio:
         st.warning("⚠️ No hay evaluaciones registradas todavía")
         st.info("Las métricas aparecerán aquí una vez que los curadores comiencen a evaluar grupos")
         return
     
-    # Verificar que existe la columna 'ficha' o 'ficha_grupo'
-    if 'ficha' not in df_eval.columns and 'ficha_grupo' in df_eval.columns:
-        df_eval['ficha'] = df_eval['ficha_grupo']
-    
-    # Calcular promedios por grupo (promedio de TODOS los aspectos evaluados)
-    # Usar 'ficha' en lugar de 'modalidad'
-    df_promedios = (df_eval
-        .groupby(['codigo_grupo', 'nombre_propuesta', 'ficha'], as_index=False)
-        .agg(promedio_final=('resultado', 'mean'))
-        .dropna(subset=['promedio_final'])
-    )
+    # Promedios por grupo (promedio de TODOS los aspectos evaluados), por ficha
+    df_promedios = resultados.grupos[['codigo_grupo', 'nombre_propuesta', 'ficha', 'promedio_final']]
     
     if df_promedios.empty:
         st.warning("⚠️ No hay evaluaciones completas para calcular promedios")
@@ -237,8 +263,8 @@ def mostrar_dashboard(df_eval: pd.DataFrame):
     # ============================================================
     st.subheader("📈 Métricas Clave")
     
-    total_evaluaciones = len(df_eval)
-    curadores_activos = df_eval['curador'].nunique()
+    total_evaluaciones = resultados.total_evaluaciones
+    curadores_activos = resultados.total_curadores
     grupos_evaluados = df_promedios['codigo_grupo'].nunique()
     promedio_general = df_promedios['promedio_final'].mean()
     desviacion_std = df_promedios['promedio_final'].std()
@@ -316,15 +342,9 @@ def mostrar_dashboard(df_eval: pd.DataFrame):
     st.subheader("📊 Análisis por Modalidad")
     
     if 'ficha' in df_promedios.columns and df_promedios['ficha'].notna().any():
-        df_ficha = (df_promedios
-            .groupby('ficha', as_index=False)
-            .agg(
-                promedio=('promedio_final', 'mean'),
-                cantidad=('codigo_grupo', 'count'),
-                #desviacion=('promedio_final', 'std'),
-                #min_promedio=('promedio_final', 'min'),
-                #max_promedio=('promedio_final', 'max')
-            )
+        df_ficha = (resultados.fichas
+            .rename(columns={'promedio_grupos': 'promedio', 'grupos_evaluados': 'cantidad'})
+            [['ficha', 'promedio', 'cantidad']]
             .sort_values('promedio', ascending=False)
         )
         
@@ -352,19 +372,12 @@ def mostrar_dashboard(df_eval: pd.DataFrame):
         
         st.altair_chart(chart_ficha, use_container_width=True)
         """"""
-        def estilo_estado_ficha(row):
-            color = color_gradiente(row['promedio'])
-            return [
-                f'background-color: {color}'
-                if col == 'resultado_emoji' else ''
-                for col in row.index
-            ]
-        df_ficha['resultado_emoji'] = df_ficha['promedio'].apply(lambda x:"")
+        df_ficha['resultado_emoji'] = ""
             
         st.dataframe(
             df_ficha
                 .style
-                .apply(estilo_estado_ficha, axis=1)
+                .apply(estilo_columna_gradiente, axis=None, col_valor='promedio', col_estado='resultado_emoji')
                 .format({'promedio': '{:.2f}'}),
             use_container_width=False,
             hide_index=True,
@@ -1,94 +1,145 @@
 import pandas as pd
 import streamlit as st
-import altair as alt
-import pandas as pd
+from pathlib import Path
+from src.database.models import EvaluacionModel
+from .dashboard import selector_evento
+from .exports import escribir_csv, escribir_xlsx, boton_descarga_diferida, version_datos, MIME_CSV, MIME_XLSX
+
+
+FILTROS_RESULTADO = {
+    "Todos": None,
+    "🟢 Fortaleza (2)": 2,
+    "🟡 Oportunidad (1)": 1,
+    "🔴 Riesgo (0)": 0
+}
+
+ORDENES = {
+    "Más recientes primero": True,
+    "Más antiguas primero": False
+}
 
 
-def mostrar_evaluaciones_detalladas(df_eval: pd.DataFrame) -> None:
-    """Tabla detallada de todas las evaluaciones"""
+def mostrar_evaluaciones_detalladas(df_eval: pd.DataFrame = None) -> None:
+    """
+    Tabla detallada de todas las evaluaciones.
+    La búsqueda, el filtro y el orden se resuelven en SQL y solo se carga la página visible.
+    """
+    db_path, evento_nombre = selector_evento()
 
-    st.header("Evaluaciones Detalladas")
+    st.header("📋 Evaluaciones Detalladas")
     st.caption("Vista completa de todas las evaluaciones por aspecto")
 
+    # Sin este control, la conexión crearía un archivo .db vacío (que luego se detectaría como evento)
+    if not Path(db_path).exists():
+        st.error(f"❌ Base de datos no encontrada: {db_path}")
+        return
+
     # Opciones de visualización
-    col_opt1, col_opt2, col_opt3 = st.columns([3, 1, 1])
+    col_opt1, col_opt2, col_opt3, col_opt4 = st.columns([3, 1, 1, 1])
 
     with col_opt1:
         buscar = st.text_input(
             "🔍 Buscar",
-            placeholder="Buscar por grupo, curador, dimensión o aspecto...",
+            placeholder="Buscar por grupo, curador, dimensión, aspecto u observación..."
         )
 
     with col_opt2:
-        st.markdown("<br>", unsafe_allow_html=True)
-        filtro_resultado = st.selectbox(
-            "Filtrar por resultado",
-            ["Todos", "🟢 Fortaleza (2)", "🟡 Oportunidad (1)", "🔴 Riesgo (0)"]
-        )
+        filtro_resultado = st.selectbox("Filtrar por resultado", list(FILTROS_RESULTADO))
 
     with col_opt3:
-        st.markdown("<br>", unsafe_allow_html=True)
-        # Export placeholder; real export implemented in exports.py if needed
-    df_eval1 = df_eval.copy()
-    df_eval1['resultado_emoji'] = df_eval1['resultado'].map({2: '🟢', 1: '🟡', 0: '🔴'})
-    st.dataframe(
-        df_eval1[[
-            'curador', 'codigo_grupo', 'nombre_propuesta', 'ficha_grupo',
-            'modalidad', 'dimension', 'aspecto', 'resultado_emoji',
-            'observacion', 'fecha_registro', 'resultado'
-        ]].sort_values('fecha_registro', ascending=False),
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            'resultado_emoji': st.column_config.TextColumn('Estado')
-        }
+        orden = st.selectbox("Orden", list(ORDENES))
+
+    with col_opt4:
+        tamano_pagina = st.selectbox("Filas por página", [25, 50, 100, 200], index=1)
+
+    resultado = FILTROS_RESULTADO[filtro_resultado]
+    descendente = ORDENES[orden]
+
+    # Pila de cursores: cursores[i] es el punto de partida de la página i.
+    # Se reinicia cuando cambia cualquier filtro o el evento.
+    firma = (db_path, buscar.strip(), resultado, descendente, tamano_pagina)
+    if st.session_state.get('eval_detalle_firma') != firma:
+        st.session_state.eval_detalle_firma = firma
+        st.session_state.eval_detalle_cursores = [None]
+
+    cursores = st.session_state.eval_detalle_cursores
+    pagina = len(cursores) - 1
+
+    df_pagina, total, siguiente = EvaluacionModel.buscar_pagina(
+        texto=buscar.strip() or None,
+        resultado=resultado,
+        descendente=descendente,
+        despues_de=cursores[-1],
+        limite=tamano_pagina,
+        db_path=db_path
     )
-    # Filtrar
-    df_mostrar = df_eval.copy()
-    if buscar:
-        df_mostrar = df_mostrar[
-            df_mostrar['nombre_propuesta'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['curador'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['dimension'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['aspecto'].str.contains(buscar, case=False, na=False) |
-            df_mostrar['ficha_grupo'].astype(str).str.contains(buscar, case=False, na=False)
-        ]
-
-    if filtro_resultado != "Todos":
-        resultado_map = {
-            "🟢 Fortaleza (2)": 2,
-            "🟡 Oportunidad (1)": 1,
-            "🔴 Riesgo (0)": 0
-        }
-        df_mostrar = df_mostrar[df_mostrar['resultado'] == resultado_map[filtro_resultado]]
+
+    if total == 0:
+        st.info("No hay evaluaciones que coincidan con los filtros")
+        return
 
     # Mapear resultados a emojis
-    df_mostrar['resultado_emoji'] = df_mostrar['resultado'].map({2: '🟢', 1: '🟡', 0: '🔴'})
+    df_pagina['resultado_emoji'] = df_pagina['resultado'].map({2: '🟢', 1: '🟡', 0: '🔴'})
 
-    # Mostrar tabla
     st.dataframe(
-        df_mostrar[[
+        df_pagina[[
             'curador', 'codigo_grupo', 'nombre_propuesta', 'ficha_grupo',
             'modalidad', 'dimension', 'aspecto', 'resultado_emoji',
             'observacion', 'fecha_registro', 'resultado'
-        ]].sort_values('fecha_registro', ascending=False),
+        ]],
         use_container_width=True,
         hide_index=True,
         column_config={
-            'resultado_emoji': st.column_config.TextColumn('Estado')
+            'resultado_emoji': st.column_config.TextColumn('Resultado')
         }
     )
 
-    _count = len(df_mostrar)
-    st.caption(f"Total de registros: {_count}")
+    # Navegación entre páginas
+    total_paginas = max(1, -(-total // tamano_pagina))
+    col_ant, col_info, col_sig = st.columns([1, 2, 1])
+
+    with col_ant:
+        if st.button("◀ Anterior", disabled=pagina == 0, use_container_width=True):
+            cursores.pop()
+            st.rerun()
+
+    with col_info:
+        st.caption(f"Página {pagina + 1} de {total_paginas} · Total de registros: {total}")
+
+    with col_sig:
+        if st.button("Siguiente ▶", disabled=siguiente is None, use_container_width=True):
+            cursores.append(siguiente)
+            st.rerun()
+
+    # Exportar datos (todas las filas del filtro). Los archivos se generan solo
+    # cuando se solicitan, leyendo el cursor por lotes, y quedan en caché
+    # mientras no cambien los filtros ni la base de datos.
+    st.markdown("---")
+    consulta = dict(texto=buscar.strip() or None, resultado=resultado,
+                    descendente=descendente, db_path=db_path)
+    version = version_datos(db_path)
+    marca = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+
+    col_exp1, col_exp2 = st.columns(2)
+
+    with col_exp1:
+        boton_descarga_diferida(
+            "evaluaciones_detalladas", consulta, version, ".xlsx",
+            lambda destino: escribir_xlsx(EvaluacionModel.iterar_busqueda(**consulta), destino, hoja='Evaluaciones'),
+            label="📥 Exportar Excel",
+            file_name=f"evaluaciones_detalladas_{marca}.xlsx",
+            mime=MIME_XLSX,
+            type="primary",
+            use_container_width=True
+        )
 
-    col_exp1, col_exp2, col_exp3 = st.columns([1, 2, 1])
     with col_exp2:
-        csv_data = df_mostrar.to_csv(index=False)
-        st.download_button(
+        boton_descarga_diferida(
+            "evaluaciones_detalladas", consulta, version, ".csv",
+            lambda destino: escribir_csv(EvaluacionModel.iterar_busqueda(**consulta), destino),
             label="📥 Exportar CSV",
-            data=csv_data,
-            file_name=f"evaluaciones_detalladas_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-            type="primary"
+            file_name=f"evaluaciones_detalladas_{marca}.csv",
+            mime=MIME_CSV,
+            type="secondary",
+            use_container_width=True
         )
@@ -1,19 +1,312 @@
 """
 Funciones de exportación para las vistas del comité
-Incluye PDF, Excel, CSV y backups
+Incluye PDF, Excel y CSV (los backups están en src/database/backup.py)
 """
 
 import pandas as pd
-from io import BytesIO
+import streamlit as st
 import zipfile
 import os
+import re
+import hashlib
+import json
+import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator
 from fpdf import FPDF
-from src.config import config
+from openpyxl import Workbook
+from src.config import config, CACHE_DIR
 from .utils import estado_patrimonial_texto
 
+logger = logging.getLogger(__name__)
 
-def generar_pdf_grupo(df_grupo: pd.DataFrame) -> bytes:
-    """Genera un PDF con el informe detallado del grupo"""
+
+# ═══════════════════════════════════════════════════════════════════
+# EXPORTACIÓN POR LOTES (CSV / XLSX)
+# ═══════════════════════════════════════════════════════════════════
+# Los escritores reciben un iterable de DataFrames (p. ej. EvaluacionModel.iterar_busqueda)
+# y escriben cada lote en un archivo en disco, de modo que la memoria usada
+# depende del tamaño del lote y no del total de filas.
+
+TAMANO_LOTE_EXPORTACION = 5000
+
+MIME_CSV = "text/csv"
+MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def lotes_dataframe(df: pd.DataFrame, tamano_lote: int = TAMANO_LOTE_EXPORTACION) -> Iterator[pd.DataFrame]:
+    """Divide un DataFrame ya cargado en lotes para los escritores"""
+    for inicio in range(0, max(len(df), 1), tamano_lote):
+        yield df.iloc[inicio:inicio + tamano_lote]
+
+
+def archivo_temporal(sufijo: str, directorio=None) -> str:
+    """
+    Ruta de un archivo temporal nuevo para una exportación
+    (en el mismo directorio del destino final, para poder publicarlo con os.replace)
+    """
+    descriptor, ruta = tempfile.mkstemp(prefix="curaduria_", suffix=sufijo, dir=directorio)
+    os.close(descriptor)
+    return ruta
+
+
+def escribir_csv(lotes: Iterable[pd.DataFrame], destino: str = None) -> str:
+    """
+    Escribe los lotes en un CSV (UTF-8 con BOM para que Excel respete las tildes)
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    destino = destino or archivo_temporal(".csv")
+
+    with open(destino, 'w', encoding='utf-8-sig', newline='') as archivo:
+        encabezado = True
+        for lote in lotes:
+            lote.to_csv(archivo, index=False, header=encabezado)
+            encabezado = False
+
+    return destino
+
+
+def escribir_xlsx(lotes: Iterable[pd.DataFrame], destino: str = None, hoja: str = "Datos") -> str:
+    """
+    Escribe los lotes en un libro XLSX en modo write-only de openpyxl
+    (las filas se vuelcan a disco a medida que se agregan)
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    destino = destino or archivo_temporal(".xlsx")
+
+    libro = Workbook(write_only=True)
+    hoja_excel = libro.create_sheet(hoja)
+
+    encabezado = True
+    for lote in lotes:
+        if encabezado:
+            hoja_excel.append([str(columna) for columna in lote.columns])
+            encabezado = False
+
+        # NaN → celda vacía
+        valores = lote.astype(object).where(lote.notna(), None)
+        for fila in valores.itertuples(index=False, name=None):
+            hoja_excel.append(fila)
+
+    libro.save(destino)
+    return destino
+
+
+# ═══════════════════════════════════════════════════════════════════
+# EXPORTACIONES DIFERIDAS EN CACHÉ
+# ═══════════════════════════════════════════════════════════════════
+# Los archivos se generan solo cuando el usuario los pide y se guardan en
+# disco con una clave (nombre, filtros, versión de los datos). Mientras los
+# datos no cambien, la misma vista se descarga sin volver a serializar.
+
+EXPORTACIONES_DIR = CACHE_DIR / "exportaciones"
+
+
+def version_datos(*db_paths) -> tuple:
+    """
+    Versión de los datos de una o varias bases de datos: cambia con cada
+    escritura confirmada (tamaño y fecha de modificación del archivo)
+    """
+    version = []
+    for db_path in db_paths:
+        try:
+            estado = os.stat(db_path)
+            version.append((str(db_path), estado.st_mtime_ns, estado.st_size))
+        except OSError:
+            version.append((str(db_path), None, None))
+    return tuple(version)
+
+
+def clave_exportacion(nombre: str, filtros: dict, version: tuple) -> str:
+    """Clave estable de una exportación a partir de sus filtros y la versión de los datos"""
+    contenido = json.dumps([nombre, filtros, version], sort_keys=True, default=str)
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:32]
+
+
+def podar_directorio(directorio, max_archivos: int) -> None:
+    """Elimina los archivos más antiguos de un directorio de caché por encima del límite"""
+    try:
+        archivos = sorted(directorio.glob("*.*"), key=lambda ruta: ruta.stat().st_mtime)
+    except OSError:
+        return
+
+    for ruta in archivos[:max(len(archivos) - max_archivos, 0)]:
+        try:
+            ruta.unlink()
+        except OSError:
+            pass
+
+
+def podar_cache_exportaciones(max_archivos: int = None) -> None:
+    """Elimina las exportaciones más antiguas cuando se supera el límite configurado"""
+    podar_directorio(EXPORTACIONES_DIR, max_archivos or config.max_exportaciones_cache)
+
+
+def exportacion_en_cache(clave: str, sufijo: str, generar: Callable[[str], str]) -> str:
+    """
+    Ruta del archivo en caché para la clave; si no existe lo genera con
+    generar(destino) y lo publica de forma atómica
+
+    Returns:
+        Ruta del archivo exportado
+    """
+    EXPORTACIONES_DIR.mkdir(parents=True, exist_ok=True)
+    ruta = EXPORTACIONES_DIR / f"{clave}{sufijo}"
+
+    if not ruta.exists():
+        temporal = archivo_temporal(sufijo, EXPORTACIONES_DIR)
+        try:
+            generar(temporal)
+            os.replace(temporal, ruta)
+        finally:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+        podar_cache_exportaciones()
+
+    return str(ruta)
+
+
+def _boton_descargar(ruta, estado: str, clave: str, label: str, file_name: str, mime: str, **kwargs) -> None:
+    """
+    Botón de descarga de un archivo ya preparado. Al pulsarlo (o si el archivo
+    desapareció, p. ej. podado por otra sesión) la descarga queda sin preparar.
+    """
+    try:
+        archivo = open(ruta, 'rb')
+    except FileNotFoundError:
+        st.session_state.pop(estado, None)
+        st.warning("⚠️ El archivo ya no está disponible; vuelva a prepararlo")
+        return
+
+    with archivo:
+        st.download_button(label=label, data=archivo, file_name=file_name, mime=mime,
+                           key=f"descargar_{clave}", on_click=st.session_state.pop, args=(estado, None),
+                           **kwargs)
+
+
+def boton_descarga_diferida(nombre: str, filtros: dict, version: tuple, sufijo: str,
+                            generar: Callable[[str], str], label: str, file_name: str,
+                            mime: str, **kwargs) -> None:
+    """
+    Botón de descarga que solo genera el archivo cuando se solicita.
+
+    Se muestra un botón "Preparar" que toma la exportación de la caché o la
+    genera con generar(destino); el archivo solo se lee después de pulsarlo,
+    no en cada recarga.
+    """
+    clave = clave_exportacion(nombre, filtros, version)
+    estado = f"descarga_diferida_{clave}{sufijo}"
+
+    if not st.session_state.get(estado):
+        if not st.button(f"⚙️ Preparar {label}", key=f"preparar_{clave}{sufijo}",
+                         use_container_width=kwargs.get('use_container_width', False)):
+            return
+        try:
+            with st.spinner("Preparando archivo..."):
+                st.session_state[estado] = exportacion_en_cache(clave, sufijo, generar)
+        except Exception as e:
+            logger.error(f"Error preparando exportación {nombre}: {e}")
+            st.error(f"❌ No se pudo preparar el archivo: {e}")
+            return
+
+    _boton_descargar(st.session_state[estado], estado, f"{clave}{sufijo}", label, file_name, mime, **kwargs)
+
+
+def boton_descarga_local(ruta, label: str, mime: str, clave: str, **kwargs) -> None:
+    """
+    Descarga de un archivo ya existente en el servidor (backups, bases restauradas).
+
+    El archivo solo se lee después de pulsar "Preparar", y la descarga vuelve
+    a quedar sin preparar al pulsarla, para no cargarlo en cada recarga.
+    """
+    estado = f"descarga_local_{clave}"
+    if st.session_state.get(estado) != str(ruta):
+        if not st.button(f"⚙️ Preparar {label}", key=f"preparar_{clave}",
+                         use_container_width=kwargs.get('use_container_width', False)):
+            return
+        st.session_state[estado] = str(ruta)
+
+    _boton_descargar(ruta, estado, clave, label, os.path.basename(ruta), mime, **kwargs)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# CACHÉ DE INFORMES PDF (direccionada por contenido)
+# ═══════════════════════════════════════════════════════════════════
+# La clave es un hash de las filas que usa el informe y de la versión de la
+# plantilla: una evaluación u observación nueva del grupo cambia el hash, de
+# modo que no hace falta invalidar nada explícitamente.
+
+INFORMES_DIR = CACHE_DIR / "informes"
+
+# Incrementar al cambiar el contenido o formato de generar_pdf_grupo
+PLANTILLA_PDF_VERSION = 1
+
+COLUMNAS_INFORME = ['codigo_grupo', 'nombre_propuesta', 'curador', 'dimension', 'aspecto', 'resultado']
+COLUMNAS_OBSERVACIONES_INFORME = ['curador', 'observacion', 'fecha_registro']
+
+
+def _hash_filas(df: pd.DataFrame, columnas: list) -> bytes:
+    """Hash de las filas (sin importar su orden) de las columnas indicadas"""
+    columnas = [columna for columna in columnas if columna in df.columns]
+    datos = df[columnas].astype(str).sort_values(columnas)
+    return pd.util.hash_pandas_object(datos, index=False).to_numpy().tobytes()
+
+
+def clave_informe_grupo(df_grupo: pd.DataFrame, df_observaciones: pd.DataFrame = None) -> str:
+    """Clave de contenido del informe de un grupo"""
+    if df_observaciones is None:
+        df_observaciones = df_grupo if 'observacion' in df_grupo.columns else pd.DataFrame(columns=COLUMNAS_OBSERVACIONES_INFORME)
+
+    resumen = hashlib.sha256()
+    resumen.update(f"v{PLANTILLA_PDF_VERSION}|{config.nombre_evento}|".encode('utf-8'))
+    resumen.update(_hash_filas(df_grupo, COLUMNAS_INFORME))
+    resumen.update(b"|")
+    resumen.update(_hash_filas(df_observaciones, COLUMNAS_OBSERVACIONES_INFORME))
+    return resumen.hexdigest()[:40]
+
+
+def pdf_grupo_en_cache(df_grupo: pd.DataFrame, df_observaciones: pd.DataFrame = None) -> bytes:
+    """
+    Igual que generar_pdf_grupo, pero reutiliza el PDF ya generado para el
+    mismo contenido (guardado en cache/informes)
+    """
+    ruta = INFORMES_DIR / f"{clave_informe_grupo(df_grupo, df_observaciones)}.pdf"
+
+    try:
+        return ruta.read_bytes()
+    except OSError:
+        pass
+
+    contenido = generar_pdf_grupo(df_grupo, df_observaciones)
+
+    try:
+        INFORMES_DIR.mkdir(parents=True, exist_ok=True)
+        temporal = archivo_temporal(".pdf", INFORMES_DIR)
+        with open(temporal, 'wb') as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+        podar_directorio(INFORMES_DIR, config.max_informes_cache)
+    except OSError as e:
+        logger.warning(f"No se pudo guardar el informe en caché: {e}")
+
+    return contenido
+
+
+def generar_pdf_grupo(df_grupo: pd.DataFrame, df_observaciones: pd.DataFrame = None) -> bytes:
+    """
+    Genera un PDF con el informe detallado del grupo
+
+    Args:
+        df_grupo: Evaluaciones por aspecto del grupo
+        df_observaciones: Observaciones del grupo (una por envío). Si no se
+            indica, se toman de la columna 'observacion' de df_grupo
+    """
 
     grupo_info = df_grupo.iloc[0]
     codigo_grupo = grupo_info['codigo_grupo']
@@ -54,7 +347,7 @@ def generar_pdf_grupo(df_grupo: pd.DataFrame) -> bytes:
     pdf.set_font("Arial", "", 10)
 
     df_dim_grupo = (df_grupo
-        .groupby('dimension', as_index=False)
+        .groupby('dimension', as_index=False, observed=True)
         .agg(
             promedio=('resultado', 'mean'),
             evaluaciones=('resultado', 'count')
@@ -73,7 +366,7 @@ def generar_pdf_grupo(df_grupo: pd.DataFrame) -> bytes:
     pdf.set_font("Arial", "", 9)
 
     df_aspecto_grupo = (df_grupo
-        .groupby(['dimension', 'aspecto'], as_index=False)
+        .groupby(['dimension', 'aspecto'], as_index=False, observed=True)
         .agg(promedio=('resultado', 'mean'))
         .sort_values(['dimension', 'promedio'], ascending=[True, False])
     )
@@ -90,7 +383,9 @@ def generar_pdf_grupo(df_grupo: pd.DataFrame) -> bytes:
     pdf.set_font("Arial", "", 9)
 
     # Obtener UNA observación por curador (la más reciente o primera disponible)
-    observaciones_unicas = (df_grupo[df_grupo['observacion'].notna() & (df_grupo['observacion'].str.strip() != "")]
+    if df_observaciones is None:
+        df_observaciones = df_grupo if 'observacion' in df_grupo.columns else pd.DataFrame(columns=['curador', 'observacion', 'fecha_registro'])
+    observaciones_unicas = (df_observaciones[df_observaciones['observacion'].notna() & (df_observaciones['observacion'].str.strip() != "")]
         .drop_duplicates(subset=['curador'], keep='first')
         .sort_values('fecha_registro', ascending=False)
     )
@@ -105,22 +400,79 @@ def generar_pdf_grupo(df_grupo: pd.DataFrame) -> bytes:
     # Retornar bytes directamente
     return pdf.output(dest='S').encode('latin-1')
 
-def crear_backup_zip() -> bytes:
-    """Crea un archivo ZIP con backup de la base de datos y archivos relacionados"""
-    zip_buffer = BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Agregar la base de datos
-        db_path = config.db_path
-        if os.path.exists(db_path):
-            zip_file.write(db_path, os.path.basename(db_path))
-        else:
-            raise FileNotFoundError("Archivo de base de datos no encontrado")
-
-        # Agregar archivo de configuración si existe
-        excel_path = config.excel_path
-        if os.path.exists(excel_path):
-            zip_file.write(excel_path, os.path.basename(excel_path))
-
-    zip_buffer.seek(0)
-    return zip_buffer.getvalue()
\ No newline at end of file
+# ═══════════════════════════════════════════════════════════════════
+# INFORMES PDF EN LOTE
+# ═══════════════════════════════════════════════════════════════════
+
+def _renderizar_informe(codigo_grupo: str, df_grupo: pd.DataFrame, df_observaciones: pd.DataFrame):
+    """
+    Tarea del pool de procesos: genera el PDF de un grupo
+
+    Returns:
+        Tupla (codigo_grupo, bytes del PDF o None, mensaje de error o None)
+    """
+    try:
+        return codigo_grupo, pdf_grupo_en_cache(df_grupo, df_observaciones), None
+    except Exception as e:
+        return codigo_grupo, None, str(e)
+
+
+def generar_zip_informes(df_eval: pd.DataFrame, df_observaciones: pd.DataFrame, destino: str,
+                         progreso: Callable[[int, int], None] = None, procesos: int = None) -> str:
+    """
+    Genera los informes PDF de todos los grupos en paralelo y los escribe en un ZIP en disco
+
+    Los datos se particionan por grupo una sola vez; cada PDF se renderiza en
+    un proceso aparte y se agrega al ZIP apenas termina.
+
+    Args:
+        df_eval: Evaluaciones por aspecto de todos los grupos
+        df_observaciones: Observaciones (una por envío) con columna codigo_grupo
+        destino: Ruta del ZIP a escribir
+        progreso: Función opcional progreso(terminados, total)
+        procesos: Número de procesos (por defecto config.procesos_informes o los núcleos disponibles)
+
+    Returns:
+        Ruta del ZIP escrito
+    """
+    procesos = procesos or config.procesos_informes or os.cpu_count() or 1
+
+    columnas_obs = ['curador', 'observacion', 'fecha_registro']
+    sin_observaciones = pd.DataFrame(columns=columnas_obs)
+    observaciones_por_grupo = (
+        {codigo: df for codigo, df in df_observaciones.groupby('codigo_grupo', sort=False, observed=True)}
+        if df_observaciones is not None and not df_observaciones.empty else {}
+    )
+    grupos = df_eval.groupby('codigo_grupo', sort=False, observed=True)
+    total = grupos.ngroups
+    errores = []
+
+    # "spawn" evita hacer fork del servidor de Streamlit (con hilos activos)
+    contexto = multiprocessing.get_context("spawn")
+
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as zip_file, \
+            ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+
+        futuros = [
+            pool.submit(_renderizar_informe, codigo, df_grupo,
+                        observaciones_por_grupo.get(codigo, sin_observaciones))
+            for codigo, df_grupo in grupos
+        ]
+
+        for terminados, futuro in enumerate(as_completed(futuros), start=1):
+            codigo, contenido, error = futuro.result()
+            if contenido is not None:
+                nombre = re.sub(r"[^\w\-]", "_", str(codigo))
+                zip_file.writestr(f"Informe_{nombre}.pdf", contenido)
+            else:
+                errores.append(f"{codigo}: {error}")
+
+            if progreso:
+                progreso(terminados, total)
+
+        if errores:
+            logger.warning(f"{len(errores)} informes no se pudieron generar")
+            zip_file.writestr("errores.txt", "\n".join(errores))
+
+    logger.info(f"Informes generados: {total - len(errores)} de {total} grupos ({procesos} procesos)")
+    return destino
@@ -2,6 +2,8 @@
 Utilidades compartidas para las vistas del comité
 """
 
+import pandas as pd
+import streamlit as st
 from src.config import config
 
 
@@ -39,4 +41,18 @@ def estado_patrimonial_texto(promedio: float) -> str:
     elif promedio_num >= config.umbrales.riesgo_max:
         return "Oportunidad de Mejora"
     else:
-        return "Riesgo Patrimonial"
\ No newline at end of file
+        return "Riesgo Patrimonial"
+
+
+def mostrar_avisos(origen) -> None:
+    """
+    Muestra los avisos que un cargador en caché dejó en df.attrs['avisos']
+    (o en el atributo avisos de un resultado, p. ej. ResultadosAnaliticos).
+
+    Los cargadores con cache_compartida pueden ejecutarse en un hilo de
+    revalidación sin sesión de Streamlit, así que no llaman a st.* y
+    devuelven sus mensajes como [(nivel, mensaje)], p. ej. ('warning', '...').
+    """
+    avisos = origen.attrs.get('avisos', []) if isinstance(origen, pd.DataFrame) else origen.avisos
+    for nivel, mensaje in avisos:
+        getattr(st, nivel)(mensaje)
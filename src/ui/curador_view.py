@@ -5,15 +5,17 @@ ACTUALIZADO: Validación completa de aspectos antes de guardar
 import streamlit as st
 import pandas as pd
 import logging
+import uuid
 from datetime import datetime
 from src.config import config
-from src.database.models import GrupoModel, EvaluacionModel, LogModel, AspectoModel
+from src.database.models import GrupoModel, EvaluacionModel, LogModel, AspectoModel, AsignacionModel
+from src.database.cache import cache_por_version
 from src.utils.validators import validar_codigo_grupo, validar_observacion
 
 logger = logging.getLogger(__name__)
 
 
-@st.cache_data
+@cache_por_version(rutas=lambda: [], etiquetas=['catalogo'], max_entries=2)
 def cargar_grupos_excel():
     """Carga el catálogo de grupos desde Excel con cache"""
     try:
@@ -29,6 +31,80 @@ def cargar_grupos_excel():
         return pd.DataFrame()
 
 
+# Etiquetas de los posibles resultados de un aspecto
+ETIQUETAS_RESULTADO = {
+    2: "🟢 Fortaleza",
+    1: "🟡 Oportunidad",
+    0: "🔴 Riesgo"
+}
+
+MODO_TARJETAS = "🗂️ Tarjetas"
+MODO_TABLA = "📊 Tabla compacta"
+
+
+@cache_por_version(etiquetas=['rubrica'])
+def cargar_rubrica_ficha(ficha_id: int):
+    """
+    Carga (con cache) la rúbrica de una ficha y su tabla base para la captura compacta
+    
+    Returns:
+        Tupla (aspectos_por_dimension, df_rubrica)
+    """
+    aspectos_por_dimension = AspectoModel.obtener_por_ficha(ficha_id)
+    
+    filas = [
+        {
+            'aspecto_id': aspecto['id'],
+            'Dimensión': dim_data['dimension']['nombre'],
+            'Aspecto': aspecto['nombre'],
+            'Estado': None
+        }
+        for dim_id, dim_data in sorted(aspectos_por_dimension.items(), key=lambda x: x[1]['dimension']['orden'])
+        for aspecto in dim_data['aspectos']
+    ]
+    df_rubrica = pd.DataFrame(filas, columns=['aspecto_id', 'Dimensión', 'Aspecto', 'Estado']).set_index('aspecto_id')
+    
+    return aspectos_por_dimension, df_rubrica
+
+
+def grilla_aspectos(df_rubrica: pd.DataFrame, key: str) -> dict:
+    """
+    Renderiza todos los aspectos de la ficha en un único st.data_editor
+    
+    Args:
+        df_rubrica: Tabla base (índice aspecto_id) generada por cargar_rubrica_ficha
+        key: Clave única del widget
+        
+    Returns:
+        dict: {aspecto_id: resultado o None}
+    """
+    df_editado = st.data_editor(
+        df_rubrica,
+        key=key,
+        hide_index=True,
+        use_container_width=True,
+        num_rows="fixed",
+        disabled=['Dimensión', 'Aspecto'],
+        height=min(38 * (len(df_rubrica) + 1), 800),
+        column_config={
+            'Dimensión': st.column_config.TextColumn('Dimensión', width="medium"),
+            'Aspecto': st.column_config.TextColumn('Aspecto', width="large"),
+            'Estado': st.column_config.SelectboxColumn(
+                'Estado',
+                options=list(ETIQUETAS_RESULTADO.values()),
+                required=False,
+                width="small"
+            )
+        }
+    )
+    
+    resultado_por_etiqueta = {etiqueta: valor for valor, etiqueta in ETIQUETAS_RESULTADO.items()}
+    return {
+        int(aspecto_id): resultado_por_etiqueta.get(etiqueta)
+        for aspecto_id, etiqueta in df_editado['Estado'].items()
+    }
+
+
 def bloque_aspecto(dimension_nombre: str, aspecto_nombre: str, aspecto_id: int, key_prefix: str):
     """
     Renderiza un bloque de evaluación para un aspecto individual
@@ -59,12 +135,7 @@ def bloque_aspecto(dimension_nombre: str, aspecto_nombre: str, aspecto_id: int,
             "Seleccione",
             [None, 2, 1, 0],  # None como primera opción
             key=f"res_{key_prefix}",
-            format_func=lambda x: {
-                None: "Seleccione",
-                2: "🟢 Fortaleza",
-                1: "🟡 Oportunidad",
-                0: "🔴 Riesgo"
-            }[x],
+            format_func=lambda x: ETIQUETAS_RESULTADO.get(x, "Seleccione"),
             label_visibility="collapsed"
         )
 
@@ -113,6 +184,21 @@ def mostrar_vista_curador():
             st.warning("⚠️ No se pudo cargar el catálogo de grupos. Contacte al administrador.")
             st.stop()
         
+        # Cola de grupos asignados al curador
+        pendientes = AsignacionModel.obtener_pendientes_curador(st.session_state.usuario_id)
+        if pendientes:
+            with st.expander(f"📋 Mis grupos asignados ({len(pendientes)} pendientes)"):
+                st.dataframe(
+                    pd.DataFrame(pendientes)[['codigo_grupo', 'nombre_propuesta', 'modalidad', 'ficha_nombre']].rename(columns={
+                        'codigo_grupo': 'Código',
+                        'nombre_propuesta': 'Propuesta',
+                        'modalidad': 'Modalidad',
+                        'ficha_nombre': 'Ficha'
+                    }),
+                    use_container_width=True,
+                    hide_index=True
+                )
+        
         # Sección: Búsqueda de grupo
         st.subheader("🔍 Búsqueda de Grupo")
         
@@ -258,7 +344,7 @@ def mostrar_vista_curador():
         # ============================================================
         # Obtener aspectos según la ficha del grupo
         # ============================================================
-        aspectos_por_dimension = AspectoModel.obtener_por_ficha(ficha_id)
+        aspectos_por_dimension, df_rubrica = cargar_rubrica_ficha(ficha_id)
         
         if not aspectos_por_dimension:
             st.error("❌ No se pudieron cargar los aspectos de evaluación para esta ficha")
@@ -277,44 +363,62 @@ def mostrar_vista_curador():
         # Contar total de aspectos a evaluar
         total_aspectos = sum(len(d['aspectos']) for d in aspectos_por_dimension.values())
         st.caption(f"📊 Esta ficha requiere evaluar **{total_aspectos} aspectos** distribuidos en **{len(aspectos_por_dimension)} dimensiones**")
+        
+        modo_captura = st.radio(
+            "Modo de captura:",
+            [MODO_TARJETAS, MODO_TABLA],
+            horizontal=True,
+            help="La tabla compacta muestra todos los aspectos en una sola grilla (recomendada para fichas largas)"
+        )
 
         with st.form("formulario_evaluacion", clear_on_submit=False):
             # Diccionario para almacenar las evaluaciones
             # Clave: aspecto_id, Valor: (aspecto_nombre, dimension_nombre, resultado)
             evaluaciones_dict = {}
             
-            # Iterar sobre cada dimensión de la ficha
-            for dim_id, dim_data in sorted(aspectos_por_dimension.items(), key=lambda x: x[1]['dimension']['orden']):
-                dimension = dim_data['dimension']
-                aspectos = dim_data['aspectos']
+            if modo_captura == MODO_TABLA:
+                # Una sola grilla para todos los aspectos
+                resultados_grilla = grilla_aspectos(df_rubrica, key=f"grilla_{grupo['Codigo']}_{ficha_id}")
                 
-                if not aspectos:
-                    continue  # Saltar dimensiones sin aspectos
+                for aspecto_id, fila in df_rubrica.iterrows():
+                    evaluaciones_dict[int(aspecto_id)] = {
+                        'aspecto_nombre': fila['Aspecto'],
+                        'dimension_nombre': fila['Dimensión'],
+                        'resultado': resultados_grilla.get(int(aspecto_id))
+                    }
+            else:
+                # Iterar sobre cada dimensión de la ficha
+                for dim_id, dim_data in sorted(aspectos_por_dimension.items(), key=lambda x: x[1]['dimension']['orden']):
+                    dimension = dim_data['dimension']
+                    aspectos = dim_data['aspectos']
                 
-                # Mostrar título de dimensión
-                st.markdown(f"""
-                <div class="dimension-box" style="background: linear-gradient(100deg, #C30A36 0%, #EEC216 50%, #278F45 100%); 
-                     color: white; padding: 15px; border-radius: 10px; margin: 20px 0 15px 0;">
-                    <h3 style="margin: 0; font-size: 18px;">{dimension['nombre']}</h3>
-                    <p style="margin: 5px 0 0 0; font-size: 13px; opacity: 0.9;">{len(aspectos)} aspectos a evaluar</p>
-                </div>
-                """, unsafe_allow_html=True)
+                    if not aspectos:
+                        continue  # Saltar dimensiones sin aspectos
                 
-                # Evaluar cada aspecto de esta dimensión
-                for aspecto in aspectos:
-                    resultado = bloque_aspecto(
-                        dimension_nombre=dimension['nombre'],
-                        aspecto_nombre=aspecto['nombre'],
-                        aspecto_id=aspecto['id'],
-                        key_prefix=f"asp_{aspecto['id']}"
-                    )
+                    # Mostrar título de dimensión
+                    st.markdown(f"""
+                    <div class="dimension-box" style="background: linear-gradient(100deg, #C30A36 0%, #EEC216 50%, #278F45 100%); 
+                         color: white; padding: 15px; border-radius: 10px; margin: 20px 0 15px 0;">
+                        <h3 style="margin: 0; font-size: 18px;">{dimension['nombre']}</h3>
+                        <p style="margin: 5px 0 0 0; font-size: 13px; opacity: 0.9;">{len(aspectos)} aspectos a evaluar</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                
+                    # Evaluar cada aspecto de esta dimensión
+                    for aspecto in aspectos:
+                        resultado = bloque_aspecto(
+                            dimension_nombre=dimension['nombre'],
+                            aspecto_nombre=aspecto['nombre'],
+                            aspecto_id=aspecto['id'],
+                            key_prefix=f"asp_{aspecto['id']}"
+                        )
                     
-                    # Guardar en diccionario
-                    evaluaciones_dict[aspecto['id']] = {
-                        'aspecto_nombre': aspecto['nombre'],
-                        'dimension_nombre': dimension['nombre'],
-                        'resultado': resultado
-                    }
+                        # Guardar en diccionario
+                        evaluaciones_dict[aspecto['id']] = {
+                            'aspecto_nombre': aspecto['nombre'],
+                            'dimension_nombre': dimension['nombre'],
+                            'resultado': resultado
+                        }
             
             # Campo de observación global
             st.markdown("**Observación Cualitativa:**")
@@ -394,61 +498,51 @@ def mostrar_vista_curador():
                     # GUARDAR EVALUACIONES
                     # ============================================================
                     try:
-                        exito = True
-                        evaluaciones_guardadas = 0
-                        
-                        # Preparar lista de evaluaciones válidas
-                        evaluaciones_validas = [
-                            (aspecto_id, datos['resultado'], observacion_global)
+                        # Preparar calificaciones válidas {aspecto_id: resultado}
+                        resultados = {
+                            aspecto_id: datos['resultado']
                             for aspecto_id, datos in evaluaciones_dict.items()
                             if datos['resultado'] is not None
-                        ]
+                        }
                         
-                        # Mostrar progreso
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
+                        # Clave de idempotencia: la misma durante toda la vida de este formulario,
+                        # así un doble clic o un reintento tras reconexión no escribe dos veces
+                        clave_sesion = f"clave_envio_{grupo['Codigo']}_{ficha_id}"
+                        if clave_sesion not in st.session_state:
+                            st.session_state[clave_sesion] = uuid.uuid4().hex
                         
-                        for idx, (aspecto_id, resultado, observacion) in enumerate(evaluaciones_validas):
-                            # Actualizar progreso
-                            progress = (idx + 1) / len(evaluaciones_validas)
-                            progress_bar.progress(progress)
-                            status_text.text(f"Guardando evaluación {idx + 1} de {len(evaluaciones_validas)}...")
-                            
-                            # Crear evaluación
-                            eval_id = EvaluacionModel.crear_evaluacion(
+                        # Guardar envío y aspectos en una sola transacción
+                        with st.spinner(f"Guardando {len(resultados)} aspectos..."):
+                            envio_id, es_nuevo, error_envio = EvaluacionModel.crear_envio(
                                 usuario_id=st.session_state.usuario_id,
                                 codigo_grupo=str(grupo['Codigo']),
                                 ficha_id=ficha_id,
-                                aspecto_id=aspecto_id,
-                                resultado=resultado,
-                                observacion=observacion
+                                resultados=resultados,
+                                observacion=observacion_global,
+                                clave_envio=st.session_state[clave_sesion]
                             )
-                            
-                            if eval_id:
-                                evaluaciones_guardadas += 1
-                            else:
-                                exito = False
-                                logger.error(f"Error guardando evaluación para aspecto {aspecto_id}")
-                                break
-                        
-                        # Limpiar barra de progreso
-                        progress_bar.empty()
-                        status_text.empty()
                         
-                        if exito and evaluaciones_guardadas == len(evaluaciones_validas):
+                        if envio_id and not es_nuevo:
+                            st.success("✅ Esta evaluación ya había sido registrada")
+                            st.session_state.evaluacion_guardada = True
+                        elif envio_id:
+                            evaluaciones_guardadas = len(resultados)
+                            
                             # Registrar log
                             LogModel.registrar_log(
                                 usuario=st.session_state.usuario,
                                 accion="EVALUACION_CREADA",
                                 detalle=f"Grupo: {grupo['Codigo']} - {grupo['Nombre_Propuesta']} | Ficha: {ficha_nombre} | {evaluaciones_guardadas} aspectos"
                             )
+                            AsignacionModel.marcar_completada(st.session_state.usuario_id, str(grupo['Codigo']))
                             
                             st.success(f"✅ Evaluación guardada exitosamente")
                             st.info(f"📊 Se registraron **{evaluaciones_guardadas} aspectos** evaluados para el grupo **{grupo['Nombre_Propuesta']}**")
                             st.balloons()
                             st.session_state.evaluacion_guardada = True
                         else:
-                            st.error(f"❌ Error al guardar la evaluación. Se guardaron {evaluaciones_guardadas} de {len(evaluaciones_validas)} aspectos.")
+                            logger.error(f"Error guardando envío: {error_envio}")
+                            st.error(f"❌ Error al guardar la evaluación. No se registró ningún aspecto: {error_envio}")
                             st.warning("⚠️ Contacte al administrador con este mensaje de error")
                             
                     except Exception as e:
@@ -465,6 +559,8 @@ def mostrar_vista_curador():
             with col_nuevo2:
                 if st.button("➡️ Evaluar otro grupo", type="primary", use_container_width=True):
                     st.session_state.evaluacion_guardada = False
+                    for clave in [k for k in st.session_state.keys() if str(k).startswith("clave_envio_")]:
+                        del st.session_state[clave]
                     st.rerun()
         
         # Información adicional
@@ -0,0 +1,51 @@
+"""
+Cache de deduplicación de corta duración
+
+Recuerda por unos minutos las claves de operaciones ya procesadas para que
+los reintentos (doble clic, reconexión del websocket) se respondan sin
+volver a tocar la base de datos.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class CacheDeduplicacion:
+    """Diccionario clave → resultado con expiración (TTL) y tamaño máximo, seguro entre hilos"""
+
+    def __init__(self, ttl_segundos: float = 600, max_entradas: int = 5000):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[Any]:
+        """Retorna el resultado registrado para la clave, o None si no existe o expiró."""
+        if not clave:
+            return None
+
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+
+            expira, resultado = entrada
+            if expira < time.monotonic():
+                del self._entradas[clave]
+                return None
+
+            return resultado
+
+    def registrar(self, clave: str, resultado: Any) -> None:
+        """Guarda el resultado de una operación ya procesada."""
+        if not clave:
+            return
+
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + self.ttl_segundos, resultado)
+            self._entradas.move_to_end(clave)
+
+            # Descartar las entradas más antiguas si se supera el límite
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
@@ -0,0 +1,120 @@
+"""
+Planificador de asignaciones curador → grupo
+
+Reparte los grupos entre los curadores activos para que cada grupo reciba
+el número objetivo de evaluaciones y la carga quede equilibrada.
+"""
+import heapq
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+@dataclass
+class PlanAsignacion:
+    """Resultado de la planificación"""
+    asignaciones: List[Tuple[int, str, int]] = field(default_factory=list)  # (usuario_id, codigo_grupo, ficha_id)
+    faltantes: Dict[str, int] = field(default_factory=dict)  # codigo_grupo -> evaluaciones sin cubrir
+    carga: Dict[int, int] = field(default_factory=dict)  # usuario_id -> grupos totales (previos + nuevos)
+
+    @property
+    def total_faltantes(self) -> int:
+        return sum(self.faltantes.values())
+
+
+def planificar_asignaciones(
+    grupos: Iterable[Tuple[str, int]],
+    curadores: Iterable[int],
+    evaluaciones_por_grupo: int,
+    max_por_curador: int,
+    conflictos: Set[Tuple[int, str]] = frozenset(),
+    existentes: Iterable[Tuple[int, str]] = ()
+) -> PlanAsignacion:
+    """
+    Genera un plan de asignaciones equilibrado (algoritmo voraz).
+
+    Se procesa por rondas: en cada ronda cada grupo con cupo pendiente recibe
+    como máximo un curador, de modo que ningún grupo alcanza su segunda
+    evaluación mientras otro sigue sin ninguna. Dentro de una ronda se atiende
+    primero a los grupos con menos curadores elegibles, y cada plaza se asigna
+    al curador elegible con menor carga.
+
+    Args:
+        grupos: Pares (codigo_grupo, ficha_id)
+        curadores: IDs de los curadores disponibles
+        evaluaciones_por_grupo: Evaluaciones objetivo por grupo
+        max_por_curador: Límite de grupos por curador
+        conflictos: Pares (usuario_id, codigo_grupo) excluidos
+        existentes: Pares (usuario_id, codigo_grupo) ya asignados o evaluados
+
+    Returns:
+        PlanAsignacion con las nuevas asignaciones, faltantes y carga final
+    """
+    curadores = sorted(set(curadores))
+    grupos = {codigo: ficha_id for codigo, ficha_id in grupos}
+
+    carga = Counter({u: 0 for u in curadores})
+    asignados_grupo: Dict[str, Set[int]] = defaultdict(set)
+    for usuario_id, codigo in existentes:
+        if usuario_id in carga:
+            carga[usuario_id] += 1
+        asignados_grupo[codigo].add(usuario_id)
+
+    pendientes = {
+        codigo: max(0, evaluaciones_por_grupo - len(asignados_grupo[codigo]))
+        for codigo in grupos
+    }
+
+    def elegibles(codigo: str) -> int:
+        return sum(
+            1 for u in curadores
+            if (u, codigo) not in conflictos and u not in asignados_grupo[codigo]
+        )
+
+    # Los grupos más restringidos eligen primero
+    orden = sorted(
+        (c for c, n in pendientes.items() if n > 0),
+        key=lambda c: (elegibles(c), -pendientes[c], c)
+    )
+
+    # Montículo (carga, usuario_id) para obtener siempre el curador menos cargado
+    monticulo = [(carga[u], u) for u in curadores if carga[u] < max_por_curador]
+    heapq.heapify(monticulo)
+
+    plan = PlanAsignacion()
+
+    while orden and monticulo:
+        siguiente_ronda = []
+        for codigo in orden:
+            descartados = []
+            elegido = None
+            while monticulo:
+                c, u = heapq.heappop(monticulo)
+                if (u, codigo) in conflictos or u in asignados_grupo[codigo]:
+                    descartados.append((c, u))
+                    continue
+                elegido = u
+                break
+
+            for item in descartados:
+                heapq.heappush(monticulo, item)
+
+            if elegido is None:
+                continue
+
+            carga[elegido] += 1
+            asignados_grupo[codigo].add(elegido)
+            pendientes[codigo] -= 1
+            plan.asignaciones.append((elegido, codigo, grupos[codigo]))
+
+            if carga[elegido] < max_por_curador:
+                heapq.heappush(monticulo, (carga[elegido], elegido))
+            if pendientes[codigo] > 0:
+                siguiente_ronda.append(codigo)
+
+        # Un grupo sin curador elegible en esta ronda tampoco lo tendrá después
+        orden = siguiente_ronda
+
+    plan.faltantes = {c: n for c, n in pendientes.items() if n > 0}
+    plan.carga = dict(carga)
+    return plan
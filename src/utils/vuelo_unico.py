@@ -0,0 +1,125 @@
+"""
+Caché compartida con cálculo único (single-flight) y revalidación en segundo plano
+
+Cuando varias sesiones piden a la vez el mismo resultado, solo una lo calcula
+y las demás esperan ese mismo cálculo. Si ya existe una versión anterior del
+resultado, puede servirse de inmediato (stale-while-revalidate) mientras un
+único hilo en segundo plano calcula la nueva.
+
+Los resultados que se piden desde dentro de un cálculo (p. ej. los agregados
+del comité leen obtener_todas_dataframe) nunca se sirven obsoletos: si no, el
+resultado externo se guardaría con la versión nueva pero con datos viejos.
+"""
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Marca, por hilo, que se está ejecutando un cálculo de alguna CacheCompartida
+_contexto = threading.local()
+
+
+class CacheCompartida:
+    """Diccionario clave → (versión, resultado) con cálculo único por clave y versión, seguro entre hilos"""
+
+    def __init__(self, max_entradas: int = 8, nombre: str = "cache"):
+        self.max_entradas = max_entradas
+        self.nombre = nombre
+        # clave → (versión, resultado, orden); orden = momento en que empezó el cálculo
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._vuelos: Dict[tuple, Future] = {}
+        self._revalidando: Set[Hashable] = set()
+        self._orden = itertools.count()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable, version: Hashable, calcular: Callable[[], Any],
+                permitir_obsoleto: Optional[Callable[[Hashable], bool]] = None) -> Any:
+        """
+        Retorna el resultado de la clave para la versión indicada.
+
+        Args:
+            clave: Identifica el resultado (p. ej. los argumentos de la función)
+            version: Versión actual de los datos; si difiere de la guardada, se recalcula
+            calcular: Función sin argumentos que produce el resultado
+            permitir_obsoleto: Función(version_guardada) → bool. Si retorna True,
+                se devuelve el resultado guardado y se recalcula en segundo plano
+                (como mucho un recálculo en segundo plano por clave a la vez).
+                Se ignora si la llamada ocurre dentro de otro cálculo.
+
+        Raises:
+            Exception: La excepción de `calcular`, si esta sesión esperaba el resultado
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada[0] == version:
+                self._entradas.move_to_end(clave)
+                return entrada[1]
+
+            vuelo = self._vuelos.get((clave, version))
+
+            anidado = getattr(_contexto, 'calculando', False)
+            if entrada is not None and permitir_obsoleto and not anidado and permitir_obsoleto(entrada[0]):
+                if vuelo is None and clave not in self._revalidando:
+                    vuelo = self._nuevo_vuelo(clave, version)
+                    self._revalidando.add(clave)
+                    threading.Thread(
+                        target=self._ejecutar, args=(clave, version, calcular, vuelo, next(self._orden), True),
+                        name=f"revalidar-{self.nombre}", daemon=True
+                    ).start()
+                return entrada[1]
+
+            propio = vuelo is None
+            if propio:
+                vuelo = self._nuevo_vuelo(clave, version)
+                orden = next(self._orden)
+
+        if propio:
+            self._ejecutar(clave, version, calcular, vuelo, orden)
+        return vuelo.result()
+
+    def _nuevo_vuelo(self, clave: Hashable, version: Hashable) -> Future:
+        """Registra el cálculo de (clave, versión) para que otras sesiones lo esperen (con el lock tomado)."""
+        vuelo = Future()
+        self._vuelos[(clave, version)] = vuelo
+        return vuelo
+
+    def _ejecutar(self, clave: Hashable, version: Hashable, calcular: Callable[[], Any], vuelo: Future,
+                  orden: int, segundo_plano: bool = False) -> None:
+        """
+        Calcula el resultado, lo guarda y despierta a las sesiones que lo esperan.
+
+        Un cálculo que empezó antes que el del resultado ya guardado (versión
+        más antigua de los datos) no lo reemplaza.
+        """
+        anterior = getattr(_contexto, 'calculando', False)
+        _contexto.calculando = True
+        try:
+            valor = calcular()
+        except Exception as e:
+            logger.warning(f"Error calculando {self.nombre}: {e}")
+            vuelo.set_exception(e)
+        else:
+            with self._lock:
+                entrada = self._entradas.get(clave)
+                if entrada is None or entrada[2] < orden:
+                    self._entradas[clave] = (version, valor, orden)
+                    self._entradas.move_to_end(clave)
+
+                    while len(self._entradas) > self.max_entradas:
+                        self._entradas.popitem(last=False)
+            vuelo.set_result(valor)
+        finally:
+            _contexto.calculando = anterior
+            with self._lock:
+                self._vuelos.pop((clave, version), None)
+                if segundo_plano:
+                    self._revalidando.discard(clave)
+
+    def limpiar(self) -> None:
+        """Descarta todos los resultados guardados (los cálculos en curso terminan igual)."""
+        with self._lock:
+            self._entradas.clear()
@@ -0,0 +1,116 @@
+"""
+Caché compartida: cálculo único, resultado obsoleto mientras se revalida y
+resultados frescos dentro de una revalidación.
+"""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.utils.vuelo_unico import CacheCompartida
+
+
+def esperar_revalidaciones():
+    for hilo in threading.enumerate():
+        if hilo.name.startswith("revalidar-"):
+            hilo.join(timeout=5)
+
+
+def test_calculo_unico_entre_hilos():
+    cache = CacheCompartida()
+    llamadas = []
+    liberar = threading.Event()
+
+    def calcular():
+        llamadas.append(1)
+        liberar.wait(timeout=5)
+        return 42
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener('k', 1, calcular)))
+             for _ in range(5)]
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(0.05)
+    liberar.set()
+    for hilo in hilos:
+        hilo.join(timeout=5)
+
+    assert resultados == [42] * 5
+    assert len(llamadas) == 1
+
+
+def test_obsoleto_mientras_revalida_y_una_revalidacion_por_clave():
+    cache = CacheCompartida()
+    cache.obtener('k', 1, lambda: 'v1')
+
+    liberar = threading.Event()
+    llamadas = []
+
+    def lento(valor):
+        def calcular():
+            llamadas.append(valor)
+            liberar.wait(timeout=5)
+            return valor
+        return calcular
+
+    for version in (2, 3, 4):
+        assert cache.obtener('k', version, lento(f'v{version}'), lambda guardada: True) == 'v1'
+    liberar.set()
+    esperar_revalidaciones()
+
+    assert llamadas == ['v2']
+    assert cache.obtener('k', 2, lento('otro')) == 'v2'
+
+
+def test_calculo_antiguo_no_reemplaza_uno_mas_reciente():
+    cache = CacheCompartida()
+    liberar = threading.Event()
+
+    def antiguo():
+        liberar.wait(timeout=5)
+        return 'viejo'
+
+    hilo = threading.Thread(target=lambda: cache.obtener('k', 1, antiguo))
+    hilo.start()
+    time.sleep(0.05)
+    assert cache.obtener('k', 2, lambda: 'nuevo') == 'nuevo'
+    liberar.set()
+    hilo.join(timeout=5)
+
+    assert cache.obtener('k', 2, lambda: 'recalculado') == 'nuevo'
+
+
+def test_revalidacion_anidada_lee_datos_frescos(tmp_path):
+    """Escritura → revalidación en segundo plano → el resultado externo refleja la escritura"""
+    pytest.importorskip("streamlit")
+    from src.database.cache import cache_compartida
+
+    db_path = str(tmp_path / "evento.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE evaluaciones (id INTEGER PRIMARY KEY AUTOINCREMENT, resultado INTEGER)")
+    conn.execute("INSERT INTO evaluaciones (resultado) VALUES (1)")
+    conn.commit()
+
+    @cache_compartida
+    def contar(db_path: str):
+        with sqlite3.connect(db_path) as lectura:
+            return lectura.execute("SELECT COUNT(*) FROM evaluaciones").fetchone()[0]
+
+    @cache_compartida
+    def agregado(db_path: str):
+        return {'total': contar(db_path)}
+
+    assert agregado(db_path)['total'] == 1
+
+    conn.execute("INSERT INTO evaluaciones (resultado) VALUES (2)")
+    conn.commit()
+    conn.close()
+
+    # Primera lectura tras la escritura: obsoleta mientras se revalida
+    assert agregado(db_path)['total'] in (1, 2)
+    esperar_revalidaciones()
+
+    assert contar(db_path) == 2
+    assert agregado(db_path)['total'] == 2
@@ -0,0 +1,86 @@
+"""
+El ranking en vivo debe coincidir con los premios de la vista consolidada
+(cargar_y_consolidar_datos + calcular_premios), con ambos eventos evaluados
+y con uno solo.
+"""
+import random
+import sqlite3
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("streamlit")
+pytest.importorskip("sortedcontainers")
+
+from src.database.init_db import SCHEMA_SQL, JOURNAL_SQL
+from src.analytics.premios import calcular_premios
+from src.analytics.ranking_incremental import RankingIncremental
+from src.ui.comite import congos_oro_view
+
+FICHAS = [(1, 'CONGO', 'Congo'), (2, 'CUMBIA', 'Cumbia'), (3, 'GARABATO', 'Garabato')]
+TAMANOS = ['GRANDE', 'MEDIANO', 'PEQUEÑO']
+GRUPOS = 24
+CURADORES = 3
+
+
+def crear_evento(ruta, semilla: int, con_evaluaciones: bool = True) -> str:
+    """Base de datos de un evento con GRUPOS grupos y, opcionalmente, sus evaluaciones"""
+    azar = random.Random(semilla)
+    conn = sqlite3.connect(ruta)
+    conn.executescript(SCHEMA_SQL)
+    conn.executescript(JOURNAL_SQL)
+    conn.executemany("INSERT INTO fichas (id, codigo, nombre) VALUES (?, ?, ?)", FICHAS)
+
+    for numero in range(GRUPOS):
+        ficha_id = FICHAS[numero % len(FICHAS)][0]
+        conn.execute(
+            "INSERT INTO grupos (codigo, nombre_propuesta, modalidad, tipo, tamano, ano_evento, ficha_id) "
+            "VALUES (?, ?, 'Danza', 'Comparsa', ?, 2026, ?)",
+            (f"G{numero:02d}", f"Grupo {numero}", TAMANOS[numero % len(TAMANOS)], ficha_id)
+        )
+        if not con_evaluaciones:
+            continue
+        for curador in range(1, CURADORES + 1):
+            for aspecto in range(1, 5):
+                conn.execute(
+                    "INSERT INTO evaluaciones (envio_id, usuario_id, codigo_grupo, ficha_id, aspecto_id, resultado) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (numero * CURADORES + curador, curador, f"G{numero:02d}", ficha_id, aspecto, azar.randint(0, 2))
+                )
+
+    conn.commit()
+    conn.close()
+    return str(ruta)
+
+
+def premios_vista(monkeypatch, db_fin: str, db_gran: str):
+    monkeypatch.setattr(congos_oro_view, 'DB_FIN_SEMANA', db_fin)
+    monkeypatch.setattr(congos_oro_view, 'DB_GRAN_PARADA', db_gran)
+    congos_oro_view.cargar_y_consolidar_datos.clear()
+    return calcular_premios(congos_oro_view.cargar_y_consolidar_datos())
+
+
+def premios_en_vivo(db_fin: str, db_gran: str):
+    ranking = RankingIncremental(db_fin, db_gran)
+    ranking.actualizar()
+    return {
+        fila['codigo_grupo']: (fila['nota_consolidada'], fila['premio'])
+        for categoria in ranking.categorias
+        for _, fila in ranking.clasificacion(categoria).iterrows()
+    }
+
+
+@pytest.mark.parametrize("gran_evaluada", [True, False], ids=["ambos_eventos", "un_solo_evento"])
+def test_ranking_en_vivo_coincide_con_la_vista(tmp_path, monkeypatch, gran_evaluada):
+    db_fin = crear_evento(tmp_path / "finde.db", semilla=1)
+    db_gran = crear_evento(tmp_path / "granparada.db", semilla=2, con_evaluaciones=gran_evaluada)
+
+    vista = premios_vista(monkeypatch, db_fin, db_gran)
+    en_vivo = premios_en_vivo(db_fin, db_gran)
+
+    assert set(vista['codigo_grupo']) == set(en_vivo)
+    for fila in vista.itertuples():
+        nota, premio = en_vivo[fila.codigo_grupo]
+        assert nota == pytest.approx(fila.nota_consolidada)
+        assert premio == fila.premio